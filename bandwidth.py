@@ -0,0 +1,115 @@
+import threading
+import time
+
+
+#---> CONSTANTS
+
+#Minimum part of the total bandwidth left to the downloads while a video is uploaded, so they never stop completely
+MIN_DOWNLOAD_SHARE = 0.1
+
+
+#---> CLASSES
+
+class TokenBucket:
+    """Cubeta de tokens que limita un flujo de bytes a rate bytes por segundo, admitiendo ráfagas de hasta burst bytes (un segundo de transferencia por defecto).
+    Un consumo mayor que los tokens disponibles deja la cubeta en negativo y devuelve los segundos que hay que esperar hasta saldar la deuda,
+    así que un bloque más grande que la ráfaga también se admite. rate None indica que no hay límite. Puede usarse desde varios hilos."""
+
+    def __init__(self, rate=None, burst=None):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.burst = 0
+        self.tokens = 0
+        self.last_time = time.monotonic()
+        self.set_rate(rate, burst)
+
+    def __refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+
+    def set_rate(self, rate, burst=None):
+        """Cambia el límite de la cubeta. Los tokens acumulados se conservan hasta la nueva ráfaga y la deuda se mantiene si sigue habiendo límite."""
+        with self.lock:
+            self.__refill()
+            self.rate = rate if rate and rate > 0 else None
+            self.burst = burst or self.rate or 0
+            self.tokens = min(self.tokens, self.burst) if self.rate is not None else 0
+
+    def consume(self, nbytes):
+        """Descuenta nbytes de la cubeta y devuelve los segundos que hay que esperar antes de transferir más bytes (0 si no hay deuda o no hay límite)."""
+        with self.lock:
+            if self.rate is None:
+                return 0
+            self.__refill()
+            self.tokens -= nbytes
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+
+class BandwidthLimiter:
+    """Reparte el ancho de banda del equipo entre las descargas y las subidas que se ejecutan a la vez, con un límite total y otro de las descargas en bytes por segundo.
+    Mientras se sube un video, las descargas se limitan al total menos upload_reserve, así que la subida a YouTube, la más lenta y la que consume la cuota, no se queda sin ancho de banda.
+    Los bytes que transfiere el navegador no se pueden frenar desde Python, pero los que informa el progreso de la subida se descuentan del total,
+    de modo que las descargas ceden lo que la subida usa además de la reserva. Los límites se pueden cambiar mientras se usa. None indica que no hay límite.
+    Puede usarse desde varios hilos."""
+
+    def __init__(self, total_rate=None, download_rate=None, upload_reserve=None):
+        self.lock = threading.Lock()
+        self.total_bucket = TokenBucket()
+        self.download_bucket = TokenBucket()
+        self.active_uploads = 0
+        self.set_limits(total_rate, download_rate, upload_reserve)
+
+    def __update_rates(self):
+        download_rate = self.download_rate
+        if self.total_rate is not None:
+            total_share = self.total_rate
+            if self.active_uploads > 0 and self.upload_reserve:
+                total_share = max(self.total_rate - self.upload_reserve, self.total_rate * MIN_DOWNLOAD_SHARE)
+            download_rate = min(download_rate, total_share) if download_rate is not None else total_share
+        self.download_bucket.set_rate(download_rate)
+        self.total_bucket.set_rate(self.total_rate)
+
+    def set_limits(self, total_rate=None, download_rate=None, upload_reserve=None):
+        """Cambia el límite total, el de las descargas y la reserva de las subidas, en bytes por segundo. Se aplican desde el siguiente bloque descargado."""
+        with self.lock:
+            self.total_rate = total_rate if total_rate and total_rate > 0 else None
+            self.download_rate = download_rate if download_rate and download_rate > 0 else None
+            self.upload_reserve = upload_reserve if upload_reserve and upload_reserve > 0 else None
+            self.__update_rates()
+
+    def get_download_rate(self):
+        """Devuelve el límite actual de las descargas en bytes por segundo, o None si no tienen límite."""
+        return self.download_bucket.rate
+
+    def is_limited(self):
+        """Devuelve True si hay algún límite configurado."""
+        return self.total_rate is not None or self.download_rate is not None
+
+    def upload_started(self):
+        """Registra el inicio de una subida: las descargas dejan libre la reserva de las subidas hasta que termine."""
+        with self.lock:
+            self.active_uploads += 1
+            self.__update_rates()
+
+    def upload_finished(self):
+        """Registra el fin de una subida: si no quedan subidas en curso, las descargas vuelven a usar todo el límite total."""
+        with self.lock:
+            self.active_uploads = max(0, self.active_uploads - 1)
+            self.__update_rates()
+
+    def record_upload(self, nbytes):
+        """Descuenta del límite total los bytes transferidos por una subida, sin esperar."""
+        self.total_bucket.consume(nbytes)
+
+    def throttle_download(self, nbytes, stop_event=None):
+        """Descuenta los bytes de un bloque descargado y espera lo necesario para mantener las descargas dentro de su límite y del total.
+        stop_event interrumpe la espera."""
+        delay = max(self.download_bucket.consume(nbytes), self.total_bucket.consume(nbytes))
+        if delay <= 0:
+            return
+        if stop_event is None:
+            time.sleep(delay)
+        else:
+            stop_event.wait(delay)
@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from local_server import BenchmarkServer
+
+#Import the pipeline from the repository folder, where its config.ini is
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+from pipeline import Pipeline, PipelineConfig
+from retry_policy import classify_download_error
+from youtube_uploader_selenium.timing import percentile
+
+
+#---> FUNCTIONS
+
+#Download a file and measure the time it takes
+def timed_download(pipeline, url, file_name, session, retry_counter):
+    """Descarga un archivo con fetch_file y la política de reintentos de la configuración, como download_file, y devuelve una tupla (checksum, seconds),
+    con checksum None si la descarga falló. Cada reintento se suma a retry_counter, una lista [reintentos, lock]."""
+    def count_retry(error, attempt, delay):
+        with retry_counter[1]:
+            retry_counter[0] += 1
+
+    start = time.perf_counter()
+    try:
+        checksum = pipeline.retry_policy.call(lambda: pipeline.fetch_file(url, file_name, session), classify_download_error, on_retry=count_retry)
+    except Exception:
+        checksum = None
+    return checksum, time.perf_counter() - start
+
+#Download the synthetic files from the local server like the DOWNLOAD process of main.py
+def run_download_benchmark(pipeline, server, files):
+    """Descarga los archivos en paralelo, reintentando cada descarga fallida con la política de reintentos como el proceso de descarga de main.py.
+    Devuelve un diccionario con los resultados del benchmark."""
+    workers = pipeline.config.download_workers
+    session = pipeline.create_download_session()
+    file_names = [f'video_{index}.mp4' for index in range(files)]
+    retry_counter = [0, threading.Lock()]
+    latencies = {}
+    checksums = {}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {file_name: executor.submit(timed_download, pipeline, server.file_url(file_name), file_name, session, retry_counter) for file_name in file_names}
+    failed = []
+    for file_name, future in futures.items():
+        checksums[file_name], latencies[file_name] = future.result()
+        if checksums[file_name] is None:
+            failed.append(file_name)
+    elapsed = time.perf_counter() - start
+
+    #Check the streamed checksums against the content served
+    corrupted = [file_name for file_name in file_names if file_name not in failed and checksums[file_name] != server.get_file(file_name).checksum()]
+
+    downloaded = files - len(failed)
+    return {'files': files, 'downloaded': downloaded, 'failed': failed, 'corrupted': corrupted, 'retries': retry_counter[0],
+            'elapsed': elapsed, 'bytes': downloaded * server.file_size, 'bytes_sent': server.bytes_sent,
+            'requests': server.requests, 'injected_failures': server.failures, 'latencies': list(latencies.values())}
+
+#Print the results of the benchmark
+def print_results(results):
+    """Muestra los resultados del benchmark de descarga."""
+    mb = 1024 * 1024
+    latencies = results['latencies']
+    print(f'Archivos descargados: {results["downloaded"]} de {results["files"]} ({results["retries"]} reintentos, {results["injected_failures"]} fallos inyectados)')
+    if results['failed']:
+        print(f'Archivos no descargados: {results["failed"]}')
+    if results['corrupted']:
+        print(f'Archivos con checksum incorrecto: {results["corrupted"]}')
+    print(f'Tiempo total: {results["elapsed"]:.2f} s')
+    print(f'Rendimiento: {results["bytes"] / mb / results["elapsed"]:.2f} MB/s ({results["bytes"] / mb:.1f} MB descargados, '
+          f'{results["bytes_sent"] / mb:.1f} MB enviados por el servidor en {results["requests"]} peticiones)')
+    print(f'Latencia por archivo: p50 {percentile(latencies, 0.5):.2f} s, p90 {percentile(latencies, 0.9):.2f} s, máximo {max(latencies):.2f} s')
+
+
+#---> MAIN PROCESS STARTS HERE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de download_file contra un servidor HTTP local con archivos sintéticos.')
+    parser.add_argument("--files", help="Número de archivos a descargar (8 por defecto)", type=int, default=8)
+    parser.add_argument("--size-mb", help="Tamaño de cada archivo en MB (20 por defecto)", type=float, default=20)
+    parser.add_argument("--workers", help="Número de descargas en paralelo (4 por defecto)", type=int, default=4)
+    parser.add_argument("--bandwidth-mbps", help="Ancho de banda por conexión en MB/s (sin límite por defecto)", type=float)
+    parser.add_argument("--latency", help="Latencia de cada petición en segundos (0 por defecto)", type=float, default=0.0)
+    parser.add_argument("--failure-rate", help="Probabilidad de que se corte la conexión durante una descarga (0 por defecto)", type=float, default=0.0)
+    parser.add_argument("--error-rate", help="Probabilidad de que una petición responda con un error 503 (0 por defecto)", type=float, default=0.0)
+    parser.add_argument("--no-ranges", help="Indica que el servidor no admite peticiones Range", action="store_true")
+    parser.add_argument("--segments", help="Número de segmentos en paralelo de cada archivo (1 por defecto, sin segmentos)", type=int, default=1)
+    parser.add_argument("--segment-min-mb", help="Tamaño mínimo en MB de los archivos que se descargan por segmentos (0 por defecto)", type=float, default=0)
+    parser.add_argument("--limit-mbps", help="Límite de ancho de banda de las descargas en MB/s, aplicado por el pipeline (sin límite por defecto)", type=float)
+    parser.add_argument("--max-attempts", help="Número máximo de intentos de cada descarga (RETRY_MAX_ATTEMPTS de config.ini por defecto)", type=int)
+    parser.add_argument("--retry-base-delay", help="Segundos de espera antes del primer reintento, que se duplican en cada reintento (0.5 por defecto)", type=float, default=0.5)
+    parser.add_argument("--seed", help="Semilla de los fallos inyectados", type=int)
+    args = parser.parse_args()
+
+    bandwidth = int(args.bandwidth_mbps * 1024 * 1024) if args.bandwidth_mbps else None
+    with tempfile.TemporaryDirectory() as videos_folder_path, \
+            BenchmarkServer(int(args.size_mb * 1024 * 1024), bandwidth, args.latency, args.failure_rate, args.error_rate,
+                            not args.no_ranges, seed=args.seed) as server:
+        #Download into a temporary folder instead of the videos folder of config.ini, with its own jobs database
+        config = PipelineConfig.from_file(os.path.join(REPOSITORY_PATH, 'config.ini'), videos_folder_path=videos_folder_path,
+                                          jobs_database_path=os.path.join(videos_folder_path, 'jobs.db'), download_workers=args.workers,
+                                          retry_base_delay=args.retry_base_delay, download_segments=args.segments,
+                                          segmented_download_min_size=int(args.segment_min_mb * 1024 * 1024),
+                                          download_bandwidth=int(args.limit_mbps * 1024 * 1024) if args.limit_mbps else None, config_file_path=None)
+        if args.max_attempts is not None:
+            config.retry_max_attempts = args.max_attempts
+        with Pipeline(config) as pipeline:
+            print_results(run_download_benchmark(pipeline, server, args.files))
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import configparser
+
+#Import the uploader from the repository folder, where its config.ini is
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
+from youtube_uploader_selenium.lean import get_browser_options
+from youtube_uploader_selenium.profile_template import create_template_webdriver, ensure_profile_template, get_folder_size, get_template_folder, read_manifest
+from youtube_uploader_selenium.timing import percentile
+
+
+#---> CONSTANTS
+
+#Hosts of the cookies and the site storage of the synthetic profile that are not needed to upload
+OTHER_HOSTS = [f'site{index}.example.com' for index in range(200)]
+
+
+#---> FUNCTIONS
+
+#Create a synthetic Firefox profile with the files of a profile used every day
+def create_synthetic_profile(profile_path, size_mb, seed=None):
+    """Crea un perfil de Firefox sintético en la carpeta dada, con cookies de YouTube, Google y otros 200 sitios, el almacenamiento de esos sitios,
+    el historial y la caché del navegador, que ocupan en total unos size_mb MB. La caché y el historial se llenan con bytes aleatorios, que no se comprimen."""
+    generator = random.Random(seed)
+    os.makedirs(profile_path)
+
+    connection = sqlite3.connect(os.path.join(profile_path, 'cookies.sqlite'))
+    connection.execute('CREATE TABLE moz_cookies (id INTEGER PRIMARY KEY, originAttributes TEXT NOT NULL DEFAULT \'\', name TEXT, value TEXT, host TEXT, '
+                       'path TEXT, expiry INTEGER, lastAccessed INTEGER, creationTime INTEGER, isSecure INTEGER, isHttpOnly INTEGER)')
+    cookies = [(name, f'{generator.getrandbits(128):032x}', host, '/', 2000000000, 0, 0, 1, 1)
+               for host in ('.youtube.com', 'www.youtube.com', '.google.com', 'accounts.google.com') for name in ('SID', 'HSID', 'SSID', 'APISID', 'SAPISID', 'LOGIN_INFO')]
+    cookies += [(f'cookie{index}', f'{generator.getrandbits(256):064x}', '.' + host, '/', 2000000000, 0, 0, 0, 0)
+                for host in OTHER_HOSTS for index in range(20)]
+    with connection:
+        connection.executemany('INSERT INTO moz_cookies (name, value, host, path, expiry, lastAccessed, creationTime, isSecure, isHttpOnly) '
+                               'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', cookies)
+    connection.close()
+
+    #Files of the profile and their share of the total size
+    files = [('places.sqlite', 0.15), ('favicons.sqlite', 0.05), ('permissions.sqlite', 0.001), ('cert9.db', 0.001)]
+    files += [(os.path.join('storage', 'default', 'https+++www.youtube.com', 'ls', 'data.sqlite'), 0.002),
+              (os.path.join('storage', 'default', 'https+++studio.youtube.com', 'idb', 'data.sqlite'), 0.002)]
+    files += [(os.path.join('storage', 'default', f'https+++{host}', 'idb', 'data.sqlite'), 0.2 / len(OTHER_HOSTS)) for host in OTHER_HOSTS]
+    files += [(os.path.join('cache2', 'entries', f'{index:040X}'), 0.6 / 400) for index in range(400)]
+    for file_name, share in files:
+        file_path = os.path.join(profile_path, file_name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'wb') as file:
+            file.write(generator.randbytes(int(size_mb * 1024 * 1024 * share)))
+
+#Prepare the profile of a browser like selenium does with the whole profile
+def prepare_full_profile(profile_path):
+    """Prepara el perfil de un navegador como lo hace selenium con profile_path: copia el perfil completo a una carpeta temporal y lo comprime para geckodriver.
+    Devuelve el tamaño en bytes del perfil enviado a geckodriver."""
+    profile = FirefoxProfile(profile_path)
+    try:
+        return len(profile.encoded)
+    finally:
+        shutil.rmtree(profile.tempfolder, ignore_errors=True)
+
+#Prepare the profile of a browser from the template of the profile
+def prepare_template_profile(profile_path, template_folder):
+    """Prepara el perfil de un navegador como lo hace YouTubeUploadSession con la plantilla: comprueba que la plantilla esté al día, la clona en el perfil vacío
+    de selenium y lo comprime para geckodriver. Devuelve el tamaño en bytes del perfil enviado a geckodriver."""
+    template_path = ensure_profile_template(profile_path, template_folder)
+    profile = FirefoxProfile()
+    try:
+        return create_template_webdriver(profile, template_path=template_path, webdriver_class=lambda firefox_profile: len(firefox_profile.encoded))
+    finally:
+        shutil.rmtree(profile.path, ignore_errors=True)
+
+#Start and close a headless Firefox with the whole profile or with its template
+def launch_browser(profile_path, template_folder, cookies_folder_path):
+    """Inicia un Firefox headless con el perfil completo (template_folder None) o con su plantilla, y lo cierra. Necesita Firefox y geckodriver.
+    Devuelve el tamaño en bytes del perfil enviado a geckodriver, que no se mide en este modo (0)."""
+    from selenium_firefox.firefox import Firefox
+
+    if template_folder is None:
+        browser = Firefox(profile_path=profile_path, cookies_folder_path=cookies_folder_path, full_screen=False, headless=True)
+    else:
+        template_path = ensure_profile_template(profile_path, template_folder)
+        browser = Firefox(cookies_folder_path=cookies_folder_path, full_screen=False, headless=True, **get_browser_options(False, template_path))
+    browser.quit()
+    return 0
+
+#Measure the preparation of the profile of each launch with the whole profile and with its template
+def run_profile_benchmark(profile_path, template_folder, repeats, launch=False):
+    """Mide repeats veces lo que tarda en prepararse el perfil de un navegador con el perfil completo y con su plantilla (o en iniciarse Firefox, si launch es True).
+    La plantilla se crea primero en template_folder, y ese tiempo se mide aparte. Devuelve un diccionario con los resultados del benchmark."""
+    with tempfile.TemporaryDirectory() as cookies_folder_path:
+        start = time.perf_counter()
+        ensure_profile_template(profile_path, template_folder)
+        build_time = time.perf_counter() - start
+
+        modes = {'Perfil completo': None, 'Plantilla': template_folder}
+        results = {'build_time': build_time, 'profile_size': get_folder_size(profile_path), 'template': read_manifest(template_folder), 'modes': {}}
+        for name, mode_template_folder in modes.items():
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                if launch:
+                    encoded_size = launch_browser(profile_path, mode_template_folder, cookies_folder_path)
+                elif mode_template_folder is None:
+                    encoded_size = prepare_full_profile(profile_path)
+                else:
+                    encoded_size = prepare_template_profile(profile_path, mode_template_folder)
+                times.append(time.perf_counter() - start)
+            results['modes'][name] = {'times': times, 'encoded_size': encoded_size}
+        return results
+
+#Print the results of the benchmark
+def print_results(results, launch):
+    """Muestra los resultados del benchmark del perfil."""
+    mb = 1024 * 1024
+    template = results['template']
+    print(f'Perfil de origen: {results["profile_size"] / mb:.1f} MB')
+    print(f'Plantilla: {template["size"] / mb:.2f} MB, {template["cookies"]} cookies, creada en {results["build_time"] * 1000:.0f} ms')
+    print(f'{"Modo":<20}{"p50 (ms)":>12}{"p90 (ms)":>12}{"enviado (MB)":>15}')
+    for name, mode in results['modes'].items():
+        encoded = f'{mode["encoded_size"] / mb:.2f}' if mode['encoded_size'] else '-'
+        print(f'{name:<20}{percentile(mode["times"], 0.5) * 1000:>12.0f}{percentile(mode["times"], 0.9) * 1000:>12.0f}{encoded:>15}')
+    before, after = (percentile(mode['times'], 0.5) for mode in results['modes'].values())
+    print(f'{"Inicio de Firefox" if launch else "Preparación del perfil"}: {(before - after) * 1000:.0f} ms menos por navegador ({before / max(after, 1e-9):.1f}x)')
+
+
+#---> MAIN PROCESS STARTS HERE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del perfil de cada navegador: el perfil completo de Firefox contra su plantilla con solo las cookies y el almacenamiento de YouTube y Google.')
+    parser.add_argument("--profile", help="Ruta al perfil de Firefox (PROFILE_PATH de config.ini por defecto)")
+    parser.add_argument("--synthetic-mb", help="Usa un perfil sintético del tamaño dado en MB en lugar de un perfil real", type=float)
+    parser.add_argument("--repeats", help="Número de veces que se prepara cada perfil (5 por defecto)", type=int, default=5)
+    parser.add_argument("--launch", help="Indica que se debe medir el inicio completo de un Firefox headless en lugar de solo la preparación del perfil (necesita Firefox y geckodriver)", action="store_true")
+    parser.add_argument("--seed", help="Semilla del perfil sintético", type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_path:
+        if args.synthetic_mb:
+            profile_path = os.path.join(temporary_path, 'synthetic.default-release')
+            create_synthetic_profile(profile_path, args.synthetic_mb, args.seed)
+        else:
+            config = configparser.ConfigParser()
+            config.read(os.path.join(REPOSITORY_PATH, 'config.ini'))
+            profile_path = args.profile or config.get('DEFAULT', 'PROFILE_PATH', fallback=None)
+            if not profile_path or not os.path.isdir(profile_path):
+                print('El perfil de Firefox no existe. Use --profile o --synthetic-mb.')
+                sys.exit(1)
+
+        #The template is built in a temporary folder, to measure its first build without touching the templates of the uploads
+        template_folder = get_template_folder(os.path.join(temporary_path, 'profile_templates'), profile_path)
+        print_results(run_profile_benchmark(profile_path, template_folder, max(1, args.repeats), args.launch), args.launch)
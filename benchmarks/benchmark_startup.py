@@ -0,0 +1,86 @@
+import os
+import sys
+import subprocess
+import argparse
+import statistics
+import time
+
+#The entry points are run from the repository folder, where its config.ini is
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+#---> CONSTANTS
+
+#Entry points measured: name and arguments of the Python interpreter
+ENTRY_POINTS = [('main.py --help', ['main.py', '--help']),
+                ('upload.py --help', ['upload.py', '--help']),
+                ('descarga (main + pipeline)', ['-c', 'import main, pipeline; pipeline.create_download_session(1)'])]
+
+#Modules of the browser stack that the entry points must not import
+FORBIDDEN_MODULES = ('selenium', 'selenium_firefox')
+
+
+#---> FUNCTIONS
+
+#Run a command with the Python interpreter and measure how long it takes
+def time_command(arguments):
+    """Ejecuta el intérprete de Python con los argumentos dados en la carpeta del repositorio y devuelve una tupla (seconds, imported_modules)
+    con el tiempo que tardó y los módulos que importó, leídos de la salida de -X importtime."""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime'] + arguments, cwd=REPOSITORY_PATH, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f'{" ".join(arguments)} terminó con el código {process.returncode}: {process.stderr.strip()[-500:]}')
+
+    imported_modules = set()
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and line.count('|') == 2:
+            imported_modules.add(line.rsplit('|', 1)[1].strip())
+    return seconds, imported_modules
+
+#Measure the cold start of each entry point
+def run_startup_benchmark(repeats):
+    """Ejecuta cada punto de entrada repeats veces en un proceso nuevo y devuelve una lista de diccionarios con la mediana y el mínimo de su tiempo de arranque,
+    descontando el arranque del intérprete vacío, y los módulos prohibidos que importó."""
+    baseline = statistics.median(time_command(['-c', 'pass'])[0] for _ in range(repeats))
+
+    results = []
+    for name, arguments in ENTRY_POINTS:
+        times = []
+        imported_modules = set()
+        for _ in range(repeats):
+            seconds, modules = time_command(arguments)
+            times.append(seconds)
+            imported_modules |= modules
+        forbidden = sorted(module for module in imported_modules if module.split('.')[0] in FORBIDDEN_MODULES)
+        results.append({'name': name, 'median': statistics.median(times) - baseline, 'min': min(times) - baseline, 'forbidden': forbidden})
+    return baseline, results
+
+#Print the results of the benchmark and check them against the budget
+def print_results(baseline, results, budget_ms):
+    """Muestra el tiempo de arranque de cada punto de entrada y devuelve False si alguno supera budget_ms milisegundos (mediana) o importa selenium."""
+    passed = True
+    print(f'Arranque del intérprete vacío: {baseline * 1000:.0f} ms (descontado de cada punto de entrada)')
+    print(f'{"Punto de entrada":<30}{"mediana (ms)":>14}{"mínimo (ms)":>14}  Resultado')
+    for result in results:
+        problems = []
+        if result['median'] * 1000 > budget_ms:
+            problems.append(f'supera {budget_ms:.0f} ms')
+        if result['forbidden']:
+            problems.append('importa ' + ', '.join(result['forbidden'][:3]))
+        passed = passed and not problems
+        print(f'{result["name"]:<30}{result["median"] * 1000:>14.0f}{result["min"] * 1000:>14.0f}  {"; ".join(problems) or "OK"}')
+    return passed
+
+
+#---> MAIN PROCESS STARTS HERE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del tiempo de arranque de los puntos de entrada, que falla si alguno supera el presupuesto o importa selenium.')
+    parser.add_argument("--repeats", help="Número de veces que se ejecuta cada punto de entrada (5 por defecto)", type=int, default=5)
+    parser.add_argument("--budget-ms", help="Tiempo máximo de arranque en milisegundos, sin contar el intérprete (250 por defecto)", type=float, default=250)
+    args = parser.parse_args()
+
+    baseline, results = run_startup_benchmark(max(1, args.repeats))
+    if not print_results(baseline, results, args.budget_ms):
+        sys.exit(1)
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from local_server import BenchmarkServer
+
+#Import the uploader from the repository folder
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_PATH)
+
+from selenium_firefox.firefox import Firefox
+from youtube_uploader_selenium import YouTubeUploader
+from youtube_uploader_selenium.Constant import Constant
+from youtube_uploader_selenium.lean import get_browser_options
+from youtube_uploader_selenium.timing import StepTimer, percentile
+
+#Steps of the upload form, in the normal mode and in the fast fill mode
+FORM_STEPS = ('title', 'description', 'details', 'playlist', 'next_1', 'next_2', 'next_3', 'visibility', 'next_visibility', 'video_id')
+
+#psutil is only needed to measure the memory of the browser
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+#---> FUNCTIONS
+
+#Create the video files and metadata files to upload
+def create_videos(folder_path, videos, size, playlist=None):
+    """Crea los archivos de video sintéticos y sus archivos metadata.json en la carpeta dada. Devuelve una lista de tuplas (video_path, metadata_path)."""
+    video_files = []
+    for index in range(videos):
+        video_path = os.path.join(folder_path, f'video_{index}.mp4')
+        metadata_path = os.path.join(folder_path, f'video_{index}.json')
+        with open(video_path, 'wb') as video_file:
+            video_file.write(os.urandom(size))
+        metadata = {"title": f"Video de prueba {index}", "description": f"Descripción del video {index}\nSegunda línea"}
+        if playlist:
+            metadata["playlist_title"] = playlist
+        with open(metadata_path, 'w', encoding='utf-8') as metadata_file:
+            json.dump(metadata, metadata_file)
+        video_files.append((video_path, metadata_path))
+    return video_files
+
+#Measure the memory used by a browser and its processes
+def get_browser_rss(browser):
+    """Devuelve la memoria residente (RSS) en bytes de geckodriver, Firefox y sus procesos de contenido, o None si psutil no está instalado."""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(browser.driver.service.process.pid)
+        return sum(child.memory_info().rss for child in [process] + process.children(recursive=True))
+    except psutil.Error:
+        return None
+
+#Upload the videos to the local mock of YouTube Studio with one browser
+def run_upload_benchmark(server, video_files, headless, timer, lean=False, fast_fill=False):
+    """Sube los videos al mock local de YouTube Studio con YouTubeUploader y un único navegador, sin iniciar sesión, en modo ligero si lean es True
+    y completando el formulario con scripts en la página si fast_fill es True.
+    Después de cada subida mide la memoria del navegador. Devuelve un diccionario con los resultados del benchmark."""
+    #Point the uploader to the local server instead of YouTube
+    Constant.YOUTUBE_URL = server.url('/')
+    Constant.YOUTUBE_UPLOAD_URL = server.url('/upload')
+
+    latencies = []
+    rss = []
+    uploaded = 0
+    with tempfile.TemporaryDirectory() as cookies_folder_path:
+        with timer.span('browser_launch'):
+            browser = Firefox(cookies_folder_path=cookies_folder_path, full_screen=False, headless=headless, **get_browser_options(lean))
+        start = time.perf_counter()
+        try:
+            for video_path, metadata_path in video_files:
+                video_start = time.perf_counter()
+                was_video_uploaded, video_id = YouTubeUploader(video_path, metadata_path, browser=browser, timer=timer, lean=lean, fast_fill=fast_fill).upload()
+                latencies.append(time.perf_counter() - video_start)
+                rss.append(get_browser_rss(browser))
+                if was_video_uploaded:
+                    uploaded += 1
+                print(f'{os.path.basename(video_path)}: {latencies[-1]:.2f} s (video_id = {video_id})')
+        finally:
+            elapsed = time.perf_counter() - start
+            browser.quit()
+
+    return {'videos': len(video_files), 'uploaded': uploaded, 'elapsed': elapsed, 'latencies': latencies, 'rss': [value for value in rss if value is not None],
+            'bytes': sum(os.path.getsize(video_path) for video_path, _ in video_files)}
+
+#Get the seconds spent filling the upload form of each video
+def get_form_times(timer):
+    """Devuelve una lista con los segundos que tardó en completarse el formulario de subida de cada video (los pasos de FORM_STEPS)."""
+    totals = {}
+    for span in timer.spans:
+        if span['step'] in FORM_STEPS:
+            totals[span['video']] = totals.get(span['video'], 0.0) + span['duration']
+    return list(totals.values())
+
+#Print the results of the benchmark
+def print_results(results, timer):
+    """Muestra los resultados del benchmark de subida y la duración de cada paso."""
+    latencies = results['latencies']
+    print(f'Videos subidos: {results["uploaded"]} de {results["videos"]}')
+    print(f'Tiempo total: {results["elapsed"]:.2f} s ({results["videos"] / results["elapsed"] * 60:.1f} videos/min, '
+          f'{results["bytes"] / 1024 / 1024 / results["elapsed"]:.2f} MB/s)')
+    if latencies:
+        print(f'Latencia por video: p50 {percentile(latencies, 0.5):.2f} s, p90 {percentile(latencies, 0.9):.2f} s, máximo {max(latencies):.2f} s')
+    form_times = get_form_times(timer)
+    if form_times:
+        print(f'Formulario por video: p50 {percentile(form_times, 0.5):.2f} s, máximo {max(form_times):.2f} s')
+    if results['rss']:
+        print(f'Memoria del navegador (RSS): máximo {max(results["rss"]) / 1024 / 1024:.0f} MB')
+    print(f'{"Paso":<18}{"n":>4}{"p50 (s)":>10}{"p90 (s)":>10}{"total (s)":>12}')
+    for step, summary in timer.get_step_summary().items():
+        print(f'{step:<18}{summary["count"]:>4}{summary["p50"]:>10.3f}{summary["p90"]:>10.3f}{summary["sum"]:>12.3f}')
+
+#Print the difference between the sessions with and without the lean or fast fill modes
+def print_comparison(full_results, full_timer, lean_results, lean_timer, mode_name='ligero'):
+    """Muestra la memoria máxima del navegador, el tiempo hasta que la página de subida está lista, el tiempo del formulario y la latencia por video
+    de la sesión normal y de la sesión con los modos indicados por mode_name."""
+    def get_page_ready(timer):
+        summary = timer.get_step_summary().get('open_upload_page')
+        return summary['p50'] if summary else 0.0
+
+    rows = [('RSS máximo (MB)', [max(results['rss']) / 1024 / 1024 if results['rss'] else None for results in (full_results, lean_results)]),
+            ('Página lista p50 (s)', [get_page_ready(timer) for timer in (full_timer, lean_timer)]),
+            ('Formulario p50 (s)', [percentile(get_form_times(timer), 0.5) for timer in (full_timer, lean_timer)]),
+            ('Latencia p50 (s)', [percentile(results['latencies'], 0.5) if results['latencies'] else None for results in (full_results, lean_results)])]
+    print(f'{"":<22}{"normal":>10}{mode_name:>10}{"cambio":>10}')
+    for name, (full_value, lean_value) in rows:
+        if full_value is None or lean_value is None:
+            print(f'{name:<22}{"--":>10}{"--":>10}{"--":>10}')
+            continue
+        change = f'{(lean_value - full_value) / full_value * 100:+.0f}%' if full_value else '--'
+        print(f'{name:<22}{full_value:>10.2f}{lean_value:>10.2f}{change:>10}')
+
+
+#---> MAIN PROCESS STARTS HERE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de YouTubeUploader contra un mock local del diálogo de subida de YouTube Studio, sin red.')
+    parser.add_argument("--videos", help="Número de videos a subir (5 por defecto)", type=int, default=5)
+    parser.add_argument("--size-mb", help="Tamaño de cada video en MB (1 por defecto)", type=float, default=1)
+    parser.add_argument("--upload-seconds", help="Segundos que tarda la barra de progreso del mock en llegar al 100%% (3 por defecto)", type=float, default=3.0)
+    parser.add_argument("--latency", help="Latencia de cada petición al servidor local en segundos (0 por defecto)", type=float, default=0.0)
+    parser.add_argument("--playlist", help="Lista de reproducción a seleccionar en cada video")
+    parser.add_argument("--noheadless", help="Indica que Firefox no se debe ejecutar en modo headless", action="store_false")
+    parser.add_argument("--trace", help="Ruta al archivo donde se exporta la duración de cada paso como líneas JSON")
+    parser.add_argument("--lean", help="Indica que Firefox se debe ejecutar en modo ligero, sin imágenes, fuentes ni peticiones innecesarias", action="store_true")
+    parser.add_argument("--fast-fill", help="Indica que el formulario se debe completar con scripts ejecutados en la página", action="store_true")
+    parser.add_argument("--compare", help="Sube los videos en modo normal y con los modos --lean y --fast-fill indicados (el modo ligero si no se indica ninguno) "
+                                          "y compara la memoria del navegador, el tiempo de carga de la página y el del formulario (requiere psutil para la memoria)", action="store_true")
+    args = parser.parse_args()
+
+    timer = StepTimer()
+    with tempfile.TemporaryDirectory() as folder_path, \
+            BenchmarkServer(latency=args.latency, upload_seconds=args.upload_seconds) as server:
+        video_files = create_videos(folder_path, max(1, args.videos), int(args.size_mb * 1024 * 1024), args.playlist)
+        if args.compare:
+            lean = args.lean or not args.fast_fill
+            mode_name = ' + '.join(name for name, enabled in (('ligero', lean), ('rápido', args.fast_fill)) if enabled)
+            lean_timer = StepTimer()
+            full_results = run_upload_benchmark(server, video_files, args.noheadless, timer)
+            lean_results = run_upload_benchmark(server, video_files, args.noheadless, lean_timer, lean=lean, fast_fill=args.fast_fill)
+        else:
+            results = run_upload_benchmark(server, video_files, args.noheadless, timer, args.lean, args.fast_fill)
+
+    if args.compare:
+        print_comparison(full_results, timer, lean_results, lean_timer, mode_name)
+    else:
+        print_results(results, timer)
+        if args.trace:
+            timer.write_json_lines(args.trace)
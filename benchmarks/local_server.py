@@ -0,0 +1,248 @@
+import hashlib
+import http.server
+import os
+import random
+import re
+import struct
+import threading
+import time
+import urllib.parse
+
+
+#---> CONSTANTS
+
+#Size of the block of random bytes repeated to build the synthetic files
+BLOCK_SIZE = 1024 * 1024
+
+#Size of each write to the socket, which is the unit of the bandwidth limit
+SEND_CHUNK_SIZE = 64 * 1024
+
+#Static mock of the YouTube Studio upload dialog
+STUDIO_MOCK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'studio_mock.html')
+
+HOME_PAGE = b'<!DOCTYPE html><html><head><title>Local YouTube</title></head><body><h1>Local YouTube</h1></body></html>'
+
+
+#---> CLASSES
+
+class SyntheticFile:
+    """Archivo sintético de tamaño dado cuyo contenido se genera a partir de su nombre, sin guardarlo en memoria ni en disco.
+    Empieza con las cajas ftyp, moov y mdat de un MP4, y el resto del archivo es el contenido de la caja mdat."""
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.etag = '"' + hashlib.sha1(f'{name}:{size}'.encode()).hexdigest()[:16] + '"'
+        self.block = random.Random(name).randbytes(BLOCK_SIZE)
+        ftyp = struct.pack('>I4s4sI4s4s', 24, b'ftyp', b'isom', 512, b'isom', b'mp41')
+        moov = struct.pack('>I4s', 16, b'moov') + bytes(8)
+        self.header = ftyp + moov + struct.pack('>I4s', size - len(ftyp) - len(moov), b'mdat')
+
+    def read(self, start, end):
+        """Devuelve los bytes desde start hasta end (sin incluir end)."""
+        offset = start % BLOCK_SIZE
+        data = bytearray()
+        while len(data) < end - start:
+            data += self.block[offset:offset + (end - start - len(data))]
+            offset = 0
+        if start < len(self.header):
+            header = self.header[start:end]
+            data[:len(header)] = header
+        return bytes(data)
+
+    def checksum(self):
+        """Calcula el checksum SHA-256 del contenido del archivo."""
+        sha256 = hashlib.sha256()
+        for start in range(0, self.size, BLOCK_SIZE):
+            sha256.update(self.read(start, min(start + BLOCK_SIZE, self.size)))
+        return sha256.hexdigest()
+
+
+class BenchmarkServer:
+    """Servidor HTTP local que reemplaza al host de descarga y a YouTube Studio en los benchmarks.
+    /files/<nombre> sirve archivos sintéticos de file_size bytes con un ancho de banda (bytes/s por conexión), una latencia y una tasa de fallos configurables,
+    con o sin soporte de Range. / sirve una página de inicio vacía y /upload el mock del diálogo de subida, cuya barra de progreso tarda upload_seconds segundos."""
+
+    def __init__(self, file_size=10 * 1024 * 1024, bandwidth=None, latency=0.0, failure_rate=0.0, error_rate=0.0,
+                 support_ranges=True, upload_seconds=3.0, seed=None):
+        self.file_size = file_size
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+        self.support_ranges = support_ranges
+        self.upload_seconds = upload_seconds
+        self.random = random.Random(seed)
+        self.files = {}
+        self.lock = threading.Lock()
+        self.bytes_sent = 0
+        self.requests = 0
+        self.failures = 0
+        self.server = None
+
+    def start(self):
+        """Inicia el servidor en un puerto libre en segundo plano y devuelve su URL base."""
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), create_handler(self))
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def url(self, path):
+        return self.base_url + '/' + path.lstrip('/')
+
+    def file_url(self, name):
+        return self.url('files/' + urllib.parse.quote(name))
+
+    def get_file(self, name):
+        """Devuelve el archivo sintético con el nombre dado, creándolo la primera vez."""
+        with self.lock:
+            if name not in self.files:
+                self.files[name] = SyntheticFile(name, self.file_size)
+            return self.files[name]
+
+    def should_fail(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def count(self, bytes_sent=0, requests=0, failures=0):
+        with self.lock:
+            self.bytes_sent += bytes_sent
+            self.requests += requests
+            self.failures += failures
+
+    def render_studio_mock(self):
+        with open(STUDIO_MOCK_PATH, 'rb') as mock_file:
+            return mock_file.read().replace(b'{{UPLOAD_SECONDS}}', str(self.upload_seconds).encode())
+
+
+#---> FUNCTIONS
+
+#Parse the first range of a Range header
+def parse_range(range_header, size):
+    """Devuelve el rango (start, end) de la cabecera Range, con end exclusivo, o None si no es válido o no cabe en el archivo."""
+    match = re.match(r'bytes=(\d*)-(\d*)', range_header or '')
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    if not match.group(1):
+        start, end = max(0, size - int(match.group(2))), size
+    else:
+        start = int(match.group(1))
+        end = min(size, int(match.group(2)) + 1) if match.group(2) else size
+    return (start, end) if start < end else None
+
+#Create the request handler class bound to a benchmark server
+def create_handler(benchmark_server):
+    """Crea la clase que atiende las peticiones del servidor de benchmark dado."""
+
+    class BenchmarkRequestHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_HEAD(self):
+            self.handle_request(send_body=False)
+
+        def do_GET(self):
+            self.handle_request(send_body=True)
+
+        def handle_request(self, send_body):
+            benchmark_server.count(requests=1)
+            if benchmark_server.latency:
+                time.sleep(benchmark_server.latency)
+
+            path = urllib.parse.urlparse(self.path).path
+            if path in ('/', ''):
+                self.send_page(HOME_PAGE, send_body)
+            elif path.startswith('/upload'):
+                self.send_page(benchmark_server.render_studio_mock(), send_body)
+            elif path.startswith('/files/'):
+                self.send_file(benchmark_server.get_file(urllib.parse.unquote(path[len('/files/'):])), send_body)
+            else:
+                self.send_error(404)
+
+        def send_page(self, content, send_body):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(content)
+
+        def send_file(self, synthetic_file, send_body):
+            if send_body and benchmark_server.should_fail(benchmark_server.error_rate):
+                benchmark_server.count(failures=1)
+                self.send_error(503)
+                return
+
+            start, end = 0, synthetic_file.size
+            byte_range = None
+            if benchmark_server.support_ranges and self.headers.get('Range'):
+                if_range = self.headers.get('If-Range')
+                if if_range is None or if_range == synthetic_file.etag:
+                    byte_range = parse_range(self.headers.get('Range'), synthetic_file.size)
+                    if byte_range is None:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{synthetic_file.size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+
+            if byte_range is not None:
+                start, end = byte_range
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{end - 1}/{synthetic_file.size}')
+            else:
+                self.send_response(200)
+            self.send_header('Content-Type', 'video/mp4')
+            self.send_header('Content-Length', str(end - start))
+            self.send_header('ETag', synthetic_file.etag)
+            self.send_header('Accept-Ranges', 'bytes' if benchmark_server.support_ranges else 'none')
+            self.end_headers()
+            if not send_body:
+                return
+
+            #Cut the connection at a random point to simulate a dropped download
+            if benchmark_server.should_fail(benchmark_server.failure_rate):
+                benchmark_server.count(failures=1)
+                with benchmark_server.lock:
+                    end = start + int((end - start) * benchmark_server.random.random())
+                self.close_connection = True
+
+            try:
+                self.send_bytes(synthetic_file, start, end)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+        def send_bytes(self, synthetic_file, start, end):
+            """Envía los bytes del archivo por partes, limitando la velocidad al ancho de banda del servidor."""
+            send_start = time.perf_counter()
+            position = start
+            while position < end:
+                chunk = synthetic_file.read(position, min(position + SEND_CHUNK_SIZE, end))
+                self.wfile.write(chunk)
+                position += len(chunk)
+                benchmark_server.count(bytes_sent=len(chunk))
+                if benchmark_server.bandwidth:
+                    delay = (position - start) / benchmark_server.bandwidth - (time.perf_counter() - send_start)
+                    if delay > 0:
+                        time.sleep(delay)
+
+    return BenchmarkRequestHandler
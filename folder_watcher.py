@@ -0,0 +1,52 @@
+import os
+
+
+#---> FUNCTIONS
+
+#Get the signature of each JSON file in a folder
+def scan_json_files(folder_path):
+    """Devuelve un diccionario {ruta: (tamaño, fecha de modificación)} con los archivos JSON de la carpeta dada."""
+    files = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith('.json'):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_size, stat.st_mtime)
+    return files
+
+#Get the signature of the video of each video folder in a folder
+def scan_video_folders(folder_path):
+    """Devuelve un diccionario {carpeta: (tamaño, fecha de modificación)} con las carpetas de la carpeta dada que contienen un video con su mismo nombre (carpeta/carpeta.mp4)."""
+    folders = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                stat = os.stat(os.path.join(entry.path, entry.name + '.mp4'))
+            except OSError:
+                continue
+            folders[entry.name] = (stat.st_size, stat.st_mtime)
+    return folders
+
+
+#---> CLASSES
+
+class ChangeDetector:
+    """Detecta las entradas nuevas o modificadas entre sondeos sucesivos de una carpeta, a partir de la firma (tamaño y fecha de modificación) de cada entrada.
+    Una entrada se entrega cuando su firma no cambió desde el sondeo anterior, es decir, cuando se terminó de copiar, y solo una vez por firma."""
+
+    def __init__(self):
+        self.previous = {}
+        self.delivered = {}
+
+    def update(self, snapshot):
+        """Recibe las firmas del sondeo actual y devuelve, ordenadas, las entradas que se terminaron de copiar desde la última entrega."""
+        stable = sorted(key for key, signature in snapshot.items() if self.previous.get(key) == signature and self.delivered.get(key) != signature)
+        for key in stable:
+            self.delivered[key] = snapshot[key]
+
+        #Forget the deleted entries, so they are delivered again if they come back
+        self.delivered = {key: signature for key, signature in self.delivered.items() if key in snapshot}
+        self.previous = snapshot
+        return stable
@@ -0,0 +1,174 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+#---> CONSTANTS
+
+#States of the download and upload of a job
+PENDING = 'pending'
+DOWNLOADED = 'downloaded'
+UPLOADED = 'uploaded'
+FAILED = 'failed'
+REJECTED = 'rejected'
+
+#Schema of the jobs database
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    folder TEXT NOT NULL UNIQUE,
+    file_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    metadata TEXT,
+    position INTEGER NOT NULL DEFAULT 0,
+    size INTEGER,
+    checksum TEXT,
+    expected_checksum TEXT,
+    download_state TEXT NOT NULL DEFAULT 'pending',
+    download_attempts INTEGER NOT NULL DEFAULT 0,
+    upload_state TEXT NOT NULL DEFAULT 'pending',
+    upload_attempts INTEGER NOT NULL DEFAULT 0,
+    video_id TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_download_state ON jobs (download_state, position);
+CREATE INDEX IF NOT EXISTS jobs_upload_state ON jobs (download_state, upload_state, folder);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    modified_at REAL NOT NULL,
+    registered_at REAL NOT NULL
+);
+"""
+
+#Columns added after the first version of the schema, created in the databases of previous versions
+ADDED_COLUMNS = {'expected_checksum': 'TEXT'}
+
+
+#---> CLASSES
+
+class JobStore:
+    """Base de datos SQLite con el estado de la descarga y la subida de cada video (URL, ruta local, tamaño, checksum, estados, video_id e intentos).
+    Permite retomar el proceso exactamente donde se detuvo la ejecución anterior. Puede usarse desde varios hilos."""
+
+    def __init__(self, database_path):
+        self.database_path = database_path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.executescript(SCHEMA)
+            columns = [row['name'] for row in self.connection.execute('PRAGMA table_info(jobs)')]
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.connection.execute(f'ALTER TABLE jobs ADD COLUMN {column} {column_type}')
+
+    def close(self):
+        """Cierra la conexión a la base de datos."""
+        with self.lock:
+            self.connection.close()
+
+    def __execute(self, sql, parameters=()):
+        with self.lock, self.connection:
+            return self.connection.execute(sql, parameters)
+
+    def __executemany(self, sql, parameters):
+        with self.lock, self.connection:
+            return self.connection.executemany(sql, parameters)
+
+    def __query(self, sql, parameters=()):
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, parameters).fetchall()]
+
+    def is_empty(self):
+        """Devuelve True si la base de datos no tiene ningún trabajo."""
+        return len(self.__query('SELECT 1 FROM jobs LIMIT 1')) == 0
+
+    def add_job(self, url, folder, file_name, file_path, metadata=None, position=0, expected_checksum=None):
+        """Registra un video con su descarga y subida pendientes y, opcionalmente, el checksum SHA-256 que debe tener. Si la URL ya estaba registrada, conserva su estado y devuelve False."""
+        now = time.time()
+        cursor = self.__execute('INSERT OR IGNORE INTO jobs (url, folder, file_name, file_path, metadata, position, expected_checksum, created_at, updated_at) '
+                                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                (url, folder, file_name, file_path, json.dumps(metadata) if metadata is not None else None, position, expected_checksum, now, now))
+        return cursor.rowcount > 0
+
+    def add_jobs(self, jobs):
+        """Registra varios videos en una sola transacción. Cada trabajo es una tupla (url, folder, file_name, file_path, metadata, position, expected_checksum).
+        Conserva el estado de las URL ya registradas y devuelve el número de trabajos nuevos."""
+        now = time.time()
+        cursor = self.__executemany('INSERT OR IGNORE INTO jobs (url, folder, file_name, file_path, metadata, position, expected_checksum, created_at, updated_at) '
+                                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                    [(url, folder, file_name, file_path, json.dumps(metadata) if metadata is not None else None, position, expected_checksum, now, now)
+                                     for url, folder, file_name, file_path, metadata, position, expected_checksum in jobs])
+        return max(cursor.rowcount, 0)
+
+    def get_urls(self):
+        """Devuelve el conjunto de URL registradas."""
+        with self.lock:
+            return {row[0] for row in self.connection.execute('SELECT url FROM jobs')}
+
+    def get_folders(self):
+        """Devuelve el conjunto de carpetas registradas."""
+        with self.lock:
+            return {row[0] for row in self.connection.execute('SELECT folder FROM jobs')}
+
+    def is_source_registered(self, path, size, modified_at):
+        """Devuelve True si los videos del archivo JSON de la ruta dada ya se registraron y el archivo no cambió desde entonces."""
+        sources = self.__query('SELECT 1 FROM sources WHERE path = ? AND size = ? AND modified_at = ?', (path, size, modified_at))
+        return len(sources) > 0
+
+    def mark_source_registered(self, path, size, modified_at):
+        """Guarda el tamaño y la fecha de modificación del archivo JSON cuyos videos se registraron."""
+        self.__execute('INSERT OR REPLACE INTO sources (path, size, modified_at, registered_at) VALUES (?, ?, ?, ?)', (path, size, modified_at, time.time()))
+
+    def get_job(self, url):
+        """Devuelve el trabajo de la URL dada o None si no está registrado."""
+        jobs = self.__query('SELECT * FROM jobs WHERE url = ?', (url,))
+        return jobs[0] if jobs else None
+
+    def get_job_by_folder(self, folder):
+        """Devuelve el trabajo de la carpeta dada o None si no está registrada."""
+        jobs = self.__query('SELECT * FROM jobs WHERE folder = ?', (folder,))
+        return jobs[0] if jobs else None
+
+    def get_pending_downloads(self):
+        """Devuelve los trabajos cuya descarga no ha terminado ni fue rechazada por un error fatal, en el orden en que se registraron."""
+        return self.__query('SELECT * FROM jobs WHERE download_state NOT IN (?, ?) ORDER BY position, url', (DOWNLOADED, REJECTED))
+
+    def get_ready_uploads(self):
+        """Devuelve los trabajos descargados que aún no se han subido ni fueron rechazados por YouTube, ordenados por nombre de carpeta."""
+        return self.__query('SELECT * FROM jobs WHERE download_state = ? AND upload_state NOT IN (?, ?) ORDER BY folder', (DOWNLOADED, UPLOADED, REJECTED))
+
+    def mark_downloaded(self, url, size, checksum):
+        """Marca la descarga de la URL como terminada y guarda el tamaño y el checksum del archivo."""
+        self.__execute('UPDATE jobs SET download_state = ?, size = ?, checksum = ?, download_attempts = download_attempts + 1, last_error = NULL, updated_at = ? '
+                       'WHERE url = ?', (DOWNLOADED, size, checksum, time.time(), url))
+
+    def mark_download_failed(self, url, error=None):
+        """Marca la descarga de la URL como fallida y suma un intento."""
+        self.__execute('UPDATE jobs SET download_state = ?, download_attempts = download_attempts + 1, last_error = ?, updated_at = ? WHERE url = ?',
+                       (FAILED, error, time.time(), url))
+
+    def mark_download_rejected(self, url, error):
+        """Marca la descarga de la URL como rechazada por un error fatal y suma un intento. No se vuelve a descargar en las siguientes ejecuciones."""
+        self.__execute('UPDATE jobs SET download_state = ?, download_attempts = download_attempts + 1, last_error = ?, updated_at = ? WHERE url = ?',
+                       (REJECTED, error, time.time(), url))
+
+    def mark_uploaded(self, folder, video_id):
+        """Marca la subida del video de la carpeta como terminada y guarda su video_id."""
+        self.__execute('UPDATE jobs SET upload_state = ?, video_id = ?, upload_attempts = upload_attempts + 1, last_error = NULL, updated_at = ? '
+                       'WHERE folder = ?', (UPLOADED, video_id, time.time(), folder))
+
+    def mark_upload_failed(self, folder, error=None):
+        """Marca la subida del video de la carpeta como fallida y suma un intento."""
+        self.__execute('UPDATE jobs SET upload_state = ?, upload_attempts = upload_attempts + 1, last_error = ?, updated_at = ? WHERE folder = ?',
+                       (FAILED, error, time.time(), folder))
+
+    def mark_upload_rejected(self, folder, error):
+        """Marca la subida del video de la carpeta como rechazada por YouTube (por ejemplo, un duplicado) y suma un intento. No se vuelve a subir en las siguientes ejecuciones."""
+        self.__execute('UPDATE jobs SET upload_state = ?, upload_attempts = upload_attempts + 1, last_error = ?, updated_at = ? WHERE folder = ?',
+                       (REJECTED, error, time.time(), folder))
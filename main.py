@@ -1,104 +1,56 @@
 import os
-import configparser
 import argparse
-import shutil
-import time
-import json
-import requests
+import signal
+import threading
 import colorama
 
-from youtube_uploader_selenium import YouTubeUploader
-from urllib.parse import urlparse
+from pipeline import Pipeline, PipelineConfig
+from youtube_uploader_selenium.timing import StepTimer
 
 
-#---> GLOBAL VARIABLES
-
-#Create a ConfigParser object
-config = configparser.ConfigParser()
-
-#Read the config.ini file
-config.read('config.ini')
-
-#Get the values from the config.ini file
-PROFILE_PATH = config.get('DEFAULT', 'PROFILE_PATH')
-VIDEOS_FOLDER_PATH = config.get('DEFAULT', 'VIDEOS_FOLDER_PATH')
-PERIOD_STR = config.get('DEFAULT', 'PERIOD_STR')
-LOWERCASE_WORDS = [word.strip() for word in config.get('WORDS', 'LOWERCASE').split(',')]
-UPPERCASE_WORDS = [word.strip() for word in config.get('WORDS', 'UPPERCASE').split(',')]
-
-#Initialize colorama
-colorama.init()
+#---> FUNCTIONS
 
+#Print the aggregate throughput of the uploaded videos
+def print_upload_throughput(transferred_bytes, transfer_time):
+    """Muestra la velocidad media de subida de todos los videos subidos."""
+    if transfer_time <= 0:
+        return
+    print(colorama.Fore.CYAN + f'Velocidad media de subida: {transferred_bytes / transfer_time / (1024 * 1024):.2f} MB/s '
+          f'({transferred_bytes / (1024 * 1024):.1f} MB en {int(transfer_time)} segundos)')
+
+#Print the percentiles of the upload time per video and export the timings of each step
+def report_upload_timings(timer, trace_path=None, trace_format='jsonl'):
+    """Muestra los percentiles del tiempo de subida por video y, si se indicó trace_path, exporta la duración de cada paso como líneas JSON (jsonl) o en formato OpenMetrics (openmetrics)."""
+    video_summary = timer.get_video_summary()
+    if video_summary['count'] > 0:
+        print(colorama.Fore.CYAN + f'Tiempo de subida por video: p50 {video_summary["p50"]:.1f} s, p90 {video_summary["p90"]:.1f} s, máximo {video_summary["max"]:.1f} s')
+
+    if trace_path:
+        if trace_format == 'openmetrics':
+            timer.write_openmetrics(trace_path)
+        else:
+            timer.write_json_lines(trace_path)
+        print(colorama.Fore.CYAN + f'Tiempos de cada paso guardados en {trace_path}')
 
-#---> FUNCTIONS
+#Print a list of videos with its title if it is not empty
+def print_video_list(title, videos):
+    """Muestra la lista de videos dada con su título, si no está vacía."""
+    if len(videos) > 0:
+        print(colorama.Fore.MAGENTA + '************************************************')
+        print(colorama.Fore.WHITE + '---> ' + str(len(videos)) + ' ' + title + ':')
+        print(colorama.Fore.YELLOW + str(videos))
 
-#List all folders in the directory
-def list_folders(folder_path):
-    """Devuelve una lista de todas las carpetas en el directorio dado."""
-    elements = os.listdir(folder_path)
-    folders = [elem for elem in elements if os.path.isdir(os.path.join(folder_path, elem))]
-    return folders
-
-#Delete all files and folders in the directory
-def delete_all_files_and_folders(folder_path):
-    """Elimina todos los archivos y carpetas en el directorio dado."""
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        try:
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.unlink(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-        except Exception as e:
-            print(colorama.Fore.RED + f'ERROR al eliminar {file_path}. Razón: {e}')
-
-#Read a json file
-def read_json_file(file_path):
-    """Lee un archivo JSON y devuelve los datos."""
-    with open(file_path, 'r', encoding="utf8") as file:
-        json_obj = json.load(file)
-    return json_obj
-
-#Write a json file
-def write_json(file_path, data):
-    """Escribe los datos en un archivo JSON."""
-    with open(file_path, 'w', encoding="utf-8") as file:
-        json.dump(data, file)
-    return file_path
-
-#Get the file name from the last part of the url
-def get_file_name_from_url(url):
-    """Obtiene el nombre del archivo de la última parte de la URL dada."""
-    return os.path.basename(urlparse(url).path)
-
-#Download a file from a url and save it in videos folder
-def download_file(url, file_name):
-    """Descarga un archivo de una URL y lo guarda en la carpeta de videos. Si hay un error al descargar, devuelve False. Si se descarga correctamente, devuelve True."""
-    file_path = os.path.join(VIDEOS_FOLDER_PATH, os.path.splitext(file_name)[0], file_name)
-    file_dir = os.path.dirname(file_path)
-
-    try:
-        if not os.path.exists(file_dir):
-            os.makedirs(file_dir)
-
-        r = requests.get(url)
-        with open(file_path, 'wb') as file:
-            file.write(r.content)
-
-        return True
-
-    except Exception as e:
-        print(colorama.Fore.RED + f'ERROR al descargar {file_name}. Razón: {e}')
-        return False
-
-#Format a string as title, keeping some words in lowercase and others in uppercase
-def format_string_as_title(str):
-    """Formatea una cadena de texto como título, manteniendo algunas palabras en minúsculas y otras en mayúsculas."""
-    words = str.title().split()
-    formatted_words = [word.upper() if word.upper() in UPPERCASE_WORDS else 
-                       word.lower() if i != 0 and word.lower() in LOWERCASE_WORDS else 
-                       word for i, word in enumerate(words)]
-    return " ".join(formatted_words)
+#Print the end of the process with its elapsed time
+def print_process_end(message, elapsed, transferred_bytes=0, transfer_time=0, timer=None, trace_path=None, trace_format='jsonl'):
+    """Muestra el fin del proceso con el tiempo transcurrido y, si se subieron videos, la velocidad media de subida y los tiempos de cada paso."""
+    print(colorama.Fore.MAGENTA + '************************************************')
+    print(colorama.Fore.WHITE + '---> ' + message)
+    hours, minutes, seconds = calculate_elapsed_time(0, elapsed)
+    print(colorama.Fore.CYAN + f'Tiempo total transcurrido: {hours} horas, {minutes} minutos y {seconds} segundos')
+    print_upload_throughput(transferred_bytes, transfer_time)
+    if timer is not None:
+        report_upload_timings(timer, trace_path, trace_format)
+    print(colorama.Fore.MAGENTA + '************************************************')
 
 #Calculate the elapsed time
 def calculate_elapsed_time(start, end):
@@ -109,278 +61,205 @@ def calculate_elapsed_time(start, end):
     seconds = int(elapsed_time % 60)
     return hours, minutes, seconds
 
+#Set the stop event on SIGTERM or Ctrl+C
+def install_stop_handlers(stop_event):
+    """Activa stop_event con la primera señal SIGTERM o SIGINT (Ctrl+C) para detener el proceso al terminar el trabajo en curso. La segunda señal usa su acción por defecto."""
+    def stop(signum, frame):
+        print(colorama.Fore.YELLOW + '\nAVISO: Deteniendo el proceso al terminar la subida y las descargas en curso...')
+        signal.signal(signum, signal.SIG_DFL)
+        stop_event.set()
 
-#---> MAIN PROCESS STARTS HERE
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
 
-#Create the argument parser
-parser = argparse.ArgumentParser()
 
-#Add the arguments to the parser
-parser.add_argument("--json", help="Ruta al archivo JSON")
-parser.add_argument("--download", help="Indica si solo se debe ejecutar el proceso de descarga de videos", action="store_true")
-parser.add_argument("--upload", help="Indica si solo se debe ejecutar el proceso de subida de videos", action="store_true")
-parser.add_argument("--noheadless", help="Indica que Firefox no se debe ejecutar en modo headless", action="store_false")
-
-#Parse the arguments
-args = parser.parse_args()
-
-#Get the json file path from the arguments
-json_file_path = args.json
-
-#Get the download flag from the arguments (False by default)
-download = args.download
-
-#Get the upload flag from the arguments (False by default)
-upload = args.upload
-
-#Get the headless mode flag from the arguments (True by default)
-headless_mode = args.noheadless
+#---> MAIN PROCESS STARTS HERE
 
-#Check if the json file path or the upload flag was provided
-if not json_file_path and not upload:
-    print(colorama.Fore.CYAN + 'Debe proporcionar la ruta al archivo JSON o usar el argumento --upload.')
-    print('Ejemplo: python main.py --json "C:\\Users\\user\\Desktop\\videos.json"')
-    exit()
+def main():
+    """Ejecuta el proceso de descarga y subida de videos según los argumentos de la línea de comandos."""
+
+    #Initialize colorama
+    colorama.init()
+
+    #Create the argument parser
+    parser = argparse.ArgumentParser()
+
+    #Add the arguments to the parser
+    parser.add_argument("--json", help="Ruta al archivo JSON")
+    parser.add_argument("--download", help="Indica si solo se debe ejecutar el proceso de descarga de videos", action="store_true")
+    parser.add_argument("--upload", help="Indica si solo se debe ejecutar el proceso de subida de videos", action="store_true")
+    parser.add_argument("--noheadless", help="Indica que Firefox no se debe ejecutar en modo headless", action="store_false")
+    parser.add_argument("--download-workers", help="Número de videos que se descargan en paralelo (1 por defecto)", type=int, default=1)
+    parser.add_argument("--download-segments", help="Número de conexiones en paralelo con las que se descarga cada video de al menos SEGMENTED_DOWNLOAD_MIN_MB (DOWNLOAD_SEGMENTS de config.ini por defecto)", type=int)
+    parser.add_argument("--pipeline", help="Indica que los videos se deben subir a medida que se descargan, en lugar de esperar a que terminen todas las descargas", action="store_true")
+    parser.add_argument("--queue-size", help="Número máximo de videos descargados en espera de ser subidos en el modo --pipeline (2 por defecto)", type=int, default=2)
+    parser.add_argument("--profiles", help="Indica que los videos se deben subir en paralelo con todos los perfiles [PROFILE:nombre] del archivo config.ini, un proceso por perfil", action="store_true")
+    parser.add_argument("--max-staging-gb", help="Espacio máximo en GB que pueden ocupar los videos descargados en espera de ser subidos (sin límite por defecto)", type=float)
+    parser.add_argument("--trace", help="Ruta al archivo donde se exporta la duración de cada paso de la subida de cada video")
+    parser.add_argument("--trace-format", help="Formato del archivo de --trace: líneas JSON (jsonl, por defecto) u OpenMetrics (openmetrics)", choices=["jsonl", "openmetrics"], default="jsonl")
+    parser.add_argument("--watch", help="Ruta a una carpeta que se vigila de forma permanente para descargar y subir los videos de cada archivo JSON que se copie en ella")
+    parser.add_argument("--poll-interval", help="Segundos entre cada revisión de la carpeta de --watch (5 por defecto)", type=float, default=5)
+    parser.add_argument("--lean-browser", help="Indica que Firefox no debe cargar imágenes, fuentes, videos ni las peticiones que el diálogo de subida no necesita (LEAN_BROWSER de config.ini por defecto)", action="store_true")
+    parser.add_argument("--fast-fill", help="Indica que el formulario de cada subida se debe completar con scripts ejecutados en la página, en lugar de un comando de Firefox por cada paso (FAST_FILL de config.ini por defecto)", action="store_true")
+    parser.add_argument("--profile-template", help="Indica que cada navegador debe clonar una plantilla del perfil de Firefox con solo las cookies y el almacenamiento de YouTube y Google, en lugar de copiar el perfil completo (PROFILE_TEMPLATE de config.ini por defecto)", action="store_true")
+    parser.add_argument("--wait-for-quota", help="Indica que, al alcanzar el límite de subida del canal, se debe esperar a que se libere un espacio en lugar de detener la subida", action="store_true")
+
+    #Parse the arguments
+    args = parser.parse_args()
+
+    #Get the json file path, the download flag and the upload flag from the arguments
+    json_file_path = args.json
+    download = args.download
+    upload = args.upload
+
+    #Get the path and the format of the file to export the timings of the upload steps from the arguments (not exported by default)
+    trace_path = args.trace
+    trace_format = args.trace_format
+
+    #Get the folder to watch from the arguments (not watched by default)
+    watch_folder_path = args.watch
+
+    #Read the config.ini file and add the options of the arguments
+    config = PipelineConfig.from_file('config.ini',
+                                      headless=args.noheadless,
+                                      download_workers=args.download_workers,
+                                      queue_size=args.queue_size,
+                                      use_profiles=args.profiles,
+                                      wait_for_quota=args.wait_for_quota,
+                                      max_staging_bytes=int(args.max_staging_gb * 1024 ** 3) if args.max_staging_gb else None,
+                                      poll_interval=args.poll_interval)
+
+    #The lean browser can be enabled in the config.ini file or with the argument
+    config.lean_browser = config.lean_browser or args.lean_browser
+
+    #The fast fill of the upload form can be enabled in the config.ini file or with the argument
+    config.fast_fill = config.fast_fill or args.fast_fill
+
+    #The profile template can be enabled in the config.ini file or with the argument
+    config.profile_template = config.profile_template or args.profile_template
+
+    #The number of segments of the argument replaces the one of the config.ini file
+    if args.download_segments is not None:
+        config.download_segments = max(1, args.download_segments)
+
+    #Check if the json file path, the upload flag or the watch folder was provided
+    if not json_file_path and not upload and not watch_folder_path:
+        print(colorama.Fore.CYAN + 'Debe proporcionar la ruta al archivo JSON o usar el argumento --upload o --watch.')
+        print('Ejemplo: python main.py --json "C:\\Users\\user\\Desktop\\videos.json"')
+        exit()
 
-#Check if PROFILE_PATH exists
-if not os.path.exists(PROFILE_PATH):
-    print(colorama.Fore.YELLOW + 'El perfil de Firefox no existe. Verifique el archivo config.ini.')
-    exit()
+    #Check if PROFILE_PATH exists
+    if not config.profile_path or not os.path.exists(config.profile_path):
+        print(colorama.Fore.YELLOW + 'El perfil de Firefox no existe. Verifique el archivo config.ini.')
+        exit()
 
+    #Check if the upload limits of the config.ini file allow at least one upload
+    if config.daily_upload_limit < 1 or any(profile['daily_upload_limit'] < 1 for profile in config.upload_profiles):
+        print(colorama.Fore.YELLOW + 'DAILY_UPLOAD_LIMIT debe ser de al menos 1 video. Verifique el archivo config.ini.')
+        exit()
 
-#If the upload flag was not provided, execute the DOWNLOAD process first
-if not upload:
+    #Check if the profiles of the config.ini file exist
+    if config.use_profiles:
+        if len(config.upload_profiles) == 0:
+            print(colorama.Fore.YELLOW + 'No hay secciones [PROFILE:nombre] en el archivo config.ini.')
+            exit()
+        for profile in config.upload_profiles:
+            if not os.path.exists(profile['profile_path']):
+                print(colorama.Fore.YELLOW + f'El perfil de Firefox {profile["name"]} no existe. Verifique el archivo config.ini.')
+                exit()
 
-    #Check if the json file exists
-    if not os.path.exists(json_file_path):
+    #Check if the json file exists when it is needed
+    if not upload and not watch_folder_path and not os.path.exists(json_file_path):
         print(colorama.Fore.YELLOW + 'El archivo JSON no existe. Verifique la ruta proporcionada.')
         exit()
-    
-    #Read the json file
-    json_data = read_json_file(json_file_path)
-    
-    #Check if the videos folder exists, if not, create it
-    if not os.path.exists(VIDEOS_FOLDER_PATH):
-        #Create the videos folder
-        print(colorama.Fore.YELLOW + 'AVISO: La carpeta de videos no existe. Se creará la carpeta vacía.')
-        os.makedirs(VIDEOS_FOLDER_PATH)     
-
-    #Start the timer to measure the elapsed time of the whole process
-    time_start = time.time()
-
-    #List to store the videos that were not downloaded due to an error
-    not_downloaded_videos = []
 
-    print(colorama.Fore.MAGENTA + '************************************************')
-    print(colorama.Fore.WHITE + '---> Descargando videos...')
+    #Check if the watched folder exists
+    if watch_folder_path and not os.path.isdir(watch_folder_path):
+        print(colorama.Fore.YELLOW + 'La carpeta a vigilar no existe. Verifique la ruta proporcionada.')
+        exit()
 
-    #Iterate over the JSON data to download the videos
-    for index, rec in enumerate(json_data):
-        date = rec['date']
-        subjectId = rec['subjectId']
-        subjectName = rec['subjectName']
-        teacher = rec['teacher']
+    #Check if the videos folder exists, if not, create it
+    if not os.path.exists(config.videos_folder_path):
+        os.makedirs(config.videos_folder_path)
+        print(colorama.Fore.YELLOW + 'AVISO: La carpeta de videos no existe. Se creará la carpeta vacía.')
+        if upload and not watch_folder_path:
+            print('Compruebe que esta contenga los videos a subir antes de ejecutar el script nuevamente.')
+            exit()
 
-        print(colorama.Fore.MAGENTA + '************************************************')
-        print(colorama.Fore.GREEN + 'Video ' + str(index + 1) + ' de ' + str(len(json_data)) + ': ' + date + ' - ' + subjectId)
-
-        videos = rec['videos']
-
-        #Iterate over the videos in the class
-        for video in videos:
-            downloadUrl = video['downloadUrl']
-
-            #Get the file name from the video url
-            file_name = get_file_name_from_url(downloadUrl)
-
-            #Check if the video is already downloaded in the videos folder
-            if os.path.exists(os.path.join(VIDEOS_FOLDER_PATH, os.path.splitext(file_name)[0], file_name)):
-                print(colorama.Fore.YELLOW + 'AVISO: Omitiendo video ya descargado. ' + file_name)
-                continue
-
-            #Download the video
-            if download_file(downloadUrl, file_name):
-                print(colorama.Fore.GREEN + 'Descargado: ' + file_name)
-            else:
-                #Add the current video to the Not downloaded videos list
-                not_downloaded_videos.append(downloadUrl)
-            
-            #Format the subject name as title
-            formatted_title = format_string_as_title(subjectName)
-
-            #Calculate the session number based on the index in the json_data
-            session_number = len(json_data) - index
-            
-            #Format the session number as S00, S01, S02, etc.
-            if session_number < 10:
-                session_number = f'S0{session_number}'
-            else:
-                session_number = f'S{session_number}'
-            
-            #Create the metadata content
-            metadata_content = {"title": formatted_title + " " + PERIOD_STR + " " + session_number, 
-                                "description": formatted_title + "\n" + subjectId + "\n" + teacher + "\n" + date}
-            
-            #Get the metadata path
-            metadata_path = os.path.join(VIDEOS_FOLDER_PATH, os.path.splitext(file_name)[0], 'metadata.json')
-            
-            #Write the metadata content to a json file
-            write_json(metadata_path, metadata_content)
-
-
-    #Check if there are videos that were not downloaded due to an error and try to download them again
-    if len(not_downloaded_videos) > 0:
-        
-        failed_download_retries = []
+    #Timer of the steps of each upload
+    timer = StepTimer()
 
-        print(colorama.Fore.MAGENTA + '************************************************')
-        print(colorama.Fore.YELLOW + '---> Reintentando descarga de videos...')
+    with Pipeline(config, verbose=True, timer=timer) as pipeline:
 
-        #Iterate over the Not downloaded videos list
-        for index, downloadUrl in enumerate(not_downloaded_videos):
+        #If the watch flag was provided, execute the DOWNLOAD and UPLOAD processes for each JSON file copied to the watched folder until the script is stopped
+        if watch_folder_path:
+            stop_event = threading.Event()
+            install_stop_handlers(stop_event)
 
             print(colorama.Fore.MAGENTA + '************************************************')
-            print(colorama.Fore.GREEN + 'Video ' + str(index + 1) + ' de ' + str(len(not_downloaded_videos)))
-            
-            #Get the file name from the download url
-            file_name = get_file_name_from_url(downloadUrl)
-
-            #Try to download the video
-            if download_file(downloadUrl, file_name):
-                print(colorama.Fore.GREEN + 'Descargado: ' + file_name)
-            else:
-                print(colorama.Fore.RED + 'ERROR reintentando descargar: ' + file_name)
-
-                #Add the current video and the following videos to the failed download retries list  
-                failed_download_retries.append(downloadUrl)
-                failed_download_retries.extend(not_downloaded_videos[index + 1:])
-
-                #Delete each video folder in the failed download retries list
-                for downloadUrl in failed_download_retries:
-                    file_name = get_file_name_from_url(downloadUrl)
-                    folder_path = os.path.join(VIDEOS_FOLDER_PATH, os.path.splitext(file_name)[0])
-                    delete_all_files_and_folders(folder_path)
-                    os.rmdir(folder_path)
-
-                #Calculate the elapsed time and exit the script
-                print(colorama.Fore.MAGENTA + '************************************************')
-                print(colorama.Fore.WHITE + '---> Proceso finalizado')
-                time_end = time.time()
-                hours, minutes, seconds = calculate_elapsed_time(time_start, time_end)
-                print(colorama.Fore.CYAN + f'Tiempo total transcurrido: {hours} horas, {minutes} minutos y {seconds} segundos')
-                print(colorama.Fore.MAGENTA + '************************************************')
-                exit()
-            
-else:
-    #Check if the videos folder exists
-    if not os.path.exists(VIDEOS_FOLDER_PATH):
-        #Create the videos folder
-        os.makedirs(VIDEOS_FOLDER_PATH)
-        print(colorama.Fore.YELLOW + 'AVISO: La carpeta de videos no existe. Se creará la carpeta vacía.')
-        print('Compruebe que esta contenga los videos a subir antes de ejecutar el script nuevamente.')
-        exit()
+            print(colorama.Fore.WHITE + f'---> Vigilando la carpeta {watch_folder_path} (Ctrl+C para detener)...')
 
-    #Start the timer to measure the elapsed time of the UPLOAD process
-    time_start = time.time()
+            result = pipeline.watch(watch_folder_path, stop_event)
 
+            print_process_end(f'Proceso finalizado ({len(result.uploaded)} videos subidos)', result.elapsed,
+                              result.transferred_bytes, result.transfer_time, timer, trace_path, trace_format)
+            return
 
-#Check if the download flag was provided to stop the script here
-if download:
-    print(colorama.Fore.MAGENTA + '************************************************')
-    print(colorama.Fore.WHITE + '---> Proceso de descarga finalizado')
+        #If the pipeline flag was provided, execute the DOWNLOAD and UPLOAD processes at the same time
+        if args.pipeline:
+            pipeline.register_file(json_file_path)
 
-    #Stop the timer
-    time_end = time.time()
+            print(colorama.Fore.MAGENTA + '************************************************')
+            print(colorama.Fore.WHITE + '---> Descargando y subiendo videos a Youtube...')
 
-    #Calculate the elapsed time
-    hours, minutes, seconds = calculate_elapsed_time(time_start, time_end)
-    
-    #Print the elapsed time
-    print(colorama.Fore.CYAN + f'Tiempo total transcurrido: {hours} horas, {minutes} minutos y {seconds} segundos')
-    print(colorama.Fore.MAGENTA + '************************************************')
-    exit()
+            result = pipeline.run()
 
+            #Print the videos that were not downloaded and the pending videos if there are any
+            print_video_list('Videos no descargados', result.not_downloaded)
+            print_video_list('Videos pendientes para subir', result.pending)
+            print_process_end('Proceso finalizado', result.elapsed, result.transferred_bytes, result.transfer_time, timer, trace_path, trace_format)
+            return
 
-#Download process finishes and the UPLOAD process starts here
+        #If the upload flag was not provided, execute the DOWNLOAD process first
+        download_elapsed = 0
+        if not upload:
+            pipeline.register_file(json_file_path)
 
-#List all folders in the videos folder
-video_folders = list_folders(VIDEOS_FOLDER_PATH)
+            print(colorama.Fore.MAGENTA + '************************************************')
+            print(colorama.Fore.WHITE + '---> Descargando videos...')
 
-#Check if there are no video folders in the videos folder
-if len(video_folders) == 0:
-    print(colorama.Fore.YELLOW + 'AVISO: No hay videos para subir en la carpeta de videos.')
-    exit()
+            download_result = pipeline.download()
+            download_elapsed = download_result.elapsed
 
-#Sort the video folders by name in ascending order
-video_folders.sort()
+            #The videos that could not be downloaded after retrying do not stop the upload of the others, their partial downloads are resumed in the next run
+            print_video_list('Videos no descargados', download_result.not_downloaded)
 
-#List to store the uploaded videos 
-uploaded_videos = []
+        #Check if the download flag was provided to stop the script here
+        if download:
+            print_process_end('Proceso de descarga finalizado', download_elapsed)
+            return
 
-#List to store the pending videos to upload in case of an error
-pending_videos = []
+        #Download process finishes and the UPLOAD process starts here
 
-print(colorama.Fore.MAGENTA + '************************************************')
-print(colorama.Fore.WHITE + '---> Subiendo videos a Youtube...')
+        #Get the folders of the downloaded videos that were not uploaded yet, sorted by name in ascending order, skipping the corrupt videos
+        video_folders = pipeline.get_ready_folders()
 
-#Iterate over the video folders
-for index, folder in enumerate(video_folders):
-    try:
-        video_path = os.path.join(VIDEOS_FOLDER_PATH, folder, folder + '.mp4')
-        metadata_path = os.path.join(VIDEOS_FOLDER_PATH, folder, 'metadata.json')
+        #Check if there are no videos to upload
+        if len(video_folders) == 0:
+            print(colorama.Fore.YELLOW + 'AVISO: No hay videos para subir en la carpeta de videos.')
+            return
 
         print(colorama.Fore.MAGENTA + '************************************************')
-        print(colorama.Fore.GREEN + 'Video ' + str(index + 1) + ' de ' + str(len(video_folders)) + ': ' + folder)
-
-        uploader = YouTubeUploader(video_path, metadata_path, None, PROFILE_PATH, headless_mode)
-        was_video_uploaded, video_id = uploader.upload()
-        if was_video_uploaded:
-            uploaded_videos.append(folder) 
-        assert was_video_uploaded
-
-    except Exception as e:
-        #Add the current folder to the pending videos list
-        pending_videos.append(folder)
-
-        #Get the exception message
-        exception_message = str(e).strip()
-
-        #Compare exception message to check if the upload limit was reached
-        if exception_message == 'Message: Element <ytcp-button id="next-button" class="style-scope ytcp-uploads-dialog" type="filled"> could not be scrolled into view':
-            print(colorama.Fore.RED + 'ERROR: Se alcanzó el límite de subida de videos.')
-            #Add the following videos to the pending videos list
-            pending_videos.extend(video_folders[index + 1:])
-            #Stop the loop
-            break
-
-        #If the exception message is different
-        else:
-            print(colorama.Fore.RED + 'ERROR al subir el video. ' + exception_message)
+        print(colorama.Fore.WHITE + '---> Subiendo videos a Youtube...')
 
+        #Upload the videos in parallel with the profiles of the config.ini file, or one after another with PROFILE_PATH
+        upload_result = pipeline.upload(video_folders)
 
-#Delete uploaded videos from the videos folder
-for video in uploaded_videos:
-    #Delete the video file and the metadata file in the video folder
-    delete_all_files_and_folders(os.path.join(VIDEOS_FOLDER_PATH, video))
-    #Delete the video folder
-    os.rmdir(os.path.join(VIDEOS_FOLDER_PATH, video))
+        #Print the pending videos if there are any
+        print_video_list('Videos pendientes para subir', upload_result.pending)
+        print_process_end('Proceso finalizado', download_elapsed + upload_result.elapsed,
+                          upload_result.transferred_bytes, upload_result.transfer_time, timer, trace_path, trace_format)
 
-#Print the pending videos if there are any
-if len(pending_videos) > 0:
-    print(colorama.Fore.MAGENTA + '************************************************')
-    print(colorama.Fore.WHITE + '---> ' + str(len(pending_videos)) + ' Videos pendientes para subir:')
-    print(colorama.Fore.YELLOW + str(pending_videos))
-
-print(colorama.Fore.MAGENTA + '************************************************')
-print(colorama.Fore.WHITE + '---> Proceso finalizado')
-
-#Stop the timer
-time_end = time.time()
-
-#Calculate the elapsed time
-hours, minutes, seconds = calculate_elapsed_time(time_start, time_end)
 
-#Print the elapsed time
-print(colorama.Fore.CYAN + f'Tiempo total transcurrido: {hours} horas, {minutes} minutos y {seconds} segundos')
-print(colorama.Fore.MAGENTA + '************************************************')
-exit()
+if __name__ == "__main__":
+    main()
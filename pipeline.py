@@ -0,0 +1,1344 @@
+import os
+import configparser
+import shutil
+import time
+import json
+import hashlib
+import threading
+import queue
+import colorama
+
+from typing import NamedTuple
+from youtube_uploader_selenium.timing import StepTimer
+from upload_workers import run_upload_workers
+from job_store import JobStore
+from upload_scheduler import UploadScheduler
+from upload_index import UploadIndex
+from video_integrity import check_mp4_container
+from staging import StagingBudget
+from folder_watcher import ChangeDetector, scan_json_files, scan_video_folders
+from bandwidth import BandwidthLimiter
+from retry_policy import RetryPolicy, classify_download_error, classify_upload_error, is_attached_upload_error, RETRYABLE, QUOTA, AUTH, FATAL, FAILED, DUPLICATE
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+
+#---> CONSTANTS
+
+#Seconds between each check of the bandwidth limits of the config.ini file while downloading
+BANDWIDTH_CHECK_INTERVAL = 5
+
+#Number of new videos of the JSON records registered in each transaction of the jobs database
+REGISTER_BATCH_SIZE = 1000
+
+
+#---> CLASSES
+
+class PipelineConfig:
+    """Configuración del proceso de descarga y subida de videos: los valores del archivo config.ini y las opciones de la línea de comandos."""
+
+    def __init__(self, profile_path=None, videos_folder_path='videos', period_str='', download_chunk_size=1024 * 1024, max_downloads_per_host=4,
+                 max_wait_time=30, daily_upload_limit=50, jobs_database_path='jobs.db', upload_stall_timeout=300, min_free_space_gb=1, watch_max_attempts=3,
+                 retry_max_attempts=4, retry_base_delay=5, retry_max_delay=300, lean_browser=False, fast_fill=False, profile_template=False,
+                 profile_template_path='profile_templates', download_segments=1, segmented_download_min_size=100 * 1024 * 1024,
+                 total_bandwidth=None, download_bandwidth=None, upload_bandwidth_reserve=None, config_file_path=None,
+                 lowercase_words=(), uppercase_words=(), upload_profiles=(), headless=True, download_workers=1, queue_size=2, use_profiles=False,
+                 wait_for_quota=False, max_staging_bytes=None, poll_interval=5):
+        self.profile_path = profile_path
+        self.videos_folder_path = videos_folder_path
+        self.period_str = period_str
+        self.download_chunk_size = download_chunk_size
+        self.max_downloads_per_host = max_downloads_per_host
+        self.max_wait_time = max_wait_time
+        self.daily_upload_limit = daily_upload_limit
+        self.jobs_database_path = jobs_database_path
+        self.upload_stall_timeout = upload_stall_timeout
+        self.min_free_space_gb = min_free_space_gb
+        self.watch_max_attempts = watch_max_attempts
+        self.retry_max_attempts = retry_max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.lean_browser = lean_browser
+        self.fast_fill = fast_fill
+        self.profile_template = profile_template
+        self.profile_template_path = profile_template_path
+        self.download_segments = max(1, download_segments)
+        self.segmented_download_min_size = segmented_download_min_size
+        self.total_bandwidth = total_bandwidth
+        self.download_bandwidth = download_bandwidth
+        self.upload_bandwidth_reserve = upload_bandwidth_reserve
+        self.config_file_path = config_file_path
+        self.lowercase_words = list(lowercase_words)
+        self.uppercase_words = list(uppercase_words)
+        self.upload_profiles = list(upload_profiles)
+        self.headless = headless
+        self.download_workers = max(1, download_workers)
+        self.queue_size = max(1, queue_size)
+        self.use_profiles = use_profiles
+        self.wait_for_quota = wait_for_quota
+        self.max_staging_bytes = max_staging_bytes
+        self.poll_interval = max(0.1, poll_interval)
+
+    @classmethod
+    def from_file(cls, file_path='config.ini', **options):
+        """Crea la configuración con los valores del archivo config.ini dado, reemplazados por los argumentos con nombre."""
+        config = configparser.ConfigParser()
+        config.read(file_path)
+
+        values = {"profile_path": config.get('DEFAULT', 'PROFILE_PATH', fallback=None),
+                  "videos_folder_path": config.get('DEFAULT', 'VIDEOS_FOLDER_PATH', fallback='videos'),
+                  "period_str": config.get('DEFAULT', 'PERIOD_STR', fallback=''),
+                  "download_chunk_size": config.getint('DEFAULT', 'DOWNLOAD_CHUNK_SIZE', fallback=1024 * 1024),
+                  "max_downloads_per_host": config.getint('DEFAULT', 'MAX_DOWNLOADS_PER_HOST', fallback=4),
+                  "max_wait_time": config.getint('DEFAULT', 'MAX_WAIT_TIME', fallback=30),
+                  "daily_upload_limit": config.getint('DEFAULT', 'DAILY_UPLOAD_LIMIT', fallback=50),
+                  "jobs_database_path": config.get('DEFAULT', 'JOBS_DATABASE_PATH', fallback='jobs.db'),
+                  "upload_stall_timeout": config.getint('DEFAULT', 'UPLOAD_STALL_TIMEOUT', fallback=300),
+                  "min_free_space_gb": config.getfloat('DEFAULT', 'MIN_FREE_SPACE_GB', fallback=1),
+                  "watch_max_attempts": config.getint('DEFAULT', 'WATCH_MAX_ATTEMPTS', fallback=3),
+                  "retry_max_attempts": config.getint('DEFAULT', 'RETRY_MAX_ATTEMPTS', fallback=4),
+                  "retry_base_delay": config.getfloat('DEFAULT', 'RETRY_BASE_DELAY', fallback=5),
+                  "retry_max_delay": config.getfloat('DEFAULT', 'RETRY_MAX_DELAY', fallback=300),
+                  "lean_browser": config.getboolean('DEFAULT', 'LEAN_BROWSER', fallback=False),
+                  "fast_fill": config.getboolean('DEFAULT', 'FAST_FILL', fallback=False),
+                  "profile_template": config.getboolean('DEFAULT', 'PROFILE_TEMPLATE', fallback=False),
+                  "profile_template_path": config.get('DEFAULT', 'PROFILE_TEMPLATE_PATH', fallback='profile_templates'),
+                  "download_segments": config.getint('DEFAULT', 'DOWNLOAD_SEGMENTS', fallback=1),
+                  "segmented_download_min_size": int(config.getfloat('DEFAULT', 'SEGMENTED_DOWNLOAD_MIN_MB', fallback=100) * 1024 * 1024),
+                  "lowercase_words": [word.strip() for word in config.get('WORDS', 'LOWERCASE', fallback='').split(',') if word.strip()],
+                  "uppercase_words": [word.strip() for word in config.get('WORDS', 'UPPERCASE', fallback='').split(',') if word.strip()],
+                  "config_file_path": file_path}
+        values.update(read_bandwidth_limits(config))
+
+        #Get the upload profiles from the [PROFILE:name] sections of the config.ini file
+        values["upload_profiles"] = [{"name": section.split(':', 1)[1].strip(),
+                                      "profile_path": config.get(section, 'PROFILE_PATH'),
+                                      "cookies_folder_path": config.get(section, 'COOKIES_FOLDER_PATH', fallback=None),
+                                      "daily_upload_limit": config.getint(section, 'DAILY_UPLOAD_LIMIT', fallback=values["daily_upload_limit"])}
+                                     for section in config.sections() if section.startswith('PROFILE:')]
+
+        values.update(options)
+        return cls(**values)
+
+
+class DownloadResult(NamedTuple):
+    """Resultado de Pipeline.download: carpetas descargadas, URL no descargadas por un error, URL aplazadas por falta de espacio y segundos transcurridos."""
+    downloaded: list
+    not_downloaded: list
+    deferred: list
+    elapsed: float
+
+
+class UploadResult(NamedTuple):
+    """Resultado de Pipeline.upload: carpetas subidas, carpetas pendientes, bytes y segundos de transferencia de los videos subidos y segundos transcurridos."""
+    uploaded: list
+    pending: list
+    transferred_bytes: int
+    transfer_time: float
+    elapsed: float
+
+
+class RunResult(NamedTuple):
+    """Resultado de Pipeline.run y Pipeline.watch: carpetas subidas, pendientes y no descargadas, bytes y segundos de transferencia y segundos transcurridos."""
+    uploaded: list
+    pending: list
+    not_downloaded: list
+    transferred_bytes: int
+    transfer_time: float
+    elapsed: float
+
+
+class Pipeline:
+    """Proceso de descarga de los videos de los registros JSON y de subida a YouTube, sin efectos al importarlo, con el estado de cada video en la base de datos de trabajos."""
+
+    def __init__(self, config, verbose=False, timer=None):
+        self.config = config
+        self.verbose = verbose
+        self.timer = timer or StepTimer()
+
+        #Semaphores to limit the concurrent downloads per host
+        self.host_semaphores = {}
+        self.host_semaphores_lock = threading.Lock()
+
+        #Open the jobs database, which keeps the state of each video between runs
+        self.job_store = JobStore(config.jobs_database_path)
+        self.is_new_job_store = self.job_store.is_empty()
+
+        #Scheduler of the rolling upload limit of the channel of the profile of the config
+        self.scheduler = UploadScheduler(config.jobs_database_path, 'default', config.daily_upload_limit)
+
+        #Index of the content of the videos uploaded to the channel, to skip the duplicates before uploading them
+        self.upload_index = UploadIndex(config.jobs_database_path, 'default')
+
+        #Retries of the temporary errors of the downloads and the uploads, waiting longer after each failed attempt
+        self.retry_policy = RetryPolicy(config.retry_max_attempts, config.retry_base_delay, config.retry_max_delay)
+
+        #Bandwidth shared by the downloads and the uploads, with the limits of the config.ini file read again when it changes
+        self.bandwidth_limiter = BandwidthLimiter(config.total_bandwidth, config.download_bandwidth, config.upload_bandwidth_reserve)
+        self.bandwidth_lock = threading.Lock()
+        self.bandwidth_check_time = time.time()
+        self.config_file_mtime = get_file_mtime(config.config_file_path)
+        self.uploaded_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Cierra la base de datos de trabajos, la del límite de subida y la del índice de videos subidos."""
+        self.upload_index.close()
+        self.scheduler.close()
+        self.job_store.close()
+
+    def __print(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
+
+    def __create_staging_budget(self):
+        return StagingBudget(self.config.videos_folder_path, self.config.max_staging_bytes, int(self.config.min_free_space_gb * 1024 ** 3))
+
+    #---> BANDWIDTH
+
+    #Change the bandwidth limits while the process runs
+    def set_bandwidth_limits(self, total_bandwidth=None, download_bandwidth=None, upload_bandwidth_reserve=None):
+        """Cambia los límites de ancho de banda en bytes por segundo (None sin límite), que las descargas en curso aplican desde su siguiente bloque."""
+        self.config.total_bandwidth = total_bandwidth
+        self.config.download_bandwidth = download_bandwidth
+        self.config.upload_bandwidth_reserve = upload_bandwidth_reserve
+        self.bandwidth_limiter.set_limits(total_bandwidth, download_bandwidth, upload_bandwidth_reserve)
+
+    #Read the bandwidth limits of the config.ini file again if it changed
+    def reload_bandwidth_limits(self):
+        """Lee de nuevo los límites de ancho de banda del archivo config.ini de la configuración si cambió desde la última lectura y devuelve True si se aplicaron."""
+        mtime = get_file_mtime(self.config.config_file_path)
+        if mtime is None or mtime == self.config_file_mtime:
+            return False
+        self.config_file_mtime = mtime
+
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.config.config_file_path)
+            limits = read_bandwidth_limits(config)
+        except (configparser.Error, ValueError) as e:
+            self.__print(colorama.Fore.YELLOW + f'AVISO: No se pudieron leer los límites de ancho de banda de {self.config.config_file_path}. {e}')
+            return False
+        self.set_bandwidth_limits(**limits)
+        self.__print(colorama.Fore.CYAN + 'Límites de ancho de banda actualizados: ' + format_bandwidth_limits(limits))
+        return True
+
+    #Wait as needed to keep the downloads within the bandwidth limits
+    def throttle_download(self, nbytes, stop_event=None):
+        """Descuenta los bytes de un bloque descargado de los límites de ancho de banda y espera lo necesario para respetarlos, hasta que stop_event se active."""
+        if time.time() - self.bandwidth_check_time >= BANDWIDTH_CHECK_INTERVAL and self.bandwidth_lock.acquire(blocking=False):
+            try:
+                self.bandwidth_check_time = time.time()
+                self.reload_bandwidth_limits()
+            finally:
+                self.bandwidth_lock.release()
+        self.bandwidth_limiter.throttle_download(nbytes, stop_event)
+
+    #---> DOWNLOAD
+
+    #Get the semaphore that limits the concurrent downloads from the host of the url
+    def get_host_semaphore(self, url):
+        """Devuelve el semáforo que limita las descargas simultáneas al host de la URL dada."""
+        host = urlparse(url).netloc
+        with self.host_semaphores_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.config.max_downloads_per_host)
+            return self.host_semaphores[host]
+
+    #Create a requests session sized for the downloads of the config
+    def create_download_session(self):
+        """Crea la sesión de requests compartida por las descargas, con una conexión por cada descarga simultánea y por cada segmento de las descargas por segmentos."""
+        return create_download_session(max(self.config.download_workers, self.config.max_downloads_per_host) * self.config.download_segments)
+
+    #Download a file from a url and save it in videos folder, retrying the temporary errors
+    def download_file(self, url, file_name, session=None, expected_checksum=None, stop_event=None):
+        """Descarga un archivo de una URL con fetch_file, reintentando los errores temporales según la política de reintentos, y devuelve su checksum."""
+        def print_retry(error, attempt, delay):
+            self.__print(colorama.Fore.YELLOW + f'AVISO: Error al descargar {file_name} ({error}). Intento {attempt + 1} de {self.retry_policy.max_attempts} en {delay:.0f} segundos.')
+
+        return self.retry_policy.call(lambda: self.fetch_file(url, file_name, session, expected_checksum, stop_event), classify_download_error, stop_event, print_retry)
+
+    #Download a file from a url and save it in videos folder
+    def fetch_file(self, url, file_name, session=None, expected_checksum=None, stop_event=None):
+        """Descarga un archivo de una URL en un solo intento, lo comprueba y lo guarda en la carpeta de videos, y devuelve su checksum."""
+        file_path = os.path.join(self.config.videos_folder_path, os.path.splitext(file_name)[0], file_name)
+        file_dir = os.path.dirname(file_path)
+        temp_file_path = file_path + '.part'
+        state_file_path = temp_file_path + '.json'
+        http = session or create_download_session(1)
+
+        if not os.path.exists(file_dir):
+            os.makedirs(file_dir)
+
+        #Download the file in segments if it is large enough and the server accepts ranges, otherwise in a single stream
+        result = self.__fetch_segments(url, file_name, http, temp_file_path, state_file_path, stop_event)
+        if result is None:
+            result = self.__fetch_stream(url, file_name, http, temp_file_path, state_file_path, stop_event)
+        sha256, expected_size = result
+
+        #Check that the whole file was received
+        if expected_size is not None and os.path.getsize(temp_file_path) != expected_size:
+            raise IOError(f'Descarga incompleta: {os.path.getsize(temp_file_path)} de {expected_size} bytes')
+
+        #Check the content of the complete file, deleting it if it is corrupt so the next attempt starts over
+        checksum = sha256.hexdigest()
+        corruption_error = None
+        if expected_checksum and checksum != expected_checksum.lower():
+            corruption_error = f'El checksum {checksum} no coincide con el esperado {expected_checksum}'
+        elif file_name.lower().endswith('.mp4'):
+            corruption_error = check_mp4_container(temp_file_path)
+        if corruption_error:
+            os.remove(temp_file_path)
+            if os.path.exists(state_file_path):
+                os.remove(state_file_path)
+            raise IOError('Archivo dañado. ' + corruption_error)
+
+        #Move the complete file to its final path
+        os.replace(temp_file_path, file_path)
+        if os.path.exists(state_file_path):
+            os.remove(state_file_path)
+
+        return checksum
+
+    def __fetch_stream(self, url, file_name, http, temp_file_path, state_file_path, stop_event=None):
+        """Descarga el archivo en un solo flujo, reanudando el archivo .part de un intento anterior si el servidor lo admite, y devuelve una tupla (sha256, expected_size)."""
+        sha256 = hashlib.sha256()
+        chunk_size = self.config.download_chunk_size
+
+        #Get the bytes already on disk and the validators saved by the previous attempt
+        downloaded_bytes = os.path.getsize(temp_file_path) if os.path.exists(temp_file_path) else 0
+        part_state = read_part_state(state_file_path) if downloaded_bytes > 0 else {}
+        expected_size = part_state.get('size')
+
+        headers = {}
+        if downloaded_bytes > 0:
+            headers['Range'] = f'bytes={downloaded_bytes}-'
+            #Only accept a partial response if the file did not change on the server
+            if part_state.get('etag'):
+                headers['If-Range'] = part_state['etag']
+
+        r = http.get(url, headers=headers, stream=True)
+
+        #The partial file is already complete
+        if r.status_code == 416 and expected_size is not None and downloaded_bytes == expected_size:
+            r.close()
+            update_checksum_from_file(sha256, temp_file_path, chunk_size)
+            return sha256, expected_size
+
+        #The saved partial file does not match the file on the server, so start over
+        if r.status_code == 416 or (r.status_code == 206 and expected_size is not None and get_total_size_from_content_range(r.headers.get('Content-Range')) != expected_size):
+            r.close()
+            self.__print(colorama.Fore.YELLOW + 'AVISO: La descarga parcial no coincide con el archivo del servidor. Descargando desde el inicio. ' + file_name)
+            downloaded_bytes = 0
+            r = http.get(url, stream=True)
+
+        with r:
+            r.raise_for_status()
+
+            #An error page sent with a success status is not a video
+            if r.headers.get('Content-Type', '').startswith('text/html'):
+                raise ValueError('El servidor devolvió una página HTML en lugar del archivo')
+
+            if r.status_code == 206:
+                expected_size = get_total_size_from_content_range(r.headers.get('Content-Range'))
+                file_mode = 'ab'
+                self.__print(colorama.Fore.CYAN + f'Reanudando descarga desde el byte {downloaded_bytes}: {file_name}')
+                #The checksum state cannot be saved between runs, so the bytes already on disk are read once
+                update_checksum_from_file(sha256, temp_file_path, chunk_size)
+            else:
+                #The server ignored the Range header, so the whole file is sent again
+                content_length = r.headers.get('Content-Length')
+                expected_size = int(content_length) if content_length and content_length.isdigit() else None
+                file_mode = 'wb'
+
+            #Save the validators to check the partial file when resuming
+            write_part_state(state_file_path, {"etag": r.headers.get('ETag'), "size": expected_size})
+
+            #Stream the response so only one chunk is held in memory at a time, updating the checksum with each chunk
+            with open(temp_file_path, file_mode) as file:
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    file.write(chunk)
+                    sha256.update(chunk)
+                    self.throttle_download(len(chunk), stop_event)
+
+        return sha256, expected_size
+
+    def __fetch_segments(self, url, file_name, http, temp_file_path, state_file_path, stop_event=None):
+        """Descarga el archivo en config.download_segments rangos de bytes en paralelo y devuelve una tupla (sha256, size), o None si se debe descargar en un solo flujo."""
+        part_state = read_part_state(state_file_path) if os.path.exists(temp_file_path) else {}
+        is_resuming = 'segments' in part_state
+        #A partial file of a single stream is resumed by a single stream
+        if not is_resuming and (self.config.download_segments <= 1 or os.path.exists(temp_file_path)):
+            return None
+
+        #Ask for the size of the file and whether the server accepts ranges, without downloading it
+        with http.head(url, allow_redirects=True) as r:
+            content_length = r.headers.get('Content-Length')
+            size = int(content_length) if r.ok and content_length and content_length.isdigit() else None
+            accepts_ranges = r.ok and r.headers.get('Accept-Ranges', '').lower() == 'bytes' and not r.headers.get('Content-Type', '').startswith('text/html')
+            etag = r.headers.get('ETag')
+
+        if not accepts_ranges or not size or (not is_resuming and size < self.config.segmented_download_min_size):
+            #The reserved file of a previous attempt has gaps, so it cannot be resumed by a single stream
+            if is_resuming:
+                os.remove(temp_file_path)
+                os.remove(state_file_path)
+            return None
+
+        #Start over if the file changed on the server since the previous attempt
+        if is_resuming and (part_state.get('etag') != etag or part_state.get('size') != size):
+            self.__print(colorama.Fore.YELLOW + 'AVISO: La descarga parcial no coincide con el archivo del servidor. Descargando desde el inicio. ' + file_name)
+            is_resuming = False
+
+        if is_resuming:
+            segments = part_state['segments']
+            self.__print(colorama.Fore.CYAN + f'Reanudando {sum(1 for segment in segments if not is_segment_complete(segment))} de {len(segments)} segmentos: {file_name}')
+        else:
+            segments = split_into_segments(size, self.config.download_segments)
+            #Reserve the final size so each segment is written in place
+            with open(temp_file_path, 'wb') as file:
+                file.truncate(size)
+            self.__print(colorama.Fore.CYAN + f'Descargando en {len(segments)} segmentos: {file_name}')
+
+        chunk_size = self.config.download_chunk_size
+        state_lock = threading.Lock()
+
+        def save_state():
+            with state_lock:
+                write_part_state(state_file_path, {"etag": etag, "size": size, "segments": segments})
+
+        #Download the missing bytes of a segment into its place of the file, saving its progress about once per second
+        def fetch_segment(segment):
+            last_save_time = time.time()
+            #A server that caps the size of the ranges sends the segment in several responses
+            while not is_segment_complete(segment):
+                position = segment['start'] + segment['downloaded']
+                headers = {'Range': f'bytes={position}-{segment["end"]}'}
+                if etag:
+                    headers['If-Range'] = etag
+                with http.get(url, headers=headers, stream=True) as r:
+                    r.raise_for_status()
+                    content_range = r.headers.get('Content-Range')
+                    range_end = get_end_from_content_range(content_range)
+                    if r.status_code != 206 or get_start_from_content_range(content_range) != position or range_end is None or range_end > segment['end']:
+                        raise IOError(f'El servidor no devolvió el rango pedido ({headers["Range"]})')
+                    with open(temp_file_path, 'r+b') as file:
+                        file.seek(position)
+                        for chunk in r.iter_content(chunk_size=chunk_size):
+                            chunk = chunk[:range_end + 1 - position]
+                            file.write(chunk)
+                            position += len(chunk)
+                            with state_lock:
+                                segment['downloaded'] += len(chunk)
+                            self.throttle_download(len(chunk), stop_event)
+                            if position > range_end:
+                                break
+                            if time.time() - last_save_time >= 1:
+                                file.flush()
+                                save_state()
+                                last_save_time = time.time()
+
+                #A response that ends before its range is an interrupted download, retried from the missing bytes
+                if position <= range_end:
+                    raise IOError(f'La respuesta del rango terminó antes de tiempo ({position} de {range_end + 1} bytes)')
+
+        save_state()
+        pending_segments = [segment for segment in segments if not is_segment_complete(segment)]
+        errors = []
+        if pending_segments:
+            #The download already holds one slot of the host, each extra connection takes another free slot so the host never gets more than config.max_downloads_per_host
+            host_semaphore = self.get_host_semaphore(url)
+            extra_connections = 0
+            while extra_connections < len(pending_segments) - 1 and host_semaphore.acquire(blocking=False):
+                extra_connections += 1
+            try:
+                with ThreadPoolExecutor(max_workers=1 + extra_connections) as executor:
+                    for future in [executor.submit(fetch_segment, segment) for segment in pending_segments]:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            errors.append(e)
+            finally:
+                for _ in range(extra_connections):
+                    host_semaphore.release()
+            save_state()
+
+        #The completed segments are kept, so the next attempt only downloads the failed ones
+        if errors:
+            raise errors[0]
+        if not all(is_segment_complete(segment) for segment in segments):
+            raise IOError('Descarga incompleta: faltan bytes de algunos segmentos')
+
+        sha256 = hashlib.sha256()
+        update_checksum_from_file(sha256, temp_file_path, chunk_size)
+        return sha256, size
+
+    #Download a video, respecting the limit of concurrent downloads per host, and write its metadata file
+    def download_video(self, url, file_name, metadata_content, session, expected_checksum=None, stop_event=None):
+        """Descarga un video respetando el límite de descargas simultáneas por host, registra el resultado y escribe su archivo metadata.json. Devuelve True si se descargó."""
+        #The slot of the host is kept while waiting to retry, so a struggling server receives fewer requests
+        error = None
+        with self.get_host_semaphore(url):
+            try:
+                checksum = self.download_file(url, file_name, session, expected_checksum, stop_event)
+            except Exception as e:
+                error = e
+
+        was_downloaded = error is None
+        if was_downloaded:
+            self.__print(colorama.Fore.GREEN + 'Descargado: ' + file_name)
+            file_path = os.path.join(self.config.videos_folder_path, os.path.splitext(file_name)[0], file_name)
+            self.job_store.mark_downloaded(url, os.path.getsize(file_path), checksum)
+        elif classify_download_error(error) == FATAL:
+            self.__print(colorama.Fore.RED + f'ERROR al descargar {file_name}, no se volverá a intentar. Razón: {error}')
+            self.job_store.mark_download_rejected(url, str(error).strip())
+        else:
+            self.__print(colorama.Fore.RED + f'ERROR al descargar {file_name}. Razón: {error}')
+            self.job_store.mark_download_failed(url, str(error).strip())
+
+        #Write the metadata content to a json file
+        metadata_path = os.path.join(self.config.videos_folder_path, os.path.splitext(file_name)[0], 'metadata.json')
+        write_json(metadata_path, metadata_content)
+
+        return was_downloaded
+
+    #Download a video only if it fits in the budget of the videos folder
+    def download_video_within_budget(self, job, session, staging_budget, deferred_downloads=None, stop_event=None):
+        """Descarga el video del trabajo dado cuando cabe en el presupuesto de la carpeta de videos, o lo agrega a deferred_downloads si se proporciona. Devuelve True si se descargó."""
+        if not staging_budget.acquire(job['folder'], job['size'], block=deferred_downloads is None, stop_event=stop_event):
+            if deferred_downloads is not None:
+                deferred_downloads.append(job['url'])
+            return False
+        was_downloaded = False
+        try:
+            was_downloaded = self.download_video(job['url'], job['file_name'], json.loads(job['metadata']), session, job['expected_checksum'], stop_event)
+            return was_downloaded
+        finally:
+            staging_budget.commit(job['folder'], was_downloaded)
+
+    #Download the pending videos one after another or in parallel, before uploading any of them
+    def download(self, records=None):
+        """Registra los registros JSON dados (si se proporcionan) y descarga en paralelo los videos pendientes de la base de datos de trabajos. Devuelve un DownloadResult."""
+        time_start = time.time()
+        if records is not None:
+            self.register_records(records)
+
+        #Check if the videos folder exists, if not, create it
+        if not os.path.exists(self.config.videos_folder_path):
+            os.makedirs(self.config.videos_folder_path)
+
+        #Session shared by all the downloads to reuse the HTTP connections
+        session = self.create_download_session()
+
+        #Budget of the videos folder. No video is uploaded during this process, so the videos that do not fit are left for the next run instead of waiting
+        staging_budget = self.__create_staging_budget()
+        deferred_downloads = []
+
+        #Get the videos that were not downloaded yet, skipping the ones downloaded in previous runs
+        pending_downloads = self.job_store.get_pending_downloads()
+
+        with ThreadPoolExecutor(max_workers=self.config.download_workers) as executor:
+            download_futures = []
+
+            #Iterate over the pending videos to download them
+            for index, job in enumerate(pending_downloads):
+                self.__print(colorama.Fore.MAGENTA + '************************************************')
+                self.__print(colorama.Fore.GREEN + 'Video ' + str(index + 1) + ' de ' + str(len(pending_downloads)) + ': ' + job['file_name'])
+
+                #Queue the video to be downloaded by the workers
+                download_futures.append((job, executor.submit(self.download_video_within_budget, job, session, staging_budget, deferred_downloads)))
+
+        downloaded_videos = [job['folder'] for job, future in download_futures if future.result()]
+        failed_downloads = [job for job, future in download_futures if not future.result() and job['url'] not in deferred_downloads]
+
+        #Print the videos that did not fit in the videos folder
+        if len(deferred_downloads) > 0:
+            self.__print(colorama.Fore.MAGENTA + '************************************************')
+            self.__print(colorama.Fore.YELLOW + f'AVISO: {len(deferred_downloads)} videos no caben en la carpeta de videos y se descargarán en la siguiente ejecución '
+                         '(con --pipeline se descargan a medida que se suben los videos anteriores).')
+
+        #Delete the files of the videos that were not downloaded due to an error, keeping the partial downloads to resume them in the next run
+        for job in failed_downloads:
+            folder_path = os.path.join(self.config.videos_folder_path, job['folder'])
+            if not os.path.exists(folder_path):
+                continue
+            delete_all_files_and_folders(folder_path, keep_partial_downloads=True)
+            if len(os.listdir(folder_path)) == 0:
+                os.rmdir(folder_path)
+
+        return DownloadResult(downloaded_videos, [job['url'] for job in failed_downloads], deferred_downloads, time.time() - time_start)
+
+    #---> JOBS
+
+    #Register the videos of a JSON file in the jobs database
+    def register_file(self, json_file_path):
+        """Registra en la base de datos de trabajos los videos nuevos del archivo JSON, si cambió desde la ejecución anterior, y devuelve el número de videos nuevos."""
+        source_path = os.path.abspath(json_file_path)
+        source_stat = os.stat(source_path)
+        if self.job_store.is_source_registered(source_path, source_stat.st_size, source_stat.st_mtime):
+            return 0
+
+        #The session number of each record needs the number of records, so the file is read once to count them and again to register them
+        record_count = sum(1 for _ in iter_json_records(source_path))
+        new_jobs = self.register_records(iter_json_records(source_path), record_count)
+
+        self.job_store.mark_source_registered(source_path, source_stat.st_size, source_stat.st_mtime)
+        return new_jobs
+
+    #Register the videos of the JSON records in the jobs database
+    def register_records(self, records, record_count=None):
+        """Registra por lotes los videos nuevos de los registros dados (una lista, o un iterador con su número de registros en record_count) y devuelve el número de videos nuevos."""
+        if record_count is None:
+            record_count = len(records)
+
+        #Keep only the videos that are not in the jobs database, registering them in batches so the memory does not grow with the number of records
+        known_urls = self.job_store.get_urls()
+        new_jobs = 0
+        jobs = []
+        for index, rec in enumerate(records):
+            #Calculate the session number based on the index in the JSON file
+            session_number = record_count - index
+
+            for video in rec['videos']:
+                downloadUrl = video['downloadUrl']
+                if downloadUrl in known_urls:
+                    continue
+                known_urls.add(downloadUrl)
+
+                file_name = get_file_name_from_url(downloadUrl)
+                folder = os.path.splitext(file_name)[0]
+                file_path = os.path.join(self.config.videos_folder_path, folder, file_name)
+                #Optional SHA-256 checksum of the video in the record
+                expected_checksum = video.get('sha256')
+
+                jobs.append((downloadUrl, folder, file_name, file_path, self.create_metadata_content(rec, session_number), index, expected_checksum))
+
+            if len(jobs) >= REGISTER_BATCH_SIZE:
+                new_jobs += self.__register_jobs(jobs)
+                jobs = []
+
+        return new_jobs + self.__register_jobs(jobs)
+
+    #Register a batch of jobs in the jobs database
+    def __register_jobs(self, jobs):
+        """Registra los trabajos dados en una sola transacción, marca como descargados los que ya están en la carpeta de videos (de una ejecución sin base de datos) y devuelve el número de trabajos nuevos."""
+        new_jobs = self.job_store.add_jobs(jobs)
+
+        for downloadUrl, folder, file_name, file_path, metadata, index, expected_checksum in jobs:
+            if os.path.exists(file_path):
+                checksum = calculate_file_checksum(file_path, self.config.download_chunk_size)
+                #A video that does not match its expected checksum is downloaded again
+                if not expected_checksum or checksum == expected_checksum.lower():
+                    self.job_store.mark_downloaded(downloadUrl, os.path.getsize(file_path), checksum)
+
+        return new_jobs
+
+    #Register the folders of the videos folder in the jobs database
+    def import_video_folders(self, folders=None):
+        """Registra como descargadas las carpetas con video de la carpeta de videos (o solo las de folders) que aún no están en la base de datos de trabajos."""
+        known_folders = self.job_store.get_folders()
+        for folder in (folders if folders is not None else list_folders(self.config.videos_folder_path)):
+            if folder in known_folders:
+                continue
+            file_path = os.path.join(self.config.videos_folder_path, folder, folder + '.mp4')
+            if os.path.exists(file_path):
+                self.job_store.add_job('local:' + folder, folder, folder + '.mp4', file_path)
+                self.job_store.mark_downloaded('local:' + folder, os.path.getsize(file_path), calculate_file_checksum(file_path, self.config.download_chunk_size))
+
+    #Check the videos ready to upload before they reach the uploader
+    def check_ready_uploads(self, jobs):
+        """Devuelve los trabajos listos para subir cuyo video existe, tiene su tamaño y un contenedor MP4 válido, y marca los demás como descarga fallida."""
+        valid_jobs = []
+        for job in jobs:
+            file_path = os.path.join(self.config.videos_folder_path, job['folder'], job['file_name'])
+            if not os.path.exists(file_path):
+                error = 'El archivo de video no existe'
+            elif job['size'] is not None and os.path.getsize(file_path) != job['size']:
+                error = f'El tamaño del archivo ({os.path.getsize(file_path)} bytes) no coincide con el de la descarga ({job["size"]} bytes)'
+            else:
+                error = check_mp4_container(file_path) if file_path.lower().endswith('.mp4') else None
+
+            if error:
+                self.__print(colorama.Fore.RED + f'ERROR: El video {job["folder"]} está dañado y no se subirá. {error}')
+                self.job_store.mark_download_failed(job['url'], error)
+            else:
+                valid_jobs.append(job)
+        return valid_jobs
+
+    #Get the folders of the downloaded videos that were not uploaded yet
+    def get_ready_folders(self):
+        """Devuelve las carpetas de los videos descargados que aún no se han subido, ordenadas por nombre, omitiendo los videos dañados."""
+        if self.is_new_job_store:
+            self.import_video_folders()
+            self.is_new_job_store = False
+        return [job['folder'] for job in self.check_ready_uploads(self.job_store.get_ready_uploads())]
+
+    #Create the metadata content of a video from its record in the JSON data
+    def create_metadata_content(self, rec, session_number):
+        """Crea el contenido del archivo metadata.json (título y descripción) a partir del registro de la clase y su número de sesión."""
+        #Format the subject name as title
+        formatted_title = self.format_string_as_title(rec['subjectName'])
+
+        #Format the session number as S00, S01, S02, etc.
+        if session_number < 10:
+            session_number = f'S0{session_number}'
+        else:
+            session_number = f'S{session_number}'
+
+        return {"title": formatted_title + " " + self.config.period_str + " " + session_number,
+                "description": formatted_title + "\n" + rec['subjectId'] + "\n" + rec['teacher'] + "\n" + rec['date']}
+
+    #Format a string as title, keeping some words in lowercase and others in uppercase
+    def format_string_as_title(self, str):
+        """Formatea una cadena de texto como título, manteniendo algunas palabras en minúsculas y otras en mayúsculas."""
+        words = str.title().split()
+        formatted_words = [word.upper() if word.upper() in self.config.uppercase_words else
+                           word.lower() if i != 0 and word.lower() in self.config.lowercase_words else
+                           word for i, word in enumerate(words)]
+        return " ".join(formatted_words)
+
+    #Delete a video folder and all its files from the videos folder
+    def delete_video_folder(self, folder, staging_budget=None):
+        """Elimina la carpeta de un video y todos sus archivos de la carpeta de videos y, si se proporciona, libera su espacio en el presupuesto de la carpeta de videos."""
+        #Delete the video file and the metadata file in the video folder
+        delete_all_files_and_folders(os.path.join(self.config.videos_folder_path, folder))
+        #Delete the video folder
+        os.rmdir(os.path.join(self.config.videos_folder_path, folder))
+        if staging_budget is not None:
+            staging_budget.release(folder)
+
+    #---> UPLOAD
+
+    #Create the Firefox session shared by the uploads with the profile of the config
+    def create_upload_session(self):
+        """Crea la sesión de Firefox de las subidas con el perfil y las opciones de la configuración."""
+        #Imported here so only the uploads load selenium
+        from youtube_uploader_selenium import YouTubeUploadSession
+
+        return YouTubeUploadSession(self.config.profile_path, self.config.headless, max_wait=self.config.max_wait_time,
+                                    progress_callback=self.__record_upload_progress,
+                                    stall_timeout=self.config.upload_stall_timeout, timer=self.timer, lean=self.config.lean_browser,
+                                    fast_fill=self.config.fast_fill,
+                                    profile_template_path=self.config.profile_template_path if self.config.profile_template else None)
+
+    def __record_upload_progress(self, progress):
+        #The progress of a new video starts again from zero
+        if progress.uploaded_bytes < self.uploaded_bytes:
+            self.uploaded_bytes = 0
+        self.bandwidth_limiter.record_upload(progress.uploaded_bytes - self.uploaded_bytes)
+        self.uploaded_bytes = progress.uploaded_bytes
+        if self.verbose:
+            print_upload_progress(progress)
+
+    #Upload the video of a folder in the videos folder to YouTube, retrying the temporary errors
+    def upload_video_folder(self, folder, upload_session, stop_event=None):
+        """Sube a YouTube el video de la carpeta dada con la sesión de subida dada, salvo que sea un duplicado, y devuelve una tupla (was_video_uploaded, video_id)."""
+        video_path = os.path.join(self.config.videos_folder_path, folder, folder + '.mp4')
+        metadata_path = os.path.join(self.config.videos_folder_path, folder, 'metadata.json')
+
+        def print_retry(error, attempt, delay):
+            self.__print(colorama.Fore.YELLOW + f'AVISO: Error al subir el video {folder} ({str(error).strip()}). Intento {attempt + 1} de {self.retry_policy.max_attempts} en {delay:.0f} segundos.')
+
+        #The downloads leave the upload reserve of the bandwidth free while the video is uploaded
+        def upload():
+            self.uploaded_bytes = 0
+            self.bandwidth_limiter.upload_started()
+            try:
+                return upload_session.upload(video_path, metadata_path)
+            finally:
+                self.bandwidth_limiter.upload_finished()
+
+        #Skip a video whose content was already uploaded, before it takes an upload of the channel and YouTube rejects it as a duplicate
+        job = self.job_store.get_job_by_folder(folder)
+        checksum = job['checksum'] if job is not None else None
+        size, fingerprint = self.upload_index.check(video_path, checksum)
+
+        was_video_uploaded, video_id = self.retry_policy.call(upload, classify_upload_error, stop_event, print_retry)
+        if was_video_uploaded:
+            self.upload_index.add(size, fingerprint, read_json_file(metadata_path).get('title') or folder, video_id, folder, checksum=checksum)
+        return was_video_uploaded, video_id
+
+    #Record the error of an upload according to its class
+    def record_upload_error(self, folder, error, staging_budget=None):
+        """Muestra y registra el error de la subida del video de la carpeta dada según su clase y devuelve la clase de retry_policy."""
+        error_message = str(error).strip()
+        error_class = classify_upload_error(error)
+
+        if error_class == QUOTA:
+            self.__print(colorama.Fore.RED + 'ERROR: Se alcanzó el límite de subida de videos.')
+            self.scheduler.record_limit_reached()
+        elif error_class == AUTH:
+            self.__print(colorama.Fore.RED + 'ERROR: El navegador no tiene la sesión de YouTube iniciada. Inicie sesión con el perfil de Firefox y ejecute el script nuevamente. ' + error_message)
+        elif error_class == DUPLICATE:
+            self.__print(colorama.Fore.YELLOW + f'AVISO: El video {folder} es un duplicado, no se subirá y se eliminará. ' + error_message)
+            self.job_store.mark_upload_rejected(folder, error_message)
+
+            #The video is never uploaded, so its folder is deleted like the folder of an uploaded video
+            self.delete_video_folder(folder, staging_budget)
+        elif error_class == FATAL:
+            self.__print(colorama.Fore.RED + f'ERROR: No se subirá el video {folder}, no se volverá a intentar. ' + error_message)
+            self.job_store.mark_upload_rejected(folder, error_message)
+            if staging_budget is not None:
+                staging_budget.commit(folder, ready=False)
+        else:
+            self.__print(colorama.Fore.RED + 'ERROR al subir el video. ' + error_message)
+            self.job_store.mark_upload_failed(folder, error_message)
+
+            #A video that failed after attaching its file may have taken an upload of the channel
+            if is_attached_upload_error(error):
+                self.scheduler.record_upload()
+        return error_class
+
+    #Wait for a free slot of the rolling upload limit of the channel
+    def wait_for_upload_slot(self, wait_for_quota, stop_event=None):
+        """Devuelve True si el canal admite otra subida, esperando a que se libere un espacio si wait_for_quota es True, o False si las subidas se deben detener."""
+        if self.scheduler.get_remaining_uploads() > 0:
+            return True
+
+        next_slot_time = time.strftime('%Y-%m-%d %H:%M', time.localtime(self.scheduler.get_next_slot_time()))
+        if not wait_for_quota:
+            self.__print(colorama.Fore.YELLOW + f'AVISO: Se alcanzó el límite de subida del canal. El siguiente video se podrá subir a partir de {next_slot_time}.')
+            return False
+
+        self.__print(colorama.Fore.YELLOW + f'AVISO: Se alcanzó el límite de subida del canal. Esperando hasta {next_slot_time}...')
+        return self.scheduler.wait_for_slot(stop_event)
+
+    #Upload the video folders in parallel with the profiles of the config or one after another with its profile
+    def upload(self, folders=None):
+        """Sube las carpetas de videos dadas, o las de get_ready_folders, en paralelo con config.upload_profiles o una tras otra. Devuelve un UploadResult."""
+        time_start = time.time()
+        video_folders = self.get_ready_folders() if folders is None else list(folders)
+        if len(video_folders) == 0:
+            return UploadResult([], [], 0, 0.0, time.time() - time_start)
+
+        if self.config.use_profiles:
+            uploaded_videos, pending_videos, transferred_bytes, transfer_time = run_upload_workers(video_folders, self.config.upload_profiles, self.config.videos_folder_path,
+                                                                                                   self.config.headless, self.config.max_wait_time, self.job_store,
+                                                                                                   self.config.jobs_database_path, self.config.wait_for_quota,
+                                                                                                   self.config.upload_stall_timeout, self.timer, self.delete_video_folder,
+                                                                                                   self.retry_policy, self.config.lean_browser, self.config.fast_fill,
+                                                                                                   self.config.profile_template_path if self.config.profile_template else None,
+                                                                                                   self.delete_video_folder)
+        else:
+            uploaded_videos, pending_videos, transferred_bytes, transfer_time = self.upload_video_folders(video_folders)
+        return UploadResult(uploaded_videos, pending_videos, transferred_bytes, transfer_time, time.time() - time_start)
+
+    #Upload the video folders one after another with the Firefox profile of the config
+    def upload_video_folders(self, video_folders):
+        """Sube las carpetas de videos una tras otra y devuelve una tupla (uploaded_videos, pending_videos, transferred_bytes, transfer_time)."""
+        #List to store the uploaded videos
+        uploaded_videos = []
+
+        #List to store the pending videos to upload in case of an error
+        pending_videos = []
+
+        #Firefox session shared by all the uploads
+        upload_session = self.create_upload_session()
+
+        #Iterate over the video folders
+        for index, folder in enumerate(video_folders):
+            #Stop before the browser fails at the last step if the channel has no uploads left
+            if not self.wait_for_upload_slot(self.config.wait_for_quota):
+                pending_videos.extend(video_folders[index:])
+                break
+
+            try:
+                self.__print(colorama.Fore.MAGENTA + '************************************************')
+                self.__print(colorama.Fore.GREEN + 'Video ' + str(index + 1) + ' de ' + str(len(video_folders)) + ': ' + folder)
+
+                was_video_uploaded, video_id = self.upload_video_folder(folder, upload_session)
+                if was_video_uploaded:
+                    uploaded_videos.append(folder)
+                    self.job_store.mark_uploaded(folder, video_id)
+                    self.scheduler.record_upload()
+
+                    #Delete the uploaded video right away to free disk space
+                    self.delete_video_folder(folder)
+                assert was_video_uploaded
+
+            except Exception as e:
+                error_class = self.record_upload_error(folder, e)
+
+                #Add the current folder to the pending videos list, unless it was rejected
+                if error_class not in (FATAL, DUPLICATE):
+                    pending_videos.append(folder)
+
+                #Stop the loop if the upload limit was reached or the browser is not signed in, adding the following videos to the pending videos list
+                if error_class in (QUOTA, AUTH):
+                    pending_videos.extend(video_folders[index + 1:])
+                    break
+
+        #Close the browser
+        upload_session.close()
+
+        return uploaded_videos, pending_videos, upload_session.transferred_bytes, upload_session.transfer_time
+
+    #---> PIPELINE
+
+    #Download the pending videos of the jobs database and queue each folder as soon as it is ready to upload
+    def produce_ready_folders(self, session, ready_queue, stop_event, not_downloaded_videos, staging_budget):
+        """Descarga los videos pendientes y agrega cada carpeta a la cola de videos listos para subir en cuanto termina su descarga, y None al terminar."""
+
+        #Download a video when there is space for it and queue its folder if it was downloaded
+        def download_and_queue(job):
+            if not staging_budget.acquire(job['folder'], job['size'], stop_event=stop_event):
+                return True
+            was_downloaded = False
+            try:
+                if stop_event.is_set():
+                    return True
+                was_downloaded = self.download_video(job['url'], job['file_name'], json.loads(job['metadata']), session, job['expected_checksum'], stop_event)
+                if not was_downloaded:
+                    return False
+            finally:
+                staging_budget.commit(job['folder'], was_downloaded)
+            put_ready_folder(ready_queue, job['folder'], stop_event)
+            return True
+
+        try:
+            #Queue the videos downloaded in a previous run that were not uploaded
+            for job in self.check_ready_uploads(self.job_store.get_ready_uploads()):
+                staging_budget.commit(job['folder'])
+                if not put_ready_folder(ready_queue, job['folder'], stop_event):
+                    return
+
+            with ThreadPoolExecutor(max_workers=self.config.download_workers) as executor:
+                download_futures = [(job, executor.submit(download_and_queue, job)) for job in self.job_store.get_pending_downloads()]
+                not_downloaded_videos.extend(job['url'] for job, future in download_futures if not future.result())
+
+        finally:
+            #Tell the upload stage that there are no more videos
+            put_ready_folder(ready_queue, None, stop_event)
+
+    #Download and upload the videos at the same time
+    def run(self, records=None):
+        """Registra los registros JSON dados (si se proporcionan) y sube cada video en cuanto termina su descarga, mientras se descargan los siguientes. Devuelve un RunResult."""
+        time_start = time.time()
+        if records is not None:
+            self.register_records(records)
+
+        #Check if the videos folder exists, if not, create it
+        if not os.path.exists(self.config.videos_folder_path):
+            os.makedirs(self.config.videos_folder_path)
+
+        #Budget of the videos folder, the downloads wait for the uploaded videos to be deleted
+        staging_budget = self.__create_staging_budget()
+
+        #Lists to store the results of both processes
+        not_downloaded_videos = []
+        uploaded_videos = []
+        pending_videos = []
+
+        #Queue of folders ready to upload. Its size limits the downloaded videos waiting on disk
+        ready_queue = queue.Queue(maxsize=self.config.queue_size)
+
+        #Event to stop the download process if the upload process stops
+        stop_event = threading.Event()
+
+        #Start the DOWNLOAD process in the background
+        session = self.create_download_session()
+        producer = threading.Thread(target=self.produce_ready_folders,
+                                    args=(session, ready_queue, stop_event, not_downloaded_videos, staging_budget),
+                                    daemon=True)
+        producer.start()
+
+        #Firefox session shared by all the uploads
+        upload_session = self.create_upload_session()
+
+        #UPLOAD each video as soon as it is ready
+        while True:
+            try:
+                folder = ready_queue.get(timeout=1)
+            except queue.Empty:
+                #The download process stopped without sending the end of the queue
+                if not producer.is_alive():
+                    break
+                continue
+            if folder is None:
+                break
+
+            #Stop the download process if the channel has no uploads left and the script should not wait
+            if not self.wait_for_upload_slot(self.config.wait_for_quota):
+                pending_videos.append(folder)
+                stop_event.set()
+                while not ready_queue.empty():
+                    folder = ready_queue.get()
+                    if folder is not None:
+                        pending_videos.append(folder)
+                break
+
+            self.__print(colorama.Fore.MAGENTA + '************************************************')
+            self.__print(colorama.Fore.GREEN + 'Subiendo video ' + str(len(uploaded_videos) + len(pending_videos) + 1) + ': ' + folder)
+
+            try:
+                was_video_uploaded, video_id = self.upload_video_folder(folder, upload_session, stop_event)
+                assert was_video_uploaded
+                uploaded_videos.append(folder)
+                self.job_store.mark_uploaded(folder, video_id)
+                self.scheduler.record_upload()
+
+                #Delete the uploaded video right away to free disk space for the next downloads
+                self.delete_video_folder(folder, staging_budget)
+
+            except Exception as e:
+                error_class = self.record_upload_error(folder, e, staging_budget)
+                if error_class not in (FATAL, DUPLICATE):
+                    pending_videos.append(folder)
+
+                    #The video is not uploaded again in this run, so its space cannot be expected to be freed by an upload
+                    staging_budget.commit(folder, ready=False)
+
+                if error_class in (QUOTA, AUTH):
+                    #Stop the download process and add the queued videos to the pending videos list
+                    stop_event.set()
+                    while not ready_queue.empty():
+                        folder = ready_queue.get()
+                        if folder is not None:
+                            pending_videos.append(folder)
+                    break
+
+        producer.join()
+        upload_session.close()
+
+        return RunResult(uploaded_videos, pending_videos, not_downloaded_videos, upload_session.transferred_bytes, upload_session.transfer_time,
+                         time.time() - time_start)
+
+    #---> WATCH
+
+    #Watch a folder for JSON files, download their videos and queue the folders ready to upload until the stop event is set
+    def produce_watched_folders(self, watch_folder_path, session, ready_queue, queued_folders, stop_event, staging_budget):
+        """Registra, descarga y agrega a la cola los videos nuevos de la carpeta vigilada y de la carpeta de videos cada config.poll_interval segundos, hasta que stop_event se active."""
+        json_changes = ChangeDetector()
+        folder_changes = ChangeDetector()
+        downloads = {}
+        max_attempts = self.config.watch_max_attempts
+
+        with ThreadPoolExecutor(max_workers=self.config.download_workers) as executor:
+            while not stop_event.is_set():
+                #An error of a poll, like a removed watch folder or a locked database, does not stop the watch and the poll is done again
+                try:
+                    #Register the videos of the JSON files that finished being copied
+                    for json_file_path in json_changes.update(scan_json_files(watch_folder_path)):
+                        try:
+                            new_jobs = self.register_file(json_file_path)
+                        except (OSError, ValueError, KeyError) as e:
+                            self.__print(colorama.Fore.RED + f'ERROR al leer el archivo JSON {json_file_path}. {e}')
+                            continue
+                        if new_jobs > 0:
+                            self.__print(colorama.Fore.WHITE + f'---> {new_jobs} videos nuevos en {os.path.basename(json_file_path)}')
+
+                    #Register the video folders that finished being copied to the videos folder
+                    self.import_video_folders(folder_changes.update(scan_video_folders(self.config.videos_folder_path)))
+
+                    #Start the downloads that are not running, each one waits in its worker for space in the videos folder
+                    downloads = {url: future for url, future in downloads.items() if not future.done()}
+                    for job in self.job_store.get_pending_downloads():
+                        if job['url'] not in downloads and job['download_attempts'] < max_attempts:
+                            downloads[job['url']] = executor.submit(self.download_video_within_budget, job, session, staging_budget, stop_event=stop_event)
+
+                    #Queue the downloaded videos that are not waiting for their upload yet
+                    ready_jobs = [job for job in self.job_store.get_ready_uploads() if job['folder'] not in queued_folders and job['upload_attempts'] < max_attempts]
+                    for job in self.check_ready_uploads(ready_jobs):
+                        staging_budget.commit(job['folder'])
+                        queued_folders.add(job['folder'])
+                        ready_queue.put(job['folder'])
+                except Exception as e:
+                    self.__print(colorama.Fore.RED + 'ERROR al revisar la carpeta vigilada, se intentará de nuevo en el siguiente sondeo. ' + str(e).strip())
+
+                stop_event.wait(self.config.poll_interval)
+
+    #Process the JSON files copied to a folder until the stop event is set
+    def watch(self, watch_folder_path, stop_event):
+        """Vigila la carpeta dada y sube sus videos a medida que se descargan, hasta que stop_event se active o el navegador no tenga la sesión iniciada. Devuelve un RunResult."""
+        time_start = time.time()
+
+        #Check if the videos folder exists, if not, create it
+        if not os.path.exists(self.config.videos_folder_path):
+            os.makedirs(self.config.videos_folder_path)
+
+        staging_budget = self.__create_staging_budget()
+
+        #Folders in the queue or being uploaded. The staging budget already limits the downloaded videos, so the queue has no limit
+        ready_queue = queue.Queue()
+        queued_folders = set()
+        uploaded_videos = []
+
+        #Start the DOWNLOAD process in the background
+        session = self.create_download_session()
+        producer = threading.Thread(target=self.produce_watched_folders,
+                                    args=(watch_folder_path, session, ready_queue, queued_folders, stop_event, staging_budget),
+                                    daemon=True)
+        producer.start()
+
+        #Firefox session shared by all the uploads, started now so it is ready for the first video
+        upload_session = self.create_upload_session()
+        try:
+            try:
+                upload_session.start()
+            except Exception as e:
+                self.__print(colorama.Fore.RED + 'ERROR al iniciar el navegador, se intentará de nuevo en la primera subida. ' + str(e).strip())
+
+            #UPLOAD each video as soon as it is ready
+            while not stop_event.is_set():
+                try:
+                    folder = ready_queue.get(timeout=1)
+                except queue.Empty:
+                    #No video is downloaded or queued without the download process, so the watch stops
+                    if not producer.is_alive() and not stop_event.is_set():
+                        self.__print(colorama.Fore.RED + 'ERROR: El proceso de descarga se detuvo inesperadamente, se detiene la vigilancia de la carpeta.')
+                        break
+                    continue
+
+                #The video stays downloaded for the next run if the script stops while waiting
+                if not self.wait_for_upload_slot(True, stop_event):
+                    break
+
+                self.__print(colorama.Fore.MAGENTA + '************************************************')
+                self.__print(colorama.Fore.GREEN + 'Subiendo video ' + str(len(uploaded_videos) + 1) + ': ' + folder)
+
+                try:
+                    was_video_uploaded, video_id = self.upload_video_folder(folder, upload_session, stop_event)
+                    assert was_video_uploaded
+                    uploaded_videos.append(folder)
+                    self.job_store.mark_uploaded(folder, video_id)
+                    self.scheduler.record_upload()
+
+                    #Delete the uploaded video right away to free disk space for the next downloads
+                    self.delete_video_folder(folder, staging_budget)
+
+                except Exception as e:
+                    #The upload limit is not an error of the video, it is uploaded again when the channel has uploads left
+                    error_class = self.record_upload_error(folder, e, staging_budget)
+
+                    #No video can be uploaded until the browser is signed in again, so the watch stops
+                    if error_class == AUTH:
+                        break
+
+                    #Queue the video again in the next poll, unless it was rejected
+                    if error_class not in (FATAL, DUPLICATE):
+                        queued_folders.discard(folder)
+
+                    #A video without attempts left is not queued again, so its space cannot be expected to be freed by an upload
+                    job = self.job_store.get_job_by_folder(folder)
+                    if error_class in (RETRYABLE, FAILED) and job is not None and job['upload_attempts'] >= self.config.watch_max_attempts:
+                        staging_budget.commit(folder, ready=False)
+
+        finally:
+            #Wait for the downloads in progress before closing the browser
+            stop_event.set()
+            producer.join()
+            upload_session.close()
+
+        return RunResult(uploaded_videos, [], [], upload_session.transferred_bytes, upload_session.transfer_time, time.time() - time_start)
+
+
+#---> FUNCTIONS
+
+#Read the bandwidth limits of a config.ini file
+def read_bandwidth_limits(config):
+    """Devuelve los límites de ancho de banda en MB/s del ConfigParser dado como un diccionario en bytes por segundo, con None si no hay límite."""
+    limits = {}
+    for name, key in (('total_bandwidth', 'TOTAL_BANDWIDTH_MBPS'), ('download_bandwidth', 'DOWNLOAD_BANDWIDTH_MBPS'), ('upload_bandwidth_reserve', 'UPLOAD_BANDWIDTH_RESERVE_MBPS')):
+        value = config.getfloat('DEFAULT', key, fallback=0) or 0
+        limits[name] = int(value * 1024 * 1024) if value > 0 else None
+    return limits
+
+#Format the bandwidth limits to show them in the console
+def format_bandwidth_limits(limits):
+    """Devuelve los límites de ancho de banda dados (en bytes por segundo) como texto en MB/s."""
+    def format_rate(rate):
+        return f'{rate / (1024 * 1024):.2f} MB/s' if rate else 'sin límite'
+    return (f'total {format_rate(limits["total_bandwidth"])}, descargas {format_rate(limits["download_bandwidth"])}, '
+            f'reserva de subida {format_rate(limits["upload_bandwidth_reserve"])}')
+
+#Get the modification time of a file
+def get_file_mtime(file_path):
+    """Devuelve la fecha de modificación del archivo dado, o None si no se proporciona o no existe."""
+    try:
+        return os.path.getmtime(file_path) if file_path else None
+    except OSError:
+        return None
+
+#List all folders in the directory
+def list_folders(folder_path):
+    """Devuelve una lista de todas las carpetas en el directorio dado."""
+    elements = os.listdir(folder_path)
+    folders = [elem for elem in elements if os.path.isdir(os.path.join(folder_path, elem))]
+    return folders
+
+#Delete all files and folders in the directory
+def delete_all_files_and_folders(folder_path, keep_partial_downloads=False):
+    """Elimina todos los archivos y carpetas en el directorio dado. Si keep_partial_downloads es True, conserva las descargas parciales (.part) para poder reanudarlas."""
+    for filename in os.listdir(folder_path):
+        file_path = os.path.join(folder_path, filename)
+        if keep_partial_downloads and (filename.endswith('.part') or filename.endswith('.part.json')):
+            continue
+        try:
+            if os.path.isfile(file_path) or os.path.islink(file_path):
+                os.unlink(file_path)
+            elif os.path.isdir(file_path):
+                shutil.rmtree(file_path)
+        except Exception as e:
+            print(colorama.Fore.RED + f'ERROR al eliminar {file_path}. Razón: {e}')
+
+#Read a json file
+def read_json_file(file_path):
+    """Lee un archivo JSON y devuelve los datos."""
+    with open(file_path, 'r', encoding="utf8") as file:
+        json_obj = json.load(file)
+    return json_obj
+
+#Iterate over the records of a JSON file with a list of records without loading the whole file
+def iter_json_records(file_path, chunk_size=64 * 1024):
+    """Devuelve uno a uno los registros de un archivo JSON que contiene una lista, leyendo el archivo por partes, de modo que la memoria usada no crece con el tamaño del archivo."""
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding="utf-8-sig") as file:
+        buffer = ''
+        started = False
+        while True:
+            buffer = buffer.lstrip()
+
+            #Read more of the file when the buffer has no complete token
+            if not buffer:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise ValueError('El archivo JSON termina antes del cierre de la lista')
+                buffer += chunk
+                continue
+
+            if not started:
+                if not buffer.startswith('['):
+                    raise ValueError('El archivo JSON debe contener una lista de registros')
+                buffer = buffer[1:]
+                started = True
+                continue
+
+            if buffer.startswith(']'):
+                return
+            if buffer.startswith(','):
+                buffer = buffer[1:]
+                continue
+
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                #The record continues in the next part of the file
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer += chunk
+                continue
+
+            yield record
+            buffer = buffer[end:]
+
+#Write a json file
+def write_json(file_path, data):
+    """Escribe los datos en un archivo JSON."""
+    with open(file_path, 'w', encoding="utf-8") as file:
+        json.dump(data, file)
+    return file_path
+
+#Get the file name from the last part of the url
+def get_file_name_from_url(url):
+    """Obtiene el nombre del archivo de la última parte de la URL dada."""
+    return os.path.basename(urlparse(url).path)
+
+#Get the total size of the file from a Content-Range header
+def get_total_size_from_content_range(content_range):
+    """Obtiene el tamaño total del archivo a partir de una cabecera Content-Range (por ejemplo, 'bytes 100-999/1000'). Si no se conoce, devuelve None."""
+    if not content_range or '/' not in content_range:
+        return None
+    total_size = content_range.split('/')[-1].strip()
+    return int(total_size) if total_size.isdigit() else None
+
+#Get the first byte of a Content-Range header
+def get_start_from_content_range(content_range):
+    """Obtiene el primer byte de una cabecera Content-Range (por ejemplo, 100 en 'bytes 100-999/1000'). Si no se conoce, devuelve None."""
+    if not content_range or '-' not in content_range:
+        return None
+    start = content_range.split('-')[0].split()[-1]
+    return int(start) if start.isdigit() else None
+
+#Get the last byte of a Content-Range header
+def get_end_from_content_range(content_range):
+    """Obtiene el último byte de una cabecera Content-Range (por ejemplo, 999 en 'bytes 100-999/1000'). Si no se conoce, devuelve None."""
+    if not content_range or '-' not in content_range:
+        return None
+    end = content_range.split('-', 1)[1].split('/')[0].strip()
+    return int(end) if end.isdigit() else None
+
+#Split a file in byte ranges of about the same size
+def split_into_segments(size, count):
+    """Divide un archivo de size bytes en count segmentos consecutivos de tamaño similar. Devuelve una lista de diccionarios {start, end, downloaded} con end inclusivo."""
+    count = max(1, min(count, size))
+    segment_size = -(-size // count)
+    return [{"start": start, "end": min(start + segment_size, size) - 1, "downloaded": 0} for start in range(0, size, segment_size)]
+
+#Check if all the bytes of a segment were downloaded
+def is_segment_complete(segment):
+    """Devuelve True si se descargaron todos los bytes del segmento dado."""
+    return segment['start'] + segment['downloaded'] > segment['end']
+
+#Read the state of a partial download
+def read_part_state(state_file_path):
+    """Lee el archivo .part.json con el estado de una descarga parcial, o devuelve un diccionario vacío si no existe o está dañado."""
+    try:
+        return read_json_file(state_file_path)
+    except (OSError, ValueError):
+        return {}
+
+#Write the state of a partial download
+def write_part_state(state_file_path, state):
+    """Escribe el archivo .part.json con el estado de una descarga parcial, reemplazándolo de una vez para que una interrupción no lo deje a medias."""
+    write_json(state_file_path + '.tmp', state)
+    os.replace(state_file_path + '.tmp', state_file_path)
+
+#Create a requests session to reuse the HTTP connections between downloads
+def create_download_session(pool_size):
+    """Crea una sesión de requests con un pool de conexiones del tamaño dado para reutilizar las conexiones HTTP entre descargas."""
+    #Imported here so the uploads and --help do not load requests
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+#Update a checksum with the content of a file
+def update_checksum_from_file(sha256, file_path, chunk_size=1024 * 1024):
+    """Actualiza el checksum dado con el contenido de un archivo, leyéndolo por partes."""
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            sha256.update(chunk)
+
+#Calculate the SHA-256 checksum of a file
+def calculate_file_checksum(file_path, chunk_size=1024 * 1024):
+    """Calcula el checksum SHA-256 de un archivo leyéndolo por partes."""
+    sha256 = hashlib.sha256()
+    update_checksum_from_file(sha256, file_path, chunk_size)
+    return sha256.hexdigest()
+
+#Put a folder in the queue of videos ready to upload, waiting while the queue is full
+def put_ready_folder(ready_queue, folder, stop_event):
+    """Agrega una carpeta a la cola de videos listos para subir, esperando mientras la cola esté llena. Devuelve False si el proceso de subida se detuvo antes de poder agregarla."""
+    while not stop_event.is_set():
+        try:
+            ready_queue.put(folder, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+#Print the progress of the upload of a video on the same line
+def print_upload_progress(progress):
+    """Muestra en la misma línea el porcentaje, la velocidad y el tiempo restante de la subida de un video."""
+    eta = f'{int(progress.eta // 60)}m {int(progress.eta % 60)}s' if progress.eta is not None else '--'
+    print(colorama.Fore.CYAN + f'Subiendo: {progress.percent:5.1f}% | {progress.bytes_per_second / (1024 * 1024):.2f} MB/s | Restante: {eta}   ',
+          end='\n' if progress.percent >= 100 else '\r', flush=True)
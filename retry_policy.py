@@ -0,0 +1,123 @@
+import errno
+import random
+import time
+
+
+#---> CONSTANTS
+
+#Classes of the errors of the downloads and the uploads
+RETRYABLE = 'retryable'
+QUOTA = 'quota'
+AUTH = 'auth'
+FATAL = 'fatal'
+
+#Class of the unexpected errors of an upload: not retried in the run, but the video is uploaded again in the next run
+FAILED = 'failed'
+
+#Class of the videos whose content was already uploaded: not uploaded again and their folder is deleted
+DUPLICATE = 'duplicate'
+
+#HTTP status codes of the temporary errors of the server
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+#Text of the error container of YouTube Studio when the channel reached its daily upload limit
+DAILY_LIMIT_ERROR_TEXT = 'daily upload limit'
+
+
+#---> CLASSES
+
+class RetryPolicy:
+    """Reintenta una operación con esperas exponenciales y aleatorias hasta max_attempts intentos, sin guardar estado entre operaciones."""
+
+    def __init__(self, max_attempts=4, base_delay=5, max_delay=300, multiplier=2, jitter=True):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = max(0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self.multiplier = max(1, multiplier)
+        self.jitter = jitter
+
+    def get_delay(self, attempt, retry_after=None):
+        """Devuelve los segundos que se espera después del intento fallido número attempt, al menos los de la cabecera Retry-After sin superar max_delay."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(delay / 2, delay)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def call(self, function, classify, stop_event=None, on_retry=None):
+        """Llama a function y devuelve su resultado, reintentando las excepciones que classify marca como RETRYABLE hasta max_attempts intentos."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return function()
+            except Exception as e:
+                if attempt >= self.max_attempts or classify(e) != RETRYABLE:
+                    raise
+                delay = self.get_delay(attempt, get_retry_after(e))
+                if on_retry is not None:
+                    on_retry(e, attempt, delay)
+                if stop_event is None:
+                    time.sleep(delay)
+                elif stop_event.wait(delay):
+                    raise
+
+
+#---> FUNCTIONS
+
+#Classify an error of a download
+def classify_download_error(error):
+    """Clasifica un error de descarga como RETRYABLE si es temporal o FATAL si no se resuelve reintentando."""
+    #Imported here so the uploads and --help do not load requests
+    import requests
+
+    if isinstance(error, requests.HTTPError):
+        status_code = error.response.status_code if error.response is not None else None
+        return RETRYABLE if status_code is None or status_code in RETRYABLE_STATUS_CODES else FATAL
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError)):
+        return RETRYABLE
+    if isinstance(error, requests.RequestException):
+        return FATAL
+    if isinstance(error, OSError):
+        return FATAL if error.errno in (errno.ENOSPC, errno.EACCES, errno.EROFS) else RETRYABLE
+    return FATAL
+
+#Classify an error of an upload
+def classify_upload_error(error):
+    """Clasifica un error de subida como QUOTA, AUTH, FATAL, DUPLICATE, RETRYABLE o, si no se reintenta en la ejecución pero no impide subir el video en la siguiente, FAILED."""
+    #Imported here because the upload errors only happen after the uploader is imported
+    from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+    from youtube_uploader_selenium import Constant, NotSignedInException, UploadAttachedException, UploadRejectedException, UploadStalledException
+    from upload_index import DuplicateVideoException
+
+    if Constant.UPLOAD_LIMIT_ERROR_MESSAGE in str(error):
+        return QUOTA
+    #A duplicate that the checksum of the whole file does not confirm is rejected without deleting its folder
+    if isinstance(error, DuplicateVideoException):
+        return DUPLICATE if error.is_confirmed else FATAL
+    #YouTube may already have a draft of the video, so attaching it again would take another upload of the channel
+    if isinstance(error, UploadAttachedException):
+        return FAILED
+    if isinstance(error, NotSignedInException):
+        return AUTH
+    if isinstance(error, UploadRejectedException):
+        return QUOTA if DAILY_LIMIT_ERROR_TEXT in str(error).lower() else FATAL
+    if isinstance(error, (TimeoutException, StaleElementReferenceException, UploadStalledException, WebDriverException)):
+        return RETRYABLE
+    return FAILED
+
+#Get the seconds to wait sent by the server with an error
+def get_retry_after(error):
+    """Devuelve los segundos de la cabecera Retry-After de la respuesta del error dado, o None si no tiene respuesta o la cabecera no indica segundos."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    retry_after = headers.get('Retry-After', '') if headers is not None else ''
+    return int(retry_after) if retry_after.strip().isdigit() else None
+
+#Check if an upload failed after its file was attached
+def is_attached_upload_error(error):
+    """Devuelve True si la subida falló con el archivo ya adjunto, así que YouTube puede haber usado una subida del canal."""
+    #Imported here because the upload errors only happen after the uploader is imported
+    from youtube_uploader_selenium import UploadAttachedException
+    return isinstance(error, UploadAttachedException)
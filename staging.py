@@ -0,0 +1,96 @@
+import os
+import shutil
+import threading
+
+
+#---> FUNCTIONS
+
+#Calculate the size of all the files in a folder
+def get_folder_size(folder_path):
+    """Calcula el tamaño en bytes de todos los archivos de una carpeta y sus subcarpetas."""
+    size = 0
+    for root, _, files in os.walk(folder_path):
+        for file_name in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file_name))
+            except OSError:
+                pass
+    return size
+
+
+#---> CLASSES
+
+class StagingBudget:
+    """Limita el espacio que ocupan los videos en la carpeta de videos mientras esperan ser subidos.
+    Una descarga solo se admite si el espacio ocupado más el reservado por las descargas en curso y el tamaño estimado del video no supera max_bytes
+    y si el disco conserva al menos min_free_bytes libres. Siempre se admite una descarga si no hay descargas en curso ni videos descargados esperando su subida,
+    porque entonces nada liberará espacio y esperar bloquearía el proceso (por ejemplo, si la carpeta solo tiene restos de descargas fallidas).
+    Puede usarse desde varios hilos."""
+
+    def __init__(self, folder_path, max_bytes=None, min_free_bytes=0, poll_interval=1):
+        self.folder_path = folder_path
+        self.max_bytes = max_bytes
+        self.min_free_bytes = min_free_bytes
+        self.poll_interval = poll_interval
+        self.condition = threading.Condition()
+        self.staged = {}
+        self.reserved = {}
+        self.ready = set()
+
+        #Count the videos left in the folder by previous runs
+        if os.path.exists(folder_path):
+            for folder in os.listdir(folder_path):
+                if os.path.isdir(os.path.join(folder_path, folder)):
+                    self.staged[folder] = get_folder_size(os.path.join(folder_path, folder))
+
+    def get_used_bytes(self):
+        """Devuelve los bytes ocupados por los videos de la carpeta más los reservados por las descargas en curso."""
+        with self.condition:
+            return sum(self.staged.values()) + sum(self.reserved.values())
+
+    def __estimate_size(self):
+        sizes = [size for size in self.staged.values() if size > 0]
+        return sum(sizes) // len(sizes) if sizes else 0
+
+    def __has_room(self, expected_bytes):
+        if not self.ready and not self.reserved:
+            return True
+        if self.max_bytes is not None and sum(self.staged.values()) + sum(self.reserved.values()) + expected_bytes > self.max_bytes:
+            return False
+        free_bytes = shutil.disk_usage(self.folder_path).free
+        return free_bytes - expected_bytes >= self.min_free_bytes
+
+    def acquire(self, folder, expected_bytes=None, block=True, stop_event=None):
+        """Reserva espacio para descargar el video de la carpeta dada. Si no se conoce su tamaño, se estima con el tamaño medio de los videos de la carpeta.
+        Si block es True, espera hasta que haya espacio; si no, devuelve False de inmediato. También devuelve False si stop_event se activa mientras espera."""
+        with self.condition:
+            if expected_bytes is None:
+                expected_bytes = self.__estimate_size()
+            while not self.__has_room(expected_bytes):
+                if not block or (stop_event is not None and stop_event.is_set()):
+                    return False
+                #Free space can also change outside the script, so check it again from time to time
+                self.condition.wait(self.poll_interval)
+            self.reserved[folder] = expected_bytes
+            return True
+
+    def commit(self, folder, ready=True):
+        """Cambia la reserva de la carpeta por el tamaño real de sus archivos, después de su descarga.
+        ready indica si el video se descargó y espera su subida; si la descarga falló, sus archivos ocupan espacio pero no se liberarán con una subida."""
+        size = get_folder_size(os.path.join(self.folder_path, folder))
+        with self.condition:
+            self.reserved.pop(folder, None)
+            self.staged[folder] = size
+            if ready:
+                self.ready.add(folder)
+            else:
+                self.ready.discard(folder)
+            self.condition.notify_all()
+
+    def release(self, folder):
+        """Libera el espacio de la carpeta después de eliminarla."""
+        with self.condition:
+            self.reserved.pop(folder, None)
+            self.staged.pop(folder, None)
+            self.ready.discard(folder)
+            self.condition.notify_all()
@@ -1,13 +1,17 @@
 import argparse
-from youtube_uploader_selenium import YouTubeUploader
 from typing import Optional
 
 
 def main(video_path: str,
          metadata_path: Optional[str] = None,
          thumbnail_path: Optional[str] = None,
-         profile_path: Optional[str] = None):
-    uploader = YouTubeUploader(video_path, metadata_path, thumbnail_path, profile_path)
+         profile_path: Optional[str] = None,
+         lean: bool = False,
+         fast_fill: bool = False):
+    # Imported here so --help does not load selenium
+    from youtube_uploader_selenium import YouTubeUploader
+
+    uploader = YouTubeUploader(video_path, metadata_path, thumbnail_path, profile_path, lean=lean, fast_fill=fast_fill)
     was_video_uploaded, video_id = uploader.upload()
     assert was_video_uploaded
 
@@ -22,6 +26,12 @@ if __name__ == "__main__":
                         help='Path to the thumbnail image',)
     parser.add_argument("--meta", help='Path to the JSON file with metadata')
     parser.add_argument("--profile", help='Path to the firefox profile')
+    parser.add_argument("--lean",
+                        help='Do not load images, fonts, media and the requests that the upload dialog does not need',
+                        action='store_true')
+    parser.add_argument("--fast-fill",
+                        help='Fill the upload form with scripts run in the page instead of one browser command per step',
+                        action='store_true')
     args = parser.parse_args()
 
-    main(args.video, args.meta, args.thumbnail, profile_path=args.profile)
+    main(args.video, args.meta, args.thumbnail, profile_path=args.profile, lean=args.lean, fast_fill=args.fast_fill)
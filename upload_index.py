@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+#---> CONSTANTS
+
+#Files up to this size are hashed whole, larger files are fingerprinted from samples of their content
+FULL_HASH_MAX_SIZE = 64 * 1024 * 1024
+
+#Size and number of the samples of the fingerprint of a large file, spread from its start to its end
+SAMPLE_SIZE = 1024 * 1024
+SAMPLE_COUNT = 16
+
+#Schema of the index of the uploaded videos in the jobs database. The primary key is the index of the lookups
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploaded_videos (
+    channel TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    checksum TEXT,
+    title TEXT,
+    video_id TEXT,
+    folder TEXT,
+    uploaded_at REAL NOT NULL,
+    PRIMARY KEY (channel, size, fingerprint)
+) WITHOUT ROWID;
+"""
+
+
+#Columns added to the index after its first version, with their types
+ADDED_COLUMNS = {'checksum': 'TEXT'}
+
+#Channel of the videos indexed before the index had a channel, the channel of the profile of the config
+DEFAULT_CHANNEL = 'default'
+
+
+#---> CLASSES
+
+class DuplicateVideoException(Exception):
+    """Se lanza antes de subir un video cuyo contenido ya se subió, según el índice de videos subidos. is_confirmed indica si lo confirma el checksum del archivo completo."""
+
+    def __init__(self, message, is_confirmed=True):
+        super().__init__(message)
+        self.is_confirmed = is_confirmed
+
+
+class UploadIndex:
+    """Índice de los videos subidos correctamente a un canal, guardado en la base de datos de trabajos, para detectar un duplicado antes de subirlo. Puede usarse desde varios hilos."""
+
+    def __init__(self, database_path, channel=DEFAULT_CHANNEL):
+        self.channel = channel
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(database_path, check_same_thread=False, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            columns = [row['name'] for row in self.connection.execute('PRAGMA table_info(uploaded_videos)')]
+            if columns and 'channel' not in columns:
+                #The primary key of the index of an earlier version has no channel, so its table is rebuilt with the videos in the default channel
+                self.connection.execute('ALTER TABLE uploaded_videos RENAME TO uploaded_videos_without_channel')
+                self.connection.execute(SCHEMA)
+                self.connection.execute('INSERT INTO uploaded_videos (channel, size, fingerprint, title, video_id, folder, uploaded_at) '
+                                        'SELECT ?, size, fingerprint, title, video_id, folder, uploaded_at FROM uploaded_videos_without_channel', (DEFAULT_CHANNEL,))
+                self.connection.execute('DROP TABLE uploaded_videos_without_channel')
+            self.connection.execute(SCHEMA)
+            columns = [row['name'] for row in self.connection.execute('PRAGMA table_info(uploaded_videos)')]
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.connection.execute(f'ALTER TABLE uploaded_videos ADD COLUMN {column} {column_type}')
+
+    def close(self):
+        """Cierra la conexión a la base de datos."""
+        with self.lock:
+            self.connection.close()
+
+    def find(self, size, fingerprint):
+        """Devuelve el video subido al canal con el tamaño y la huella dados como un diccionario (channel, size, fingerprint, checksum, title, video_id, folder, uploaded_at), o None si no se subió."""
+        with self.lock:
+            row = self.connection.execute('SELECT * FROM uploaded_videos WHERE channel = ? AND size = ? AND fingerprint = ?', (self.channel, size, fingerprint)).fetchone()
+        return dict(row) if row is not None else None
+
+    def add(self, size, fingerprint, title, video_id, folder=None, uploaded_at=None, checksum=None):
+        """Registra un video subido al canal con el checksum SHA-256 de su archivo completo, si se conoce. Si ya estaba registrado, se reemplaza con los datos de la última subida."""
+        with self.lock, self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO uploaded_videos (channel, size, fingerprint, checksum, title, video_id, folder, uploaded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                    (self.channel, size, fingerprint, checksum, title, video_id, folder, uploaded_at if uploaded_at is not None else time.time()))
+
+    def check(self, video_path, checksum=None):
+        """Lanza DuplicateVideoException si el video dado ya se subió al canal o, si no, devuelve una tupla (size, fingerprint) para registrarlo con add después de subirlo."""
+        size = os.path.getsize(video_path)
+        fingerprint = calculate_fingerprint(video_path)
+        uploaded_video = self.find(size, fingerprint)
+        if uploaded_video is None:
+            return size, fingerprint
+
+        #The fingerprint of a large file only samples its content, so only the checksum of the whole file confirms the match
+        uploaded_checksum = uploaded_video['checksum']
+        if size <= FULL_HASH_MAX_SIZE:
+            is_confirmed = True
+        elif checksum and uploaded_checksum:
+            if checksum.lower() != uploaded_checksum.lower():
+                return size, fingerprint
+            is_confirmed = True
+        else:
+            is_confirmed = False
+
+        uploaded_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(uploaded_video['uploaded_at']))
+        message = (f'El contenido del video ya se subió al canal {self.channel} el {uploaded_at} con el título "{uploaded_video["title"]}" '
+                   f'(video_id = {uploaded_video["video_id"]}, carpeta {uploaded_video["folder"]}).')
+        if not is_confirmed:
+            message += ' No se pudo confirmar con el checksum del archivo completo, así que se conserva su carpeta.'
+        raise DuplicateVideoException(message, is_confirmed)
+
+
+#---> FUNCTIONS
+
+#Calculate the fingerprint of the content of a file
+def calculate_fingerprint(file_path, full_hash_max_size=FULL_HASH_MAX_SIZE, sample_size=SAMPLE_SIZE, sample_count=SAMPLE_COUNT):
+    """Calcula una huella SHA-256 del contenido de un archivo. Los archivos de hasta full_hash_max_size bytes se leen completos; de los más grandes solo se leen
+    sample_count muestras de sample_size bytes repartidas desde el inicio hasta el final, así que la huella de un video de varios GB se calcula en milisegundos.
+    El tamaño del archivo forma parte de la huella."""
+    size = os.path.getsize(file_path)
+    sha256 = hashlib.sha256(str(size).encode())
+    with open(file_path, 'rb') as file:
+        if size <= full_hash_max_size:
+            for chunk in iter(lambda: file.read(sample_size), b''):
+                sha256.update(chunk)
+        else:
+            for index in range(sample_count):
+                file.seek((size - sample_size) * index // (sample_count - 1))
+                sha256.update(file.read(sample_size))
+    return sha256.hexdigest()
@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import time
+
+
+#---> CONSTANTS
+
+#Length of the rolling window of the upload limit of a channel, in seconds
+UPLOAD_LIMIT_WINDOW = 24 * 60 * 60
+
+#Schema of the uploads tables in the jobs database
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    channel TEXT NOT NULL,
+    uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_channel ON uploads (channel, uploaded_at);
+CREATE TABLE IF NOT EXISTS upload_blocks (
+    channel TEXT PRIMARY KEY,
+    blocked_until REAL NOT NULL
+);
+"""
+
+
+#---> CLASSES
+
+class UploadScheduler:
+    """Controla las subidas de un canal según su límite de subidas en una ventana móvil de 24 horas (100 videos las primeras 24 horas y luego 50, según YouTube).
+    Guarda la hora de cada subida en la base de datos de trabajos, calcula cuántas subidas quedan en la ventana y cuándo se libera el siguiente espacio.
+    El límite debe ser de al menos una subida."""
+
+    def __init__(self, database_path, channel, upload_limit, window=UPLOAD_LIMIT_WINDOW):
+        if upload_limit < 1:
+            raise ValueError(f'El límite de subida del canal {channel} debe ser de al menos 1 video (DAILY_UPLOAD_LIMIT = {upload_limit}).')
+        self.channel = channel
+        self.upload_limit = upload_limit
+        self.window = window
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(database_path, check_same_thread=False, timeout=30)
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Cierra la conexión a la base de datos."""
+        with self.lock:
+            self.connection.close()
+
+    def record_upload(self, uploaded_at=None):
+        """Registra una subida del canal."""
+        with self.lock, self.connection:
+            self.connection.execute('INSERT INTO uploads (channel, uploaded_at) VALUES (?, ?)',
+                                    (self.channel, uploaded_at if uploaded_at is not None else time.time()))
+
+    def record_limit_reached(self, now=None):
+        """Registra que YouTube rechazó una subida por el límite del canal. No se admiten más subidas hasta que se libere el espacio más antiguo de la ventana
+        o, si no hay subidas registradas, hasta que pase una ventana completa."""
+        now = now if now is not None else time.time()
+        with self.lock:
+            oldest_upload = self.connection.execute('SELECT MIN(uploaded_at) FROM uploads WHERE channel = ? AND uploaded_at > ?',
+                                                    (self.channel, now - self.window)).fetchone()[0]
+        blocked_until = oldest_upload + self.window if oldest_upload is not None else now + self.window
+        with self.lock, self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO upload_blocks (channel, blocked_until) VALUES (?, ?)', (self.channel, blocked_until))
+
+    def get_remaining_uploads(self, now=None):
+        """Devuelve cuántas subidas admite el canal en este momento."""
+        now = now if now is not None else time.time()
+        with self.lock:
+            blocked_until = self.connection.execute('SELECT blocked_until FROM upload_blocks WHERE channel = ?', (self.channel,)).fetchone()
+            if blocked_until is not None and blocked_until[0] > now:
+                return 0
+            uploads_in_window = self.connection.execute('SELECT COUNT(*) FROM uploads WHERE channel = ? AND uploaded_at > ?',
+                                                        (self.channel, now - self.window)).fetchone()[0]
+        return max(0, self.upload_limit - uploads_in_window)
+
+    def get_next_slot_time(self, now=None):
+        """Devuelve la hora (timestamp) en que el canal admitirá la siguiente subida."""
+        now = now if now is not None else time.time()
+        if self.get_remaining_uploads(now) > 0:
+            return now
+
+        with self.lock:
+            blocked_until = self.connection.execute('SELECT blocked_until FROM upload_blocks WHERE channel = ?', (self.channel,)).fetchone()
+            if blocked_until is not None and blocked_until[0] > now:
+                return blocked_until[0]
+
+            #The next slot opens when the upload that leaves the limit full goes out of the window
+            uploads_in_window = self.connection.execute('SELECT uploaded_at FROM uploads WHERE channel = ? AND uploaded_at > ? ORDER BY uploaded_at',
+                                                        (self.channel, now - self.window)).fetchall()
+
+        #An upload went out of the window or the block ended since the remaining uploads were counted
+        if len(uploads_in_window) < self.upload_limit:
+            return now
+        return uploads_in_window[len(uploads_in_window) - self.upload_limit][0] + self.window
+
+    def wait_for_slot(self, stop_event=None):
+        """Espera hasta que el canal admita la siguiente subida. Devuelve False si stop_event se activó antes."""
+        while self.get_remaining_uploads() == 0:
+            wait_time = max(1, min(60, self.get_next_slot_time() - time.time()))
+            if stop_event is not None:
+                if stop_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+        return True
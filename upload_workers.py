@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import queue
+import multiprocessing
+import colorama
+
+from youtube_uploader_selenium.Constant import Constant
+from youtube_uploader_selenium.timing import StepTimer
+from upload_scheduler import UploadScheduler
+from upload_index import UploadIndex
+from job_store import JobStore
+from retry_policy import RetryPolicy, classify_upload_error, is_attached_upload_error, QUOTA, AUTH, FATAL, DUPLICATE
+
+
+#---> FUNCTIONS
+
+#Upload the videos of a shared queue with one Firefox profile until the queue is empty or the profile reaches its daily limit
+def upload_worker(profile, videos_folder_path, headless_mode, max_wait, work_queue, result_queue, database_path, wait_for_quota, stall_timeout, span_queue, retry_policy,
+                  lean_browser=False, fast_fill=False, profile_template_path=None):
+    """Sube los videos de la cola compartida con el perfil de Firefox dado hasta que la cola quede vacía, el canal alcance su límite de subida o el navegador no tenga la sesión iniciada."""
+    #Imported here so only the worker processes load selenium
+    from youtube_uploader_selenium import YouTubeUploadSession
+
+    colorama.init()
+    timer = StepTimer()
+    scheduler = UploadScheduler(database_path, profile['name'], profile['daily_upload_limit'])
+    upload_index = UploadIndex(database_path, profile['name'])
+    job_store = JobStore(database_path)
+
+    #Each worker has its own browser (selenium copies the profile, or clones its template, to a private temporary folder on launch) and its own cookies folder
+    with YouTubeUploadSession(profile['profile_path'], headless_mode, max_wait=max_wait,
+                              cookies_folder_path=profile.get('cookies_folder_path'), stall_timeout=stall_timeout, timer=timer,
+                              lean=lean_browser, fast_fill=fast_fill, profile_template_path=profile_template_path) as upload_session:
+
+        while True:
+            #Stop or wait when the channel has no uploads left in the window
+            if scheduler.get_remaining_uploads() == 0:
+                if not wait_for_quota:
+                    print(colorama.Fore.YELLOW + f'[{profile["name"]}] AVISO: Se alcanzó el límite de subida de {profile["daily_upload_limit"]} videos del canal.')
+                    break
+                print(colorama.Fore.YELLOW + f'[{profile["name"]}] AVISO: Se alcanzó el límite de subida del canal. Esperando...')
+                scheduler.wait_for_slot()
+
+            try:
+                folder = work_queue.get(timeout=1)
+            except queue.Empty:
+                break
+
+            video_path = os.path.join(videos_folder_path, folder, folder + '.mp4')
+            metadata_path = os.path.join(videos_folder_path, folder, 'metadata.json')
+
+            print(colorama.Fore.GREEN + f'[{profile["name"]}] Subiendo video: {folder}')
+
+            try:
+                #Skip a video whose content was already uploaded to the channel of the profile
+                job = job_store.get_job_by_folder(folder)
+                checksum = job['checksum'] if job is not None else None
+                size, fingerprint = upload_index.check(video_path, checksum)
+
+                was_video_uploaded, video_id = retry_policy.call(lambda: upload_session.upload(video_path, metadata_path), classify_upload_error)
+                result_queue.put((profile['name'], folder, was_video_uploaded, video_id, None, None))
+                if was_video_uploaded:
+                    scheduler.record_upload()
+                    with open(metadata_path, encoding='utf-8') as metadata_file:
+                        title = json.load(metadata_file).get('title')
+                    upload_index.add(size, fingerprint, title or folder, video_id, folder, checksum=checksum)
+
+            except Exception as e:
+                exception_message = str(e).strip()
+                error_class = classify_upload_error(e)
+
+                #Give the video back to the other workers and stop this one if the upload limit of the channel was reached
+                if error_class == QUOTA:
+                    print(colorama.Fore.RED + f'[{profile["name"]}] ERROR: Se alcanzó el límite de subida de videos.')
+                    scheduler.record_limit_reached()
+                    work_queue.put(folder)
+                    if wait_for_quota:
+                        continue
+                    break
+
+                #Give the video back to the other workers and stop this one if its browser is not signed in
+                if error_class == AUTH:
+                    print(colorama.Fore.RED + f'[{profile["name"]}] ERROR: El navegador no tiene la sesión de YouTube iniciada. {exception_message}')
+                    work_queue.put(folder)
+                    break
+
+                #A video that failed after attaching its file may have taken an upload of the channel
+                if is_attached_upload_error(e):
+                    scheduler.record_upload()
+
+                result_queue.put((profile['name'], folder, False, None, exception_message, error_class))
+
+    upload_index.close()
+    job_store.close()
+    scheduler.close()
+    span_queue.put(timer.spans)
+
+#Upload the video folders in parallel, with one process for each Firefox profile
+def run_upload_workers(video_folders, profiles, videos_folder_path, headless_mode, max_wait, job_store, database_path, wait_for_quota=False,
+                       stall_timeout=Constant.UPLOAD_STALL_TIMEOUT, timer=None, on_uploaded=None, retry_policy=None, lean_browser=False,
+                       fast_fill=False, profile_template_path=None, on_duplicate=None):
+    """Sube las carpetas de videos en paralelo, con un proceso por cada perfil de Firefox, y devuelve una tupla (uploaded_videos, pending_videos, transferred_bytes, transfer_time)."""
+    start_time = time.time()
+    work_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    span_queue = multiprocessing.Queue()
+
+    for folder in video_folders:
+        work_queue.put(folder)
+
+    workers = [multiprocessing.Process(target=upload_worker,
+                                       args=(profile, videos_folder_path, headless_mode, max_wait, work_queue, result_queue, database_path, wait_for_quota,
+                                             stall_timeout, span_queue, retry_policy or RetryPolicy(), lean_browser, fast_fill,
+                                             profile_template_path))
+               for profile in profiles]
+    for worker in workers:
+        worker.start()
+
+    uploaded_videos = []
+    duplicate_videos = []
+    transferred_bytes = 0
+
+    #Collect the results while the workers are running
+    while any(worker.is_alive() for worker in workers) or not result_queue.empty() or not span_queue.empty():
+        while not span_queue.empty():
+            spans = span_queue.get()
+            if timer is not None:
+                timer.add_spans(spans)
+
+        try:
+            profile_name, folder, was_video_uploaded, video_id, error_message, error_class = result_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+
+        if was_video_uploaded:
+            uploaded_videos.append(folder)
+            print(colorama.Fore.GREEN + f'[{profile_name}] Subido: {folder} (video_id = {video_id})')
+            job_store.mark_uploaded(folder, video_id)
+            transferred_bytes += os.path.getsize(os.path.join(videos_folder_path, folder, folder + '.mp4'))
+            if on_uploaded is not None:
+                on_uploaded(folder)
+        elif error_class == FATAL:
+            print(colorama.Fore.RED + f'[{profile_name}] ERROR: No se subirá el video {folder}, no se volverá a intentar. {error_message}')
+            job_store.mark_upload_rejected(folder, error_message)
+        elif error_class == DUPLICATE:
+            print(colorama.Fore.YELLOW + f'[{profile_name}] AVISO: El video {folder} es un duplicado, no se subirá y se eliminará. {error_message}')
+            job_store.mark_upload_rejected(folder, error_message)
+            duplicate_videos.append(folder)
+            if on_duplicate is not None:
+                on_duplicate(folder)
+        else:
+            if error_message:
+                print(colorama.Fore.RED + f'[{profile_name}] ERROR al subir el video {folder}. {error_message}')
+            job_store.mark_upload_failed(folder, error_message)
+
+    for worker in workers:
+        worker.join()
+
+    pending_videos = [folder for folder in video_folders if folder not in uploaded_videos and folder not in duplicate_videos]
+
+    #The processes upload at the same time, so the aggregate throughput uses the elapsed time of all of them
+    return uploaded_videos, pending_videos, transferred_bytes, time.time() - start_time
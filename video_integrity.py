@@ -0,0 +1,64 @@
+import os
+import struct
+
+
+#---> CONSTANTS
+
+#Types of the top-level boxes that an MP4 file must have
+REQUIRED_BOXES = ('ftyp', 'moov', 'mdat')
+
+#Maximum number of top-level boxes to read before giving up
+MAX_BOXES = 1000
+
+
+#---> FUNCTIONS
+
+#Check the structure of an MP4 file reading only the headers of its top-level boxes
+def check_mp4_container(file_path):
+    """Comprueba la estructura de un archivo MP4 leyendo solo las cabeceras de sus cajas de primer nivel, sin leer el video.
+    La primera caja debe ser ftyp, deben existir las cajas moov y mdat, y ninguna caja puede terminar después del final del archivo (archivo truncado).
+    Devuelve None si el archivo es válido o un mensaje con el problema encontrado."""
+    file_size = os.path.getsize(file_path)
+    found_boxes = set()
+
+    with open(file_path, 'rb') as file:
+        position = 0
+        for _ in range(MAX_BOXES):
+            if position == file_size:
+                break
+
+            file.seek(position)
+            header = file.read(8)
+            if len(header) < 8:
+                return f'Cabecera de caja incompleta en el byte {position}'
+
+            box_size, box_type = struct.unpack('>I4s', header)
+            box_type = box_type.decode('latin-1')
+
+            #The first box tells a video from an error page saved as a video
+            if position == 0 and box_type != 'ftyp':
+                if header.lstrip().startswith(b'<'):
+                    return 'El archivo es una página HTML, no un video'
+                return f'El archivo no empieza con una caja ftyp ({box_type!r})'
+
+            #A size of 1 means a 64-bit size after the type, a size of 0 means the box goes to the end of the file
+            if box_size == 1:
+                large_size = file.read(8)
+                if len(large_size) < 8:
+                    return f'Cabecera de caja incompleta en el byte {position}'
+                box_size = struct.unpack('>Q', large_size)[0]
+            elif box_size == 0:
+                box_size = file_size - position
+
+            if box_size < 8:
+                return f'Tamaño de caja no válido ({box_size}) en el byte {position}'
+            if position + box_size > file_size:
+                return f'La caja {box_type} termina en el byte {position + box_size}, después del final del archivo ({file_size} bytes)'
+
+            found_boxes.add(box_type)
+            position += box_size
+
+    missing_boxes = [box for box in REQUIRED_BOXES if box not in found_boxes]
+    if missing_boxes:
+        return f'Faltan las cajas {", ".join(missing_boxes)}'
+    return None
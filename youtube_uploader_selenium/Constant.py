@@ -3,7 +3,13 @@ class Constant:
     YOUTUBE_URL = 'https://www.youtube.com'
     YOUTUBE_STUDIO_URL = 'https://studio.youtube.com'
     YOUTUBE_UPLOAD_URL = 'https://www.youtube.com/upload'
+    SIGN_IN_HOST = 'accounts.google.com'
     USER_WAITING_TIME = 1
+    MAX_WAITING_TIME = 30
+    POLL_FREQUENCY = 0.25
+    UPLOAD_TRANSFER_TIMEOUT = 6 * 60 * 60
+    UPLOAD_STALL_TIMEOUT = 5 * 60
+    UPLOAD_PROGRESS_POLL_TIME = 1
     VIDEO_TITLE = 'title'
     VIDEO_DESCRIPTION = 'description'
     VIDEO_EDIT = 'edit'
@@ -28,6 +34,7 @@ class Constant:
     HREF = 'href'
     ERROR_CONTAINER = '//*[@id="error-message"]'
     VIDEO_NOT_FOUND_ERROR = 'Could not find video_id'
+    UPLOAD_LIMIT_ERROR_MESSAGE = 'Message: Element <ytcp-button id="next-button" class="style-scope ytcp-uploads-dialog" type="filled"> could not be scrolled into view'
     DONE_BUTTON = 'done-button'
     INPUT_FILE_VIDEO = "//input[@type='file']"
     INPUT_FILE_THUMBNAIL = "//input[@id='file-loader']"
@@ -42,6 +49,7 @@ class Constant:
     PL_CREATE_PLAYLIST_CONTAINER_ID = 'create-playlist-form'
     PL_CREATE_BUTTON_CLASS = 'create-playlist-button'
     PL_DONE_BUTTON_CLASS = 'done-button'
+    PL_SEARCH_WAITING_TIME = 3
 
     #Schedule
     VIDEO_SCHEDULE = 'schedule'
@@ -49,3 +57,50 @@ class Constant:
     SCHEDULE_DATE_ID = 'datepicker-trigger'
     SCHEDULE_DATE_TEXTBOX = '/html/body/ytcp-date-picker/tp-yt-paper-dialog/div/form/tp-yt-paper-input/tp-yt-paper-input-container/div[2]/div/iron-input/input'
     SCHEDULE_TIME = "/html/body/ytcp-uploads-dialog/tp-yt-paper-dialog/div/ytcp-animatable[1]/ytcp-uploads-review/div[2]/div[1]/ytcp-video-visibility-select/div[3]/ytcp-visibility-scheduler/div[1]/ytcp-datetime-picker/div/div[2]/form/ytcp-form-input-container/div[1]/div/tp-yt-paper-input/tp-yt-paper-input-container/div[2]/div/iron-input/input"
+
+    #Lean browser
+    LEAN_BLACKHOLE_PROXY = '127.0.0.1:9'
+    LEAN_BLOCKED_HOSTS = ('i.ytimg.com', 'yt3.ggpht.com', 'yt3.googleusercontent.com', 'googlevideo.com', 'fonts.googleapis.com', 'fonts.gstatic.com',
+                          'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'google-analytics.com', 'googletagmanager.com',
+                          'play.google.com')
+    LEAN_PREFERENCES = {'gfx.downloadable_fonts.enabled': False,
+                        'browser.display.use_document_fonts': 0,
+                        'media.autoplay.default': 5,
+                        'media.preload.default': 0,
+                        'media.preload.auto': 0,
+                        'media.mediasource.enabled': False,
+                        'network.prefetch-next': False,
+                        'network.dns.disablePrefetch': True,
+                        'network.http.speculative-parallel-limit': 0,
+                        'browser.shell.checkDefaultBrowser': False,
+                        'datareporting.healthreport.uploadEnabled': False,
+                        'toolkit.telemetry.enabled': False}
+
+    #Profile template
+    PROFILE_TEMPLATE_AUTH_DOMAINS = ('youtube.com', 'google.com')
+    PROFILE_TEMPLATE_FILES = ('cert9.db', 'permissions.sqlite')
+    PROFILE_TEMPLATE_COOKIES_FILE = 'cookies.sqlite'
+    PROFILE_TEMPLATE_STORAGE_FOLDER = 'storage/default'
+    PROFILE_TEMPLATE_KEPT_VERSIONS = 2
+    PROFILE_TEMPLATE_PREFERENCES = {'browser.startup.page': 0,
+                                    'browser.startup.homepage_override.mstone': 'ignore',
+                                    'startup.homepage_welcome_url': '',
+                                    'startup.homepage_welcome_url.additional': '',
+                                    'browser.aboutwelcome.enabled': False,
+                                    'browser.shell.checkDefaultBrowser': False,
+                                    'browser.sessionstore.resume_from_crash': False,
+                                    'browser.cache.disk.enable': False,
+                                    'browser.newtabpage.enabled': False,
+                                    'browser.discovery.enabled': False,
+                                    'browser.safebrowsing.malware.enabled': False,
+                                    'browser.safebrowsing.phishing.enabled': False,
+                                    'browser.safebrowsing.downloads.enabled': False,
+                                    'app.update.auto': False,
+                                    'app.normandy.enabled': False,
+                                    'extensions.update.enabled': False,
+                                    'extensions.getAddons.cache.enabled': False,
+                                    'network.captive-portal-service.enabled': False,
+                                    'network.connectivity-service.enabled': False,
+                                    'datareporting.policy.dataSubmissionEnabled': False,
+                                    'datareporting.healthreport.uploadEnabled': False,
+                                    'toolkit.telemetry.enabled': False}
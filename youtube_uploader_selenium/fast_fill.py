@@ -0,0 +1,182 @@
+"""This module implements the fast fill mode of the upload form, which fills the fields of the upload dialog
+with a few scripts run in the page instead of one WebDriver command per click, key and lookup"""
+
+from typing import Any, Dict, List, Optional
+from selenium.webdriver.remote.webelement import WebElement
+from .Constant import *
+
+# Selects the whole content of each editable field and types its text with execCommand, which fires the same input
+# events as the keyboard, pressing Enter between lines. Returns the text of each field to check it
+FILL_TEXT_FIELDS_SCRIPT = '''
+var fields = arguments[0], texts = arguments[1], results = [];
+for (var i = 0; i < fields.length; i++) {
+	var field = fields[i], lines = texts[i].split('\\n');
+	field.focus();
+	var range = document.createRange();
+	range.selectNodeContents(field);
+	var selection = window.getSelection();
+	selection.removeAllRanges();
+	selection.addRange(range);
+	document.execCommand('delete', false);
+	for (var j = 0; j < lines.length; j++) {
+		if (j > 0) {
+			document.execCommand('insertParagraph', false);
+		}
+		if (lines[j]) {
+			document.execCommand('insertText', false, lines[j]);
+		}
+	}
+	results.push(field.innerText);
+}
+return results;
+'''
+
+# Helpers of the asynchronous scripts, which poll the page until each element is ready, like the waits of WebDriver
+PAGE_HELPERS = '''
+function isClickable(element) {
+	return !!element && element.getClientRects().length > 0 && !element.hasAttribute('disabled') && element.getAttribute('aria-disabled') != 'true';
+}
+function firstClickable(elements) {
+	for (var i = 0; i < elements.length; i++) {
+		if (isClickable(elements[i])) {
+			return elements[i];
+		}
+	}
+	return null;
+}
+function poll(step, timeout, onTimeout) {
+	var deadline = Date.now() + timeout;
+	(function next() {
+		if (step()) {
+			return;
+		}
+		if (Date.now() > deadline) {
+			onTimeout();
+			return;
+		}
+		setTimeout(next, 50);
+	})();
+}
+'''
+
+# Opens the playlist dropdown, types the playlist in its search field and selects it. Returns 'selected', 'not_found' (with the dropdown open,
+# to create the playlist) or the step that timed out
+SELECT_PLAYLIST_SCRIPT = PAGE_HELPERS + '''
+var dropdownClass = arguments[0], searchInputId = arguments[1], itemsContainerId = arguments[2], itemXpath = arguments[3],
+	doneButtonClass = arguments[4], playlist = arguments[5], timeout = arguments[6], searchTimeout = arguments[7], callback = arguments[arguments.length - 1];
+var state = 'dropdown', searchDeadline = null;
+poll(function () {
+	if (state == 'dropdown') {
+		var dropdown = firstClickable(document.getElementsByClassName(dropdownClass));
+		if (dropdown) {
+			dropdown.click();
+			state = 'items';
+		}
+	} else if (state == 'items') {
+		var container = document.getElementById(itemsContainerId), search = document.getElementById(searchInputId);
+		if (isClickable(container)) {
+			if (search) {
+				search.value = playlist;
+				search.dispatchEvent(new Event('input', {bubbles: true}));
+			}
+			searchDeadline = Date.now() + searchTimeout;
+			state = 'item';
+		}
+	} else if (state == 'item') {
+		var item = document.evaluate(itemXpath, document.getElementById(itemsContainerId), null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+		if (item) {
+			item.click();
+			state = 'done';
+		} else if (Date.now() > searchDeadline) {
+			callback('not_found');
+			return true;
+		}
+	} else {
+		var doneButton = firstClickable(document.getElementsByClassName(doneButtonClass));
+		if (doneButton) {
+			doneButton.click();
+			callback('selected');
+			return true;
+		}
+	}
+	return false;
+}, timeout, function () { callback(state); });
+'''
+
+# Clicks the next button up to maxClicks times, waiting for each step to be drawn, until the visibility option is shown, and selects it.
+# Without visibility it only clicks the next button. Returns the clicks done and whether the visibility was selected
+ADVANCE_TO_VISIBILITY_SCRIPT = PAGE_HELPERS + '''
+var nextButtonId = arguments[0], maxClicks = arguments[1], visibilityName = arguments[2], radioLabelId = arguments[3],
+	timeout = arguments[4], callback = arguments[arguments.length - 1];
+var clicks = 0, waitingFrames = 0;
+function getVisibilityLabel() {
+	var option = document.querySelector('[name="' + visibilityName + '"]');
+	return option ? option.querySelector('#' + radioLabelId) : null;
+}
+poll(function () {
+	if (waitingFrames > 0) {
+		return false;
+	}
+	if (visibilityName) {
+		var label = getVisibilityLabel();
+		if (isClickable(label)) {
+			label.click();
+			callback({clicks: clicks, visibility: true});
+			return true;
+		}
+	} else if (clicks >= maxClicks) {
+		callback({clicks: clicks, visibility: false});
+		return true;
+	}
+	var nextButton = document.getElementById(nextButtonId);
+	if (clicks < maxClicks && isClickable(nextButton)) {
+		nextButton.click();
+		clicks += 1;
+		waitingFrames = 2;
+		requestAnimationFrame(function () { waitingFrames = 1; requestAnimationFrame(function () { waitingFrames = 0; }); });
+	}
+	return false;
+}, timeout, function () { callback({clicks: clicks, visibility: false}); });
+'''
+
+# Returns the link of the video in the upload dialog
+GET_VIDEO_URL_SCRIPT = '''
+var link = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return link ? link.getAttribute(arguments[1]) : null;
+'''
+
+
+def normalize_field_text(text: Optional[str]) -> str:
+	"""Returns the text of a field without carriage returns and blank spaces at the end of each line and of the text,
+	to compare the text typed with the text shown by the field"""
+	lines = (text or '').replace('\r', '').split('\n')
+	return '\n'.join(line.rstrip() for line in lines).strip('\n')
+
+
+def fill_text_fields(driver, fields: List[WebElement], texts: List[str]) -> bool:
+	"""Types the texts into the editable fields with one script and returns whether every field shows its text.
+	If it returns False, the fields must be filled with the keyboard"""
+	results = driver.execute_script(FILL_TEXT_FIELDS_SCRIPT, fields, texts)
+	return [normalize_field_text(result) for result in results or []] == [normalize_field_text(text) for text in texts]
+
+
+def select_playlist(driver, playlist: str, timeout: float) -> str:
+	"""Selects the playlist with one script and returns 'selected', 'not_found' (with the playlist dropdown open to create it)
+	or the name of the step that did not finish in timeout seconds"""
+	driver.set_script_timeout(timeout + Constant.PL_SEARCH_WAITING_TIME + Constant.MAX_WAITING_TIME)
+	return driver.execute_async_script(SELECT_PLAYLIST_SCRIPT, Constant.PL_DROPDOWN_CLASS, Constant.PL_SEARCH_INPUT_ID,
+		Constant.PL_ITEMS_CONTAINER_ID, Constant.PL_ITEM_CONTAINER.format(playlist), Constant.PL_DONE_BUTTON_CLASS, playlist,
+		int(timeout * 1000), int(Constant.PL_SEARCH_WAITING_TIME * 1000))
+
+
+def advance_to_visibility(driver, next_clicks: int, visibility: Optional[str], timeout: float) -> Dict[str, Any]:
+	"""Goes through the steps of the upload dialog with one script and selects the visibility, if given.
+	Returns a dict with the clicks of the next button done and whether the visibility was selected, to finish with WebDriver commands"""
+	driver.set_script_timeout(timeout + Constant.MAX_WAITING_TIME)
+	return driver.execute_async_script(ADVANCE_TO_VISIBILITY_SCRIPT, Constant.NEXT_BUTTON, next_clicks, visibility,
+		Constant.RADIO_LABEL, int(timeout * 1000))
+
+
+def get_video_url(driver) -> Optional[str]:
+	"""Returns the link of the video shown in the upload dialog with one script, or None if it is not shown"""
+	return driver.execute_script(GET_VIDEO_URL_SCRIPT, Constant.VIDEO_URL_CONTAINER + Constant.VIDEO_URL_ELEMENT, Constant.HREF)
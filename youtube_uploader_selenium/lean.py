@@ -0,0 +1,51 @@
+"""This module implements the lean mode of the Firefox browser of the uploads, which does not load
+the images, fonts and media of the pages nor the requests to the hosts that the upload dialog does not need"""
+
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import quote
+from selenium.webdriver import Firefox as FirefoxWebDriver
+from .Constant import *
+from .profile_template import create_template_webdriver
+from functools import partial
+import json
+
+
+def create_blocklist_pac(blocked_hosts: Iterable[str]) -> str:
+	"""Returns a data: URL with a proxy auto-config script that sends the requests to the blocked hosts
+	and their subdomains to a closed port, so they fail right away, and the other requests directly"""
+	script = ('function FindProxyForURL(url, host) {{ var hosts = {}; for (var i = 0; i < hosts.length; i++) {{ '
+		'if (host == hosts[i] || dnsDomainIs(host, "." + hosts[i])) {{ return "PROXY {}"; }} }} return "DIRECT"; }}').format(
+		json.dumps(sorted(blocked_hosts)), Constant.LEAN_BLACKHOLE_PROXY)
+	return 'data:application/x-ns-proxy-autoconfig,' + quote(script)
+
+
+def get_lean_preferences(blocked_hosts: Iterable[str] = Constant.LEAN_BLOCKED_HOSTS) -> Dict[str, Any]:
+	"""Returns the Firefox preferences of the lean mode, with the proxy auto-config script that blocks the given hosts"""
+	preferences = dict(Constant.LEAN_PREFERENCES)
+	preferences['network.proxy.type'] = 2
+	preferences['network.proxy.autoconfig_url'] = create_blocklist_pac(blocked_hosts)
+	return preferences
+
+
+def create_lean_webdriver(firefox_profile=None, **kwargs) -> FirefoxWebDriver:
+	"""Creates the webdriver of selenium_firefox with the preferences of the lean mode added to its profile.
+	It is given to selenium_firefox.Firefox as its webdriver_class"""
+	for name, value in get_lean_preferences().items():
+		firefox_profile.set_preference(name, value)
+	return FirefoxWebDriver(firefox_profile=firefox_profile, **kwargs)
+
+
+def get_browser_options(lean: bool, profile_template_path: Optional[str] = None) -> Dict[str, Any]:
+	"""Returns the arguments of selenium_firefox.Firefox that start the browser in lean mode, if lean is True, and with the profile template version
+	of profile_template_path, if given, or none for a normal browser. With a template, the browser must be started without profile_path:
+	the template is cloned into its empty profile"""
+	options = {}
+	webdriver_class = FirefoxWebDriver
+	if lean:
+		options.update(disable_images=True, mute_audio=True)
+		webdriver_class = create_lean_webdriver
+	if profile_template_path:
+		webdriver_class = partial(create_template_webdriver, template_path=profile_template_path, webdriver_class=webdriver_class)
+	if webdriver_class is not FirefoxWebDriver:
+		options['webdriver_class'] = webdriver_class
+	return options
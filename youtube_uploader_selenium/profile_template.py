@@ -0,0 +1,211 @@
+"""This module implements the profile template of the uploads: a minimal copy of a Firefox profile with only the cookies
+and the site storage of YouTube and Google, built once on the local disk and cloned with hard links into the empty profile
+that selenium creates for each browser, instead of copying and zipping the whole profile on every launch"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from .Constant import *
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+# Name of the file of each template folder that points to its current version
+MANIFEST_FILE_NAME = 'template.json'
+
+
+def is_auth_host(host: Optional[str]) -> bool:
+	"""Returns whether a cookie or storage host belongs to one of the domains of Constant.PROFILE_TEMPLATE_AUTH_DOMAINS or to their subdomains"""
+	host = (host or '').lstrip('.').lower()
+	return any(host == domain or host.endswith('.' + domain) for domain in Constant.PROFILE_TEMPLATE_AUTH_DOMAINS)
+
+
+def get_storage_host(folder_name: str) -> str:
+	"""Returns the host of a folder of the site storage of Firefox, named like https+++studio.youtube.com+8443^userContextId=1"""
+	return folder_name.split('+++', 1)[-1].split('^', 1)[0].split('+', 1)[0]
+
+
+def get_template_folder(cache_path: str, profile_path: str) -> str:
+	"""Returns the folder of the template of a profile in the cache folder, named after the profile and a hash of its path,
+	so the profiles of several channels have their own templates"""
+	profile_path = os.path.abspath(profile_path)
+	name = os.path.basename(profile_path.rstrip(os.sep)) or 'profile'
+	return os.path.join(cache_path, '{}-{}'.format(name, hashlib.sha1(profile_path.encode()).hexdigest()[:8]))
+
+
+def get_cookies_state(profile_path: str) -> List[Tuple[str, int, int]]:
+	"""Returns the name, size and modification time of the cookies database of a profile and its write-ahead log.
+	They change whenever Firefox writes a cookie, so an unchanged state means unchanged cookies without reading them"""
+	state = []
+	for file_name in (Constant.PROFILE_TEMPLATE_COOKIES_FILE, Constant.PROFILE_TEMPLATE_COOKIES_FILE + '-wal'):
+		file_path = os.path.join(profile_path, file_name)
+		if os.path.exists(file_path):
+			stat = os.stat(file_path)
+			state.append((file_name, stat.st_size, stat.st_mtime_ns))
+	return state
+
+
+def copy_database(source_path: str, destination_folder: str) -> bool:
+	"""Copies an SQLite database with its write-ahead log, if it has one, to a folder. Returns False if the database does not exist.
+	The files are copied instead of opened, because a running Firefox keeps its databases locked"""
+	if not os.path.exists(source_path):
+		return False
+	for suffix in ('', '-wal'):
+		if os.path.exists(source_path + suffix):
+			shutil.copy2(source_path + suffix, os.path.join(destination_folder, os.path.basename(source_path) + suffix))
+	return True
+
+
+def get_auth_cookies_fingerprint(cookies_path: str) -> str:
+	"""Returns a SHA-256 hash of the YouTube and Google cookies of a copy of a cookies database, which changes only when the sign in changes"""
+	sha256 = hashlib.sha256()
+	connection = sqlite3.connect(cookies_path)
+	try:
+		rows = connection.execute('SELECT host, name, value, path, expiry FROM moz_cookies').fetchall()
+	finally:
+		connection.close()
+	for row in sorted(row for row in rows if is_auth_host(row[0])):
+		sha256.update(json.dumps(row).encode())
+	return sha256.hexdigest()
+
+
+def prune_cookies(cookies_path: str) -> int:
+	"""Deletes the cookies that do not belong to YouTube or Google from a copy of a cookies database and compacts it
+	into a single file without write-ahead log. Returns the number of cookies kept"""
+	connection = sqlite3.connect(cookies_path)
+	try:
+		connection.create_function('is_auth_host', 1, is_auth_host)
+		with connection:
+			connection.execute('DELETE FROM moz_cookies WHERE NOT is_auth_host(host)')
+		connection.execute('PRAGMA journal_mode = DELETE')
+		connection.execute('VACUUM')
+		return connection.execute('SELECT COUNT(*) FROM moz_cookies').fetchone()[0]
+	finally:
+		connection.close()
+
+
+def get_folder_size(folder_path: str) -> int:
+	"""Returns the size in bytes of the files of a folder and its subfolders"""
+	return sum(os.path.getsize(os.path.join(base, file_name)) for base, _, file_names in os.walk(folder_path) for file_name in file_names)
+
+
+def read_manifest(template_folder: str) -> Optional[Dict[str, Any]]:
+	"""Returns the manifest of a template folder, or None if the template was not built yet"""
+	try:
+		with open(os.path.join(template_folder, MANIFEST_FILE_NAME), 'r') as manifest_file:
+			return json.load(manifest_file)
+	except (OSError, ValueError):
+		return None
+
+
+def write_manifest(template_folder: str, manifest: Dict[str, Any]) -> None:
+	"""Replaces the manifest of a template folder in one step, so other processes never read half of it"""
+	temporary_path = os.path.join(template_folder, '{}.{}.tmp'.format(MANIFEST_FILE_NAME, os.getpid()))
+	with open(temporary_path, 'w') as manifest_file:
+		json.dump(manifest, manifest_file, indent=2)
+	os.replace(temporary_path, os.path.join(template_folder, MANIFEST_FILE_NAME))
+
+
+def remove_old_versions(template_folder: str, current_version: str) -> None:
+	"""Deletes the oldest versions of a template, keeping Constant.PROFILE_TEMPLATE_KEPT_VERSIONS with the current one,
+	so a browser that is cloning the previous version while the template is refreshed does not lose its files"""
+	versions = [entry for entry in os.scandir(template_folder) if entry.is_dir() and entry.name != current_version and not entry.name.startswith('build-')]
+	versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+	for entry in versions[Constant.PROFILE_TEMPLATE_KEPT_VERSIONS - 1:]:
+		shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def build_version(profile_path: str, build_path: str) -> int:
+	"""Copies to the build folder, which already has the copy of the cookies database, the files of the profile needed to stay signed in:
+	the YouTube and Google cookies, their site storage and the files of Constant.PROFILE_TEMPLATE_FILES. Returns the number of cookies kept"""
+	cookies_count = prune_cookies(os.path.join(build_path, Constant.PROFILE_TEMPLATE_COOKIES_FILE))
+	for file_name in Constant.PROFILE_TEMPLATE_FILES:
+		copy_database(os.path.join(profile_path, file_name), build_path)
+
+	storage_path = os.path.join(profile_path, *Constant.PROFILE_TEMPLATE_STORAGE_FOLDER.split('/'))
+	if os.path.isdir(storage_path):
+		for entry in os.scandir(storage_path):
+			if entry.is_dir() and is_auth_host(get_storage_host(entry.name)):
+				shutil.copytree(entry.path, os.path.join(build_path, *Constant.PROFILE_TEMPLATE_STORAGE_FOLDER.split('/'), entry.name),
+					ignore=shutil.ignore_patterns('*.tmp', '.lock'))
+	return cookies_count
+
+
+def ensure_profile_template(profile_path: str, template_folder: str) -> str:
+	"""Returns the folder of the current version of the template of a profile, building it if it does not exist
+	or if the YouTube and Google cookies of the profile changed since it was built.
+	While the cookies database of the profile is not modified, the template is reused without reading it.
+	Several processes can call it at the same time: each version is built in its own folder and published by renaming it"""
+	if not os.path.exists(os.path.join(profile_path, Constant.PROFILE_TEMPLATE_COOKIES_FILE)):
+		raise FileNotFoundError('The profile {} has no {}, sign in to YouTube with it first'.format(profile_path, Constant.PROFILE_TEMPLATE_COOKIES_FILE))
+	os.makedirs(template_folder, exist_ok=True)
+
+	manifest = read_manifest(template_folder)
+	cookies_state = [list(item) for item in get_cookies_state(profile_path)]
+	current_path = os.path.join(template_folder, manifest['version']) if manifest else None
+	if manifest and manifest['cookies_state'] == cookies_state and os.path.isdir(current_path):
+		return current_path
+
+	build_path = tempfile.mkdtemp(prefix='build-', dir=template_folder)
+	try:
+		copy_database(os.path.join(profile_path, Constant.PROFILE_TEMPLATE_COOKIES_FILE), build_path)
+		fingerprint = get_auth_cookies_fingerprint(os.path.join(build_path, Constant.PROFILE_TEMPLATE_COOKIES_FILE))
+
+		# Firefox rewrote the cookies but not the ones of the sign in: the template is still valid
+		if manifest and manifest['fingerprint'] == fingerprint and os.path.isdir(current_path):
+			manifest['cookies_state'] = cookies_state
+			write_manifest(template_folder, manifest)
+			return current_path
+
+		cookies_count = build_version(profile_path, build_path)
+		version = fingerprint[:16]
+		version_path = os.path.join(template_folder, version)
+		if os.path.isdir(version_path):
+			# Another process built the same version first
+			shutil.rmtree(build_path, ignore_errors=True)
+		else:
+			os.rename(build_path, version_path)
+		write_manifest(template_folder, {'version': version, 'fingerprint': fingerprint, 'cookies_state': cookies_state, 'cookies': cookies_count,
+			'size': get_folder_size(version_path), 'source_profile_path': os.path.abspath(profile_path), 'built_at': time.time()})
+		remove_old_versions(template_folder, version)
+		return version_path
+	finally:
+		if os.path.isdir(build_path):
+			shutil.rmtree(build_path, ignore_errors=True)
+
+
+def clone_profile_template(template_path: str, destination_path: str) -> int:
+	"""Clones a template version into a profile folder with hard links, which takes no time nor disk space whatever the size of the files.
+	If the folders are on different drives or the file system has no hard links, the files are copied. Returns the number of files cloned.
+	The clone must not be written in place: selenium only writes its own user.js, which is not part of the template,
+	and the browser works on the copy of the profile that geckodriver unpacks"""
+	files_count = 0
+	use_links = True
+	for base, _, file_names in os.walk(template_path):
+		destination_base = os.path.join(destination_path, os.path.relpath(base, template_path))
+		os.makedirs(destination_base, exist_ok=True)
+		for file_name in file_names:
+			source = os.path.join(base, file_name)
+			destination = os.path.join(destination_base, file_name)
+			if use_links:
+				try:
+					os.link(source, destination)
+					files_count += 1
+					continue
+				except OSError:
+					use_links = False
+			shutil.copy2(source, destination)
+			files_count += 1
+	return files_count
+
+
+def create_template_webdriver(firefox_profile=None, template_path: Optional[str] = None, webdriver_class=None, **kwargs):
+	"""Clones the template version into the empty profile that selenium_firefox created, adds the preferences of
+	Constant.PROFILE_TEMPLATE_PREFERENCES and creates the webdriver with webdriver_class.
+	It is given to selenium_firefox.Firefox as its webdriver_class, with the browser started without profile_path"""
+	clone_profile_template(template_path, firefox_profile.path)
+	for name, value in Constant.PROFILE_TEMPLATE_PREFERENCES.items():
+		firefox_profile.set_preference(name, value)
+	return webdriver_class(firefox_profile=firefox_profile, **kwargs)
@@ -0,0 +1,118 @@
+"""This module records how long each step of the upload of a video takes
+and exports the spans, the totals per video and the percentiles per step"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+import json
+import threading
+import time
+
+# Quantiles of the durations reported for each step and for the whole video
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Name of the steps that are not part of the upload of a single video, like the browser launch
+SESSION_VIDEO = 'session'
+
+
+def percentile(values: List[float], fraction: float) -> float:
+	"""Returns the percentile of the values, interpolating between the closest ranks"""
+	values = sorted(values)
+	if not values:
+		return 0.0
+	position = (len(values) - 1) * fraction
+	lower = int(position)
+	upper = min(lower + 1, len(values) - 1)
+	return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class StepTimer:
+	"""Records the duration of the named steps of each video upload as spans.
+	Spans are recorded with the span context manager and can be merged from other processes with add_spans"""
+
+	def __init__(self) -> None:
+		self.spans = []
+		self.lock = threading.Lock()
+
+	@contextmanager
+	def span(self, step: str, video: Optional[str] = None) -> Iterator[None]:
+		"""Records the time spent inside the with block as a span of the step, even if it raises"""
+		start = time.time()
+		start_counter = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.add_spans([{'video': video or SESSION_VIDEO, 'step': step, 'start': start,
+				'duration': time.perf_counter() - start_counter}])
+
+	def add_spans(self, spans: List[dict]) -> None:
+		with self.lock:
+			self.spans.extend(spans)
+
+	def get_video_totals(self) -> Dict[str, float]:
+		"""Returns the seconds spent in the steps of each video, without the session steps"""
+		totals = {}
+		with self.lock:
+			for span in self.spans:
+				if span['video'] != SESSION_VIDEO:
+					totals[span['video']] = totals.get(span['video'], 0.0) + span['duration']
+		return totals
+
+	def get_step_summary(self) -> Dict[str, dict]:
+		"""Returns the count, total, maximum and quantiles of the durations of each step, in the order they were first recorded"""
+		durations = {}
+		with self.lock:
+			for span in self.spans:
+				durations.setdefault(span['step'], []).append(span['duration'])
+		return {step: summarize(values) for step, values in durations.items()}
+
+	def get_video_summary(self) -> dict:
+		"""Returns the count, total, maximum and quantiles of the total seconds of each video"""
+		return summarize(list(self.get_video_totals().values()))
+
+	def write_json_lines(self, path: str) -> None:
+		"""Writes one JSON object per line: each span, each video total and the summary of each step and of the whole batch"""
+		with self.lock:
+			spans = list(self.spans)
+		with open(path, 'w', encoding='utf-8') as trace_file:
+			for span in spans:
+				trace_file.write(json.dumps(dict(type='span', **span)) + '\n')
+			for video, total in self.get_video_totals().items():
+				trace_file.write(json.dumps({'type': 'video', 'video': video, 'duration': total}) + '\n')
+			for step, summary in self.get_step_summary().items():
+				trace_file.write(json.dumps(dict(type='step_summary', step=step, **summary)) + '\n')
+			trace_file.write(json.dumps(dict(type='video_summary', **self.get_video_summary())) + '\n')
+
+	def write_openmetrics(self, path: str) -> None:
+		"""Writes the summary of each step and of the whole videos in the OpenMetrics text format"""
+		lines = ['# TYPE youtube_upload_step_seconds summary',
+			'# UNIT youtube_upload_step_seconds seconds',
+			'# HELP youtube_upload_step_seconds Duration of each step of the upload of a video.']
+		for step, summary in self.get_step_summary().items():
+			lines += summary_lines('youtube_upload_step_seconds', summary, 'step="{}",'.format(escape_label(step)))
+		lines += ['# TYPE youtube_upload_video_seconds summary',
+			'# UNIT youtube_upload_video_seconds seconds',
+			'# HELP youtube_upload_video_seconds Total duration of the steps of the upload of a video.']
+		lines += summary_lines('youtube_upload_video_seconds', self.get_video_summary(), '')
+		lines.append('# EOF')
+		with open(path, 'w', encoding='utf-8') as metrics_file:
+			metrics_file.write('\n'.join(lines) + '\n')
+
+
+def summarize(values: List[float]) -> dict:
+	summary = {'count': len(values), 'sum': sum(values), 'max': max(values, default=0.0)}
+	for quantile in QUANTILES:
+		summary['p{:g}'.format(quantile * 100)] = percentile(values, quantile)
+	return summary
+
+
+def summary_lines(name: str, summary: dict, labels: str) -> List[str]:
+	lines = ['{}{{{}quantile="{:g}"}} {:.6f}'.format(name, labels, quantile, summary['p{:g}'.format(quantile * 100)])
+		for quantile in QUANTILES]
+	labels = '{' + labels.rstrip(',') + '}' if labels else ''
+	lines.append('{}_sum{} {:.6f}'.format(name, labels, summary['sum']))
+	lines.append('{}_count{} {}'.format(name, labels, summary['count']))
+	return lines
+
+
+def escape_label(value: str) -> str:
+	return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,634 @@
+"""This module implements uploading videos on YouTube via Selenium using metadata JSON file
+    to extract its title, description etc. It is imported by the package on first use"""
+
+from typing import Callable, DefaultDict, Iterable, List, NamedTuple, Optional, Tuple
+from selenium_firefox.firefox import Firefox
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from collections import defaultdict
+from datetime import datetime
+import json
+import os
+import re
+import time
+from .Constant import *
+from .timing import StepTimer
+from .lean import get_browser_options
+from .profile_template import ensure_profile_template, get_template_folder
+from .fast_fill import advance_to_visibility, fill_text_fields, get_video_url, select_playlist
+from pathlib import Path
+import logging
+import platform
+
+logging.basicConfig()
+
+
+class UploadProgress(NamedTuple):
+	"""Progress of the transfer of a video, as shown by the YouTube Studio progress element"""
+	percent: float
+	uploaded_bytes: int
+	total_bytes: int
+	bytes_per_second: float
+	eta: Optional[float]
+	elapsed: float
+
+
+class UploadStalledException(Exception):
+	"""Raised when the progress of the transfer of a video does not advance for stall_timeout seconds"""
+	pass
+
+
+class UploadRejectedException(Exception):
+	"""Raised when YouTube Studio does not accept the video, with the text of its error message,
+	for example when the file is a duplicate of a video already uploaded"""
+	pass
+
+
+class UploadAttachedException(Exception):
+	"""Raised when an upload fails after its file was attached, so YouTube may already have a draft of the video"""
+	pass
+
+
+class NotSignedInException(Exception):
+	"""Raised when the browser is sent to the sign in page instead of the upload page,
+	because its cookies do not have a YouTube session"""
+	pass
+
+
+def load_metadata(metadata_json_path: Optional[str] = None) -> DefaultDict[str, str]:
+	if metadata_json_path is None:
+		return defaultdict(str)
+	with open(metadata_json_path, encoding='utf-8') as metadata_json_file:
+		return defaultdict(str, json.load(metadata_json_file))
+
+
+def wait_until(browser: Firefox, condition, timeout: float = Constant.MAX_WAITING_TIME):
+	"""Waits until the condition returns a truthy value and returns it, raising TimeoutException after timeout seconds"""
+	return WebDriverWait(browser.driver, timeout, poll_frequency=Constant.POLL_FREQUENCY).until(condition)
+
+
+def page_is_loaded(driver) -> bool:
+	return driver.execute_script('return document.readyState') == 'complete'
+
+
+def elements_located(locator: Tuple[str, str], count: int):
+	"""Condition that returns the first count elements matching the locator once they are all present"""
+	def condition(driver):
+		elements = driver.find_elements(*locator)
+		return elements[:count] if len(elements) >= count else False
+	return condition
+
+
+def login(browser: Firefox, logger: logging.Logger, max_wait: float = Constant.MAX_WAITING_TIME, lean: bool = False) -> None:
+	"""Signs in to YouTube with the saved cookies, or asks the user to sign in and saves them"""
+	browser.get(Constant.YOUTUBE_URL)
+	wait_until(browser, page_is_loaded, max_wait)
+
+	if browser.has_cookies_for_current_website():
+		browser.load_cookies()
+		logger.debug("Loaded cookies from {}".format(browser.cookies_folder_path))
+		if not lean:
+			browser.refresh()
+			wait_until(browser, page_is_loaded, max_wait)
+	else:
+		logger.info('Please sign in and then press enter')
+		input()
+		browser.get(Constant.YOUTUBE_URL)
+		wait_until(browser, page_is_loaded, max_wait)
+		browser.save_cookies()
+		logger.debug("Saved cookies to {}".format(browser.cookies_folder_path))
+
+
+class YouTubeUploader:
+	"""A class for uploading a video on YouTube via Selenium using a metadata JSON file to extract its title, description etc."""
+
+	def __init__(self, video_path: str, metadata_json_path: Optional[str] = None,
+			  	thumbnail_path: Optional[str] = None,
+			  	profile_path: Optional[str] = str(Path.cwd()) + "/profile",
+				headless: bool = True,
+				browser: Optional[Firefox] = None,
+				max_wait: float = Constant.MAX_WAITING_TIME,
+				progress_callback: Optional[Callable[[UploadProgress], None]] = None,
+				stall_timeout: float = Constant.UPLOAD_STALL_TIMEOUT,
+				timer: Optional[StepTimer] = None,
+				lean: bool = False,
+				fast_fill: bool = False) -> None:
+		self.video_path = video_path
+		self.lean = lean
+		self.fast_fill = fast_fill
+		self.max_wait = max_wait
+		self.progress_callback = progress_callback
+		self.stall_timeout = stall_timeout
+		self.timer = timer or StepTimer()
+		self.transfer_start_time = None
+		self.last_progress = None
+		self.thumbnail_path = thumbnail_path
+		self.metadata_dict = load_metadata(metadata_json_path)
+		self.owns_browser = browser is None
+		self.browser = browser or Firefox(profile_path=profile_path, pickle_cookies=True, full_screen=False, headless=headless,
+			**get_browser_options(lean))
+		self.logger = logging.getLogger('YT-Uploader')
+		self.logger.setLevel(logging.INFO)
+		self.__validate_inputs()
+
+		self.is_mac = False
+		if not any(os_name in platform.platform() for os_name in ["Windows", "Linux"]):
+			self.is_mac = True
+
+		self.logger.debug("Use profile path: {}".format(self.browser.source_profile_path))
+
+	def __validate_inputs(self):
+		if not self.metadata_dict[Constant.VIDEO_TITLE]:
+			self.logger.warning(
+				"The video title was not found in a metadata file")
+			self.metadata_dict[Constant.VIDEO_TITLE] = Path(
+				self.video_path).stem
+			self.logger.warning("The video title was set to {}".format(
+				Path(self.video_path).stem))
+		if not self.metadata_dict[Constant.VIDEO_DESCRIPTION]:
+			self.logger.warning(
+				"The video description was not found in a metadata file")
+
+	def upload(self):
+		try:
+			if self.owns_browser:
+				with self.__span('login'):
+					self.__login()
+			return self.__upload()
+		except Exception as e:
+			print(e)
+			if self.owns_browser:
+				self.__quit()
+			raise
+
+	def __login(self):
+		login(self.browser, self.logger, self.max_wait, self.lean)
+
+	def __span(self, step: str):
+		return self.timer.span(step, self.video_path)
+
+	def __wait(self, condition, timeout: Optional[float] = None):
+		return wait_until(self.browser, condition, timeout or self.max_wait)
+
+	def __wait_clickable(self, by: By, key: str) -> WebElement:
+		return self.__wait(EC.element_to_be_clickable((by, key)))
+
+	def __wait_focus(self, field: WebElement) -> None:
+		self.__wait(lambda driver: driver.execute_script(
+			'return arguments[0] === document.activeElement || arguments[0].contains(document.activeElement)', field))
+
+	def __clear_field(self, field):
+		field.click()
+		self.__wait_focus(field)
+		if self.is_mac:
+			field.send_keys(Keys.COMMAND + 'a')
+		else:
+			field.send_keys(Keys.CONTROL + 'a')
+		field.send_keys(Keys.BACKSPACE)
+		self.__wait(lambda driver: not (field.text or field.get_attribute('value')))
+
+	def __write_in_field(self, field, string, select_all=False):
+		if select_all:
+			self.__clear_field(field)
+		else:
+			field.click()
+			self.__wait_focus(field)
+
+		field.send_keys(string)
+
+	def __upload(self) -> Tuple[bool, Optional[str]]:
+		edit_mode = self.metadata_dict[Constant.VIDEO_EDIT]
+		if edit_mode:
+			with self.__span('open_edit_page'):
+				self.browser.get(edit_mode)
+				self.__wait(page_is_loaded)
+		else:
+			with self.__span('open_upload_page'):
+				if not self.lean:
+					self.browser.get(Constant.YOUTUBE_URL)
+				self.browser.get(Constant.YOUTUBE_UPLOAD_URL)
+				if Constant.SIGN_IN_HOST in self.browser.driver.current_url:
+					raise NotSignedInException('The browser is not signed in to YouTube, sign in again with the profile {}'.format(
+						self.browser.source_profile_path))
+			with self.__span('attach_file'):
+				absolute_video_path = str(Path.cwd() / self.video_path)
+				self.__wait(EC.presence_of_element_located((By.XPATH, Constant.INPUT_FILE_VIDEO))).send_keys(
+					absolute_video_path)
+				self.transfer_start_time = time.time()
+				self.logger.debug('Attached video {}'.format(self.video_path))
+
+				# Wait for the status container
+				self.__wait(EC.presence_of_element_located((By.XPATH, Constant.UPLOADING_STATUS_CONTAINER)))
+
+		#if self.thumbnail_path is not None:
+		#	absolute_thumbnail_path = str(Path.cwd() / self.thumbnail_path)
+		#	self.browser.find(By.XPATH, Constant.INPUT_FILE_THUMBNAIL).send_keys(
+		#		absolute_thumbnail_path)
+		#	change_display = "document.getElementById('file-loader').style = 'display: block! important'"
+		#	self.browser.driver.execute_script(change_display)
+		#	self.logger.debug(
+		#		'Attached thumbnail {}'.format(self.thumbnail_path))
+
+		if self.fast_fill:
+			with self.__span('details'):
+				self.__fill_details()
+		else:
+			with self.__span('title'):
+				title_field, description_field = self.__wait(elements_located((By.ID, Constant.TEXTBOX_ID), 2))
+
+				self.__write_in_field(
+					title_field, self.metadata_dict[Constant.VIDEO_TITLE], select_all=True)
+				self.logger.info('The video title was set to \"{}\"'.format(
+					self.metadata_dict[Constant.VIDEO_TITLE]))
+
+			video_description = self.metadata_dict[Constant.VIDEO_DESCRIPTION]
+			video_description = video_description.replace("\n", Keys.ENTER)
+			if video_description:
+				with self.__span('description'):
+					self.__write_in_field(description_field, video_description, select_all=True)
+					self.logger.debug('Description filled.')
+
+		#kids_section = self.browser.find(By.NAME, Constant.NOT_MADE_FOR_KIDS_LABEL)
+		#kids_section.location_once_scrolled_into_view
+		#time.sleep(Constant.USER_WAITING_TIME)
+
+		#self.browser.find(By.ID, Constant.RADIO_LABEL, kids_section).click()
+		#self.logger.debug('Selected \"{}\"'.format(Constant.NOT_MADE_FOR_KIDS_LABEL))
+
+		# Playlist
+		playlist = self.metadata_dict[Constant.VIDEO_PLAYLIST]
+		if playlist and self.fast_fill:
+			with self.__span('playlist'):
+				self.__select_playlist_in_page(playlist)
+		elif playlist:
+			with self.__span('playlist'):
+				self.__wait_clickable(By.CLASS_NAME, Constant.PL_DROPDOWN_CLASS).click()
+				search_field = self.__wait(EC.visibility_of_element_located((By.ID, Constant.PL_SEARCH_INPUT_ID)))
+				self.__write_in_field(search_field, playlist)
+				playlist_items_container = self.__wait(EC.visibility_of_element_located((By.ID, Constant.PL_ITEMS_CONTAINER_ID)))
+				# Try to find playlist, giving the search results some time to be filtered
+				self.logger.debug('Playlist xpath: "{}".'.format(Constant.PL_ITEM_CONTAINER.format(playlist)))
+				playlist_item = self.browser.find(By.XPATH, Constant.PL_ITEM_CONTAINER.format(playlist), playlist_items_container,
+					timeout=Constant.PL_SEARCH_WAITING_TIME)
+				if playlist_item:
+					self.logger.debug('Playlist found.')
+					playlist_item.click()
+				else:
+					self.logger.debug('Playlist not found. Creating')
+					self.__create_playlist(search_field, playlist)
+
+				self.__wait_clickable(By.CLASS_NAME, Constant.PL_DONE_BUTTON_CLASS).click()
+
+		# Advanced options
+		#self.browser.find(By.ID, Constant.ADVANCED_BUTTON_ID).click()
+		#self.logger.debug('Clicked MORE OPTIONS')
+		#time.sleep(Constant.USER_WAITING_TIME)
+
+		# Tags
+		#tags = self.metadata_dict[Constant.VIDEO_TAGS]
+		#if tags:
+		#	tags_container = self.browser.find(By.ID, Constant.TAGS_CONTAINER_ID)
+		#	tags_field = self.browser.find(By.ID, Constant.TAGS_INPUT, tags_container)
+		#	self.__write_in_field(tags_field, ','.join(tags))
+		#	self.logger.debug('The tags were set to \"{}\"'.format(tags))
+
+		schedule = self.metadata_dict[Constant.VIDEO_SCHEDULE]
+		if self.fast_fill:
+			with self.__span('next_visibility'):
+				# Set video visibility to unlisted by default
+				result = advance_to_visibility(self.browser.driver, 3, None if schedule else Constant.UNLISTED_BUTTON, self.max_wait)
+
+				# The steps the script could not do are done with WebDriver, which raises the errors of the page, like the upload limit
+				for _ in range(result['clicks'], 3):
+					self.__wait_clickable(By.ID, Constant.NEXT_BUTTON).click()
+				if schedule:
+					self.__schedule_video(schedule)
+				elif not result['visibility']:
+					self.__make_video_unlisted()
+		else:
+			with self.__span('next_1'):
+				self.__wait_clickable(By.ID, Constant.NEXT_BUTTON).click()
+				self.logger.debug('Clicked {} one'.format(Constant.NEXT_BUTTON))
+
+			with self.__span('next_2'):
+				self.__wait_clickable(By.ID, Constant.NEXT_BUTTON).click()
+				self.logger.debug('Clicked {} two'.format(Constant.NEXT_BUTTON))
+
+			with self.__span('next_3'):
+				self.__wait_clickable(By.ID, Constant.NEXT_BUTTON).click()
+				self.logger.debug('Clicked {} three'.format(Constant.NEXT_BUTTON))
+
+			with self.__span('visibility'):
+				if schedule:
+					self.__schedule_video(schedule)
+				else:
+					# Set video visibility to unlisted by default
+					self.__make_video_unlisted()
+
+		with self.__span('video_id'):
+			video_id = self.__get_video_id()
+
+		# Wait for the status container to be gone once the video is transferred
+		with self.__span('transfer'):
+			self.__wait_for_transfer()
+
+		self.logger.debug('Upload container gone.')
+
+		with self.__span('done'):
+			done_button = self.__wait(EC.presence_of_element_located((By.ID, Constant.DONE_BUTTON)))
+
+			# Catch such error as
+			# "File is a duplicate of a video you have already uploaded"
+			if done_button.get_attribute('aria-disabled') == 'true':
+				error_message = self.browser.find(By.XPATH, Constant.ERROR_CONTAINER).text
+				self.logger.error(error_message)
+				raise UploadRejectedException(error_message)
+
+			done_button.click()
+			self.logger.info(
+				"Video uploaded with video_id = {}".format(video_id))
+			try:
+				self.__wait(EC.invisibility_of_element_located((By.XPATH, Constant.UPLOAD_DIALOG)))
+			except TimeoutException:
+				self.logger.warning('The upload dialog is still open after {} seconds'.format(self.max_wait))
+		if not self.lean:
+			with self.__span('open_home_page'):
+				self.browser.get(Constant.YOUTUBE_URL)
+		if self.owns_browser:
+			with self.__span('quit'):
+				self.__quit()
+		return True, video_id
+
+	def __fill_details(self) -> None:
+		"""Types the title and the description in one script, or with the keyboard if the fields do not show the text typed"""
+		title_field, description_field = self.__wait(elements_located((By.ID, Constant.TEXTBOX_ID), 2))
+		fields = [title_field]
+		texts = [self.metadata_dict[Constant.VIDEO_TITLE]]
+		if self.metadata_dict[Constant.VIDEO_DESCRIPTION]:
+			fields.append(description_field)
+			texts.append(self.metadata_dict[Constant.VIDEO_DESCRIPTION])
+
+		if not fill_text_fields(self.browser.driver, fields, texts):
+			self.logger.debug('The script could not fill the title and the description, typing them')
+			for field, text in zip(fields, texts):
+				self.__write_in_field(field, text.replace("\n", Keys.ENTER), select_all=True)
+		self.logger.info('The video title was set to \"{}\"'.format(texts[0]))
+
+	def __select_playlist_in_page(self, playlist: str) -> None:
+		"""Selects the playlist in one script, creating it with WebDriver commands if it does not exist"""
+		result = select_playlist(self.browser.driver, playlist, self.max_wait)
+		if result == 'selected':
+			self.logger.debug('Playlist found.')
+			return
+		if result != 'not_found':
+			raise TimeoutException('The playlist dropdown did not finish the step "{}" in {} seconds'.format(result, self.max_wait))
+
+		self.logger.debug('Playlist not found. Creating')
+		search_field = self.__wait(EC.visibility_of_element_located((By.ID, Constant.PL_SEARCH_INPUT_ID)))
+		self.__create_playlist(search_field, playlist)
+		self.__wait_clickable(By.CLASS_NAME, Constant.PL_DONE_BUTTON_CLASS).click()
+
+	def __create_playlist(self, search_field: WebElement, playlist: str) -> None:
+		self.__clear_field(search_field)
+
+		self.__wait_clickable(By.CLASS_NAME, Constant.PL_NEW_BUTTON_CLASS).click()
+
+		create_playlist_container = self.__wait(EC.visibility_of_element_located((By.ID, Constant.PL_CREATE_PLAYLIST_CONTAINER_ID)))
+		playlist_title_textbox = self.browser.find(By.XPATH, "//textarea", create_playlist_container, timeout=self.max_wait)
+		self.__write_in_field(playlist_title_textbox, playlist)
+
+		self.__wait_clickable(By.CLASS_NAME, Constant.PL_CREATE_BUTTON_CLASS).click()
+		self.__wait(EC.invisibility_of_element_located((By.ID, Constant.PL_CREATE_PLAYLIST_CONTAINER_ID)))
+
+	def __schedule_video(self, schedule: str) -> None:
+		"""Schedules the video, looking up each field of the date and the time once"""
+		upload_time_object = datetime.strptime(schedule, "%m/%d/%Y, %H:%M")
+		self.__wait_clickable(By.ID, Constant.SCHEDULE_CONTAINER_ID).click()
+		self.__wait_clickable(By.ID, Constant.SCHEDULE_DATE_ID).click()
+		date_textbox = self.__wait(EC.visibility_of_element_located((By.XPATH, Constant.SCHEDULE_DATE_TEXTBOX)))
+		date_textbox.clear()
+		date_textbox.send_keys(datetime.strftime(upload_time_object, "%b %e, %Y"))
+		date_textbox.send_keys(Keys.ENTER)
+		time_textbox = self.browser.find(By.XPATH, Constant.SCHEDULE_TIME)
+		time_textbox.click()
+		time_textbox.clear()
+		time_textbox.send_keys(datetime.strftime(upload_time_object, "%H:%M"))
+		time_textbox.send_keys(Keys.ENTER)
+		self.logger.debug(f"Scheduled the video for {schedule}")
+
+	def __make_video_unlisted(self) -> None:
+		visibility_status_button = self.__wait(EC.presence_of_element_located((By.NAME, Constant.UNLISTED_BUTTON)))
+		self.browser.find(By.ID, Constant.RADIO_LABEL, visibility_status_button).click()
+		self.logger.debug('Made the video {}'.format(Constant.UNLISTED_BUTTON))
+
+	def __get_upload_percent(self) -> Tuple[bool, Optional[float]]:
+		"""Returns whether the video is still being transferred and its progress, if it can be read"""
+		status_containers = self.browser.driver.find_elements(By.XPATH, Constant.UPLOADING_STATUS_CONTAINER)
+		if not status_containers:
+			return False, None
+		try:
+			progress = status_containers[0].get_attribute('value')
+			if not progress:
+				match = re.search(r'(\d+(?:[.,]\d+)?)\s*%', status_containers[0].text)
+				progress = match.group(1).replace(',', '.') if match else None
+		except StaleElementReferenceException:
+			return True, None
+		try:
+			return True, float(progress)
+		except (TypeError, ValueError):
+			return True, None
+
+	def __report_progress(self, percent: float, total_bytes: int) -> None:
+		elapsed = time.time() - self.transfer_start_time
+		uploaded_bytes = int(total_bytes * min(percent, 100) / 100)
+		bytes_per_second = uploaded_bytes / elapsed if elapsed > 0 else 0.0
+		eta = (total_bytes - uploaded_bytes) / bytes_per_second if bytes_per_second > 0 else None
+		self.last_progress = UploadProgress(percent, uploaded_bytes, total_bytes, bytes_per_second, eta, elapsed)
+		if self.progress_callback is not None:
+			self.progress_callback(self.last_progress)
+
+	def __wait_for_transfer(self) -> None:
+		"""Waits for the video to be transferred, reporting its progress.
+		Raises UploadStalledException if the progress does not advance for stall_timeout seconds"""
+		if self.transfer_start_time is None:
+			return
+		total_bytes = Path(self.video_path).stat().st_size
+		last_percent = None
+		last_advance_time = time.time()
+
+		while True:
+			is_uploading, percent = self.__get_upload_percent()
+			now = time.time()
+			if not is_uploading:
+				break
+
+			# An unreadable progress does not count as stalled, the element may have changed
+			if percent is not None:
+				if last_percent is None or percent > last_percent:
+					last_percent, last_advance_time = percent, now
+				elif now - last_advance_time > self.stall_timeout:
+					raise UploadStalledException('The upload of {} is stalled at {:.0f}% for {:.0f} seconds'.format(
+						self.video_path, percent, now - last_advance_time))
+				self.__report_progress(percent, total_bytes)
+
+			if now - self.transfer_start_time > Constant.UPLOAD_TRANSFER_TIMEOUT:
+				raise TimeoutException('The upload of {} did not finish in {} seconds'.format(
+					self.video_path, Constant.UPLOAD_TRANSFER_TIMEOUT))
+			time.sleep(Constant.UPLOAD_PROGRESS_POLL_TIME)
+
+		self.__report_progress(100, total_bytes)
+
+	def __get_video_id(self) -> Optional[str]:
+		video_id = None
+		if self.fast_fill:
+			video_url = get_video_url(self.browser.driver)
+			if video_url:
+				return video_url.split('/')[-1]
+		try:
+			video_url_container = self.browser.find(
+				By.XPATH, Constant.VIDEO_URL_CONTAINER)
+			video_url_element = self.browser.find(By.XPATH, Constant.VIDEO_URL_ELEMENT, element=video_url_container)
+			video_id = video_url_element.get_attribute(
+				Constant.HREF).split('/')[-1]
+		except:
+			self.logger.warning(Constant.VIDEO_NOT_FOUND_ERROR)
+			pass
+		return video_id
+
+	def __quit(self):
+		self.browser.driver.quit()
+
+
+class YouTubeUploadSession:
+	"""A class for uploading several videos on YouTube with one Firefox browser, restarted if it crashes or the upload stalls"""
+
+	def __init__(self, profile_path: Optional[str] = str(Path.cwd()) + "/profile",
+				headless: bool = True,
+				max_browser_restarts: int = 1,
+				max_wait: float = Constant.MAX_WAITING_TIME,
+				cookies_folder_path: Optional[str] = None,
+				progress_callback: Optional[Callable[[UploadProgress], None]] = None,
+				stall_timeout: float = Constant.UPLOAD_STALL_TIMEOUT,
+				timer: Optional[StepTimer] = None,
+				lean: bool = False,
+				fast_fill: bool = False,
+				profile_template_path: Optional[str] = None) -> None:
+		self.profile_path = profile_path
+		self.profile_template_path = profile_template_path
+		self.lean = lean
+		self.fast_fill = fast_fill
+		self.headless = headless
+		self.max_wait = max_wait
+		self.cookies_folder_path = cookies_folder_path
+		self.max_browser_restarts = max_browser_restarts
+		self.progress_callback = progress_callback
+		self.stall_timeout = stall_timeout
+		self.timer = timer or StepTimer()
+		self.transferred_bytes = 0
+		self.transfer_time = 0.0
+		self.browser = None
+		self.uploader = None
+		self.logger = logging.getLogger('YT-Uploader')
+		self.logger.setLevel(logging.INFO)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def upload(self, video_path: str, metadata_json_path: Optional[str] = None,
+			thumbnail_path: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+		self.uploader = None
+		try:
+			return self.__upload_with_restarts(video_path, metadata_json_path, thumbnail_path)
+		except (UploadRejectedException, UploadAttachedException):
+			raise
+		except Exception as e:
+			# Uploading the file again would create another copy of the video on YouTube
+			if self.uploader is not None and self.uploader.transfer_start_time is not None:
+				raise UploadAttachedException('The upload of {} failed after attaching the file: {}'.format(video_path, e)) from e
+			raise
+
+	def __upload_with_restarts(self, video_path: str, metadata_json_path: Optional[str] = None,
+			thumbnail_path: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+		restarts = 0
+		while True:
+			if not self.__is_browser_alive():
+				self.__start_browser()
+			uploader = self.uploader = YouTubeUploader(video_path, metadata_json_path, thumbnail_path, browser=self.browser,
+				max_wait=self.max_wait, progress_callback=self.progress_callback, stall_timeout=self.stall_timeout,
+				timer=self.timer, lean=self.lean, fast_fill=self.fast_fill)
+			try:
+				was_video_uploaded, video_id = uploader.upload()
+				if was_video_uploaded and uploader.last_progress is not None:
+					self.transferred_bytes += uploader.last_progress.total_bytes
+					self.transfer_time += uploader.last_progress.elapsed
+				return was_video_uploaded, video_id
+			except UploadStalledException:
+				# The stalled transfer is aborted with its browser and the video is uploaded again
+				if restarts >= self.max_browser_restarts:
+					self.close()
+					raise
+				restarts += 1
+				self.logger.warning('The upload stalled, restarting the browser to upload {} again'.format(video_path))
+				self.close()
+			except WebDriverException:
+				# An error on a working page is raised, a crashed browser is restarted
+				if self.__is_browser_alive() or restarts >= self.max_browser_restarts:
+					raise
+				restarts += 1
+				self.logger.warning('The browser crashed, restarting it to upload {}'.format(video_path))
+
+	def upload_batch(self, videos: Iterable[Tuple[str, Optional[str]]]) -> List[Tuple[str, bool, Optional[str]]]:
+		"""Uploads each (video_path, metadata_json_path) pair and returns (video_path, was_video_uploaded, video_id) for each one"""
+		results = []
+		for video_path, metadata_json_path in videos:
+			try:
+				was_video_uploaded, video_id = self.upload(video_path, metadata_json_path)
+			except Exception as e:
+				self.logger.error('Could not upload {}: {}'.format(video_path, e))
+				was_video_uploaded, video_id = False, None
+			results.append((video_path, was_video_uploaded, video_id))
+		return results
+
+	def start(self) -> None:
+		"""Starts and signs in the browser before the first upload, if it is not running"""
+		if not self.__is_browser_alive():
+			self.__start_browser()
+
+	def close(self) -> None:
+		if self.browser is not None:
+			self.browser.quit()
+			self.browser = None
+
+	def __start_browser(self) -> None:
+		self.close()
+		if self.profile_template_path and self.profile_path:
+			with self.timer.span('profile_template'):
+				template_path = ensure_profile_template(self.profile_path, get_template_folder(self.profile_template_path, self.profile_path))
+			# The cookies folder of selenium_firefox stays the one it names after the profile folder
+			with self.timer.span('browser_launch'):
+				self.browser = Firefox(cookies_folder_path=self.cookies_folder_path, cookies_id=self.profile_path.strip(os.sep).split(os.sep)[-1],
+					pickle_cookies=True, full_screen=False, headless=self.headless, **get_browser_options(self.lean, template_path))
+			self.browser.source_profile_path = self.profile_path
+		else:
+			with self.timer.span('browser_launch'):
+				self.browser = Firefox(profile_path=self.profile_path, cookies_folder_path=self.cookies_folder_path,
+					pickle_cookies=True, full_screen=False, headless=self.headless, **get_browser_options(self.lean))
+		self.logger.debug("Use profile path: {}".format(self.browser.source_profile_path))
+		with self.timer.span('login'):
+			login(self.browser, self.logger, self.max_wait, self.lean)
+
+	def __is_browser_alive(self) -> bool:
+		if self.browser is None:
+			return False
+		try:
+			self.browser.driver.current_url
+			return True
+		except WebDriverException:
+			return False